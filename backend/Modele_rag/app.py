@@ -1,6 +1,7 @@
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 import os
+import threading
 
 load_dotenv(override=True)
 print("GROQ_API_KEY loaded:", bool(os.getenv("GROQ_API_KEY")))
@@ -25,12 +26,10 @@ DB_FAISS_PATH = "vectorstore/db_faiss"
 # Charger la base FAISS une seule fois
 def get_vectorstore():
     embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    embedding_model.embed_query("warm-up")  # première inférence hors requête
     db = FAISS.load_local(DB_FAISS_PATH, embedding_model, allow_dangerous_deserialization=True)
     return db
 
-vectorstore = get_vectorstore()
-retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-
 # Initialiser le modèle Groq
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 print("GROQ_API_KEY:", GROQ_API_KEY)
@@ -55,15 +54,29 @@ retrieval_qa_chat_prompt = ChatPromptTemplate.from_messages([
 def _format_docs(docs):
     return "\n\n".join(doc.page_content for doc in docs)
 
-rag_chain = (
-    {
-        "context": retriever | RunnableLambda(_format_docs),
-        "input": RunnablePassthrough(),
-    }
-    | retrieval_qa_chat_prompt
-    | llm
-    | StrOutputParser()
-)
+
+# Modèle d'embeddings + FAISS chargés au premier appel de /chat (pas à l'import)
+_rag = None
+_rag_lock = threading.Lock()
+
+
+def get_rag():
+    """Retourne (retriever, rag_chain), construits une seule fois, de façon thread-safe."""
+    global _rag
+    with _rag_lock:
+        if _rag is None:
+            retriever = get_vectorstore().as_retriever(search_kwargs={"k": 3})
+            rag_chain = (
+                {
+                    "context": retriever | RunnableLambda(_format_docs),
+                    "input": RunnablePassthrough(),
+                }
+                | retrieval_qa_chat_prompt
+                | llm
+                | StrOutputParser()
+            )
+            _rag = (retriever, rag_chain)
+        return _rag
 
 
 conversation_history = []  # stocke les messages entre le user et le bot
@@ -93,6 +106,7 @@ def chat():
         )
 
         # Exécution du RAG
+        retriever, rag_chain = get_rag()
         rag_input = f"{previous_context}\nUser: {user_message}".strip()
         answer = rag_chain.invoke(rag_input)
         source_docs = retriever.invoke(rag_input)
@@ -1,4 +1,7 @@
+import logging
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from routers import food
@@ -21,6 +24,16 @@ app.add_middleware(
 app.include_router(food.router, prefix="/api", tags=["nutrition"])
 
 
+@app.on_event("startup")
+async def load_models() -> None:
+    """Load and warm the food classifier before the first request, off the event loop."""
+    try:
+        await run_in_threadpool(food.get_model)
+    except RuntimeError as exc:
+        # /api/food answers 503 until the model file is available
+        logging.getLogger(__name__).warning("Food classifier not loaded: %s", exc)
+
+
 @app.get("/health")
 async def healthcheck() -> dict[str, str]:
     """Lightweight readiness probe used by local dev scripts."""
@@ -1,11 +1,13 @@
 import io
 import json
+import threading
 from pathlib import Path
 from typing import List, Optional
 
 import numpy as np
 import tensorflow as tf
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from PIL import Image
 from pydantic import BaseModel
 from tensorflow.keras.applications.efficientnet import preprocess_input
@@ -20,13 +22,29 @@ NUTRI_PATH = ROOT / "data" / "nutrition_map.json"
 IMG_SIZE = 224
 MAX_CLASSES = len(LABELS)
 
-if not MODEL_PATH.exists():
-    raise RuntimeError(f"Model file not found: {MODEL_PATH}")
-
-model = tf.keras.models.load_model(MODEL_PATH)
 with open(NUTRI_PATH, "r", encoding="utf-8") as f:
     NUTRI = json.load(f)
 
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model() -> tf.keras.Model:
+    """Load the classifier on first use and warm it with a dummy batch.
+
+    Blocking: called by the app's startup hook, and from request handlers through
+    run_in_threadpool so a first load never stalls the event loop.
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            if not MODEL_PATH.exists():
+                raise RuntimeError(f"Model file not found: {MODEL_PATH}")
+            model = tf.keras.models.load_model(MODEL_PATH)
+            model.predict(np.zeros((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float16), verbose=0)
+            _model = model
+        return _model
+
 
 class FoodTopK(BaseModel):
     label: str
@@ -74,6 +92,11 @@ async def classify_food(
 
     top_k = max(1, min(int(k), MAX_CLASSES))
 
+    try:
+        model = await run_in_threadpool(get_model)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
     try:
         content = await image.read()
         if not content:
@@ -35,13 +35,14 @@ from data.scene_data import SceneData
 from data.object_data import ObjectData
 from data.expression_data import ExpressionData
 from save_to_shared import save_analysis_output
+from backend_app.workspace import shared_path
 
 
 # ==== Paths ====
 SCRIPT_DIR = Path(__file__).resolve().parent
 TEMPLATE_PATH = SCRIPT_DIR / "mapping_and_templates" / "text_templates.json"
 EMOTION_MAP_PATH = SCRIPT_DIR / "mapping_and_templates" / "emotion_mappings.json"
-PRE_ANALYSIS_PATH = PROJECT_ROOT / "shared_memory" / "5_JSON_out" / "pre_analysis.json"
+PRE_ANALYSIS_PATH = "5_JSON_out/pre_analysis.json"  # relative to the job workspace
 
 
 # ==== Utility Functions ====
@@ -137,7 +138,7 @@ def flatten_markdown(md_lines: List[str], max_len: int = 100) -> str:
 
 # ==== Main Execution ====
 def generate_analysis() -> None:
-    analysis = AnalysisInput(PRE_ANALYSIS_PATH)
+    analysis = AnalysisInput(shared_path(PRE_ANALYSIS_PATH))
     templates = load_json(TEMPLATE_PATH)
     mapping = load_json(EMOTION_MAP_PATH)
 
@@ -24,11 +24,13 @@ while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.workspace import shared_path
+
 
 # ==== Save Function ====
 def save_analysis_output(data: dict, filename: Union[str, Path] = "analysis_text.json") -> Path:
     """
-    Save *data* (as JSON) to shared_memory/6_AG_out/<filename>.
+    Save *data* (as JSON) to <job workspace>/6_AG_out/<filename>.
 
     Args:
         data (dict): The JSON-serializable analysis result.
@@ -37,7 +39,7 @@ def save_analysis_output(data: dict, filename: Union[str, Path] = "analysis_text
     Returns:
         Path: Absolute path to the written file.
     """
-    output_dir = PROJECT_ROOT / "shared_memory" / "6_AG_out"
+    output_dir = shared_path("6_AG_out")
     output_dir.mkdir(parents=True, exist_ok=True)
 
     out_path = output_dir / filename
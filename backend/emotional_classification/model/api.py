@@ -5,58 +5,90 @@ Authors: Adapted from Itay Vazana & Oriya Even Chen
 Description:
 Flask-based API backend for SoulSketch.
 This replaces the Streamlit UI and exposes REST endpoints for integration with a frontend.
+Every upload opens a job with its own workspace (shared_memory/9_Jobs/<job_id>),
+so several drawings can be analyzed side by side.
+/api/analyze queues the job on a pool of analysis workers (backend_app/job_queue.py)
+and returns at once; status, download, cancel and resume take the job ID.
+/api/events streams the progress of a job as Server-Sent Events (no polling needed).
+/api/analyze takes a plot mode (plots=all|none|on_demand); /api/plots lists the plots of a job
+and /api/plot serves one, rendering it first if it was deferred.
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 from pathlib import Path
+import json
 import tempfile
 import zipfile
-import threading
 import subprocess
 import sys  # ✅ Utilisé pour exécuter les scripts dans le même venv
 
 # === Import SoulSketch backend logic ===
-from backend_app.upload_image import upload_image_to_shared
-from backend_app.full_flow_runner import run_analysis_flow, get_current_step
+from backend_app.upload_image import upload_image_bytes
+from backend_app.job_queue import get_job_queue, COMPLETED, FINISHED_STATES
+from backend_app.workspace import JobWorkspace, create_job_workspace, get_job_workspace
+from backend_app.metrics import get_registry
+from backend_app.model_registry import get_model_registry
+from backend_app.progress_events import stream_events
+from backend_app.plot_policy import DEFAULT_PLOT_MODE, check_plot_mode, get_plot_mode, pending_plots, request_plots
 
 # === CONFIGURATION ===
-SHARED_INPUT = Path("shared_memory/0_BE_input/original_input.png")
-FINAL_PDF = Path("shared_memory/7_PDFG_out/full_analysis_report.pdf")
-LOG_DIR = Path("shared_memory/0_BE_out")
 CLEANUP_SCRIPT = Path("shared_memory/clean_and_archive_current_data.py")
 CLEAN_HISTORY_SCRIPT = Path("shared_memory/clean_history.py")
+PLOT_GLOB = "*_out/**/plots/**/*.png"
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
 
 
-status = {"step": "not_started", "running": False}
+# Job used when a request does not name one
+latest_job = {"id": None}
 
 
 # === UTILITIES ===
-def get_latest_log_file() -> Path | None:
+def get_latest_log_file(log_dir: Path) -> Path | None:
     """Return the most recent log file."""
-    log_files = sorted(LOG_DIR.glob("flow_log_*.txt"), key=lambda f: f.stat().st_mtime, reverse=True)
+    log_files = sorted(log_dir.glob("flow_log_*.txt"), key=lambda f: f.stat().st_mtime, reverse=True)
     return log_files[0] if log_files else None
 
 
-def package_results_as_zip(drawing_id: str = "user") -> Path | None:
+def package_results_as_zip(workspace: JobWorkspace) -> Path | None:
     """Bundle PDF and log into a downloadable ZIP."""
-    if not FINAL_PDF.exists():
+    final_pdf = workspace.final_pdf
+    if not final_pdf.exists():
         return None
 
-    latest_log = get_latest_log_file()
-    zip_path = Path(tempfile.gettempdir()) / f"soulsketch_{drawing_id}.zip"
+    latest_log = get_latest_log_file(workspace.log_dir)
+    zip_path = Path(tempfile.gettempdir()) / f"soulsketch_{workspace.job_id}.zip"
 
     with zipfile.ZipFile(zip_path, "w") as zipf:
-        zipf.write(FINAL_PDF, arcname="full_analysis_report.pdf")
+        zipf.write(final_pdf, arcname="full_analysis_report.pdf")
         if latest_log:
             zipf.write(latest_log, arcname="flow_log.txt")
 
     return zip_path
 
 
+def requested_job_id() -> str | None:
+    """Job ID from the query string, form or JSON body (latest upload if absent)."""
+    body = request.get_json(silent=True) or {}
+    return request.args.get("job_id") or request.form.get("job_id") or body.get("job_id") or latest_job["id"]
+
+
+def resolve_job():
+    """
+    Returns:
+        tuple: (JobWorkspace, None) or (None, error response).
+    """
+    job_id = requested_job_id()
+    if not job_id:
+        return None, (jsonify({"success": False, "error": "No job. Upload an image first."}), 404)
+    workspace = get_job_workspace(job_id)
+    if workspace is None:
+        return None, (jsonify({"success": False, "error": f"Unknown job: {job_id}"}), 404)
+    return workspace, None
+
+
 # === ROUTES ===
 
 @app.route("/")
@@ -66,67 +98,219 @@ def home():
 
 @app.route("/api/upload", methods=["POST"])
 def upload():
-    """Upload a drawing image to shared memory."""
+    """Upload a drawing image into a new job workspace."""
     file = request.files.get("image")
     if not file:
         return jsonify({"success": False, "error": "No image provided."}), 400
 
-    tmp_path = Path("tmp_uploaded_image.png")
-    file.save(tmp_path)
-
+    workspace = create_job_workspace()
     try:
-        upload_image_to_shared(str(tmp_path), verbose=True)
-        tmp_path.unlink(missing_ok=True)
-        return jsonify({"success": True, "message": "Image uploaded successfully."})
+        # Validated in memory and written once as the job's input image
+        result = upload_image_bytes(file.read(), shared_dir=workspace.input_image.parent, verbose=True)
+        if not result["success"]:
+            workspace.remove()
+            return jsonify({"success": False, "error": result["error"]}), 400
+
+        latest_job["id"] = workspace.job_id
+        return jsonify({"success": True, "job_id": workspace.job_id, "message": "Image uploaded successfully."})
     except Exception as e:
-        tmp_path.unlink(missing_ok=True)
+        workspace.remove()
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 
 @app.route("/api/analyze", methods=["POST"])
 def analyze():
-    """Start the full analysis in a background thread."""
-    if status["running"]:
-        return jsonify({"success": False, "error": "Analysis already in progress."}), 409
-
-    def run_flow():
-        try:
-            status["running"] = True
-            status["step"] = "started"
-            run_analysis_flow(verbose=True)
-            status["step"] = "completed"
-        except Exception as e:
-            status["step"] = f"error: {e}"
-        finally:
-            status["running"] = False
+    """Queue the analysis of a job; returns at once with the job ID."""
+    workspace, error = resolve_job()
+    if error:
+        return error
 
-    threading.Thread(target=run_flow, daemon=True).start()
-    return jsonify({"success": True, "message": "Analysis started."})
+    body = request.get_json(silent=True) or {}
+    plots = request.args.get("plots") or request.form.get("plots") or body.get("plots")
+    try:
+        options = {"plots": check_plot_mode(plots)} if plots else {}
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    job_queue = get_job_queue()
+    job = job_queue.submit(workspace, **options)
+    return jsonify({
+        "success": True,
+        "job_id": job.job_id,
+        "state": job.state,
+        "plots": job.options.get("plots") or DEFAULT_PLOT_MODE,
+        "queue_position": job_queue.position(job.job_id),
+        "message": "Analysis queued."
+    }), 202
 
 
 @app.route("/api/status", methods=["GET"])
 def analysis_status():
-    """Return current pipeline step."""
-    step = get_current_step()
-    status["step"] = step
+    """Return the state, queue position and current pipeline step of a job."""
+    workspace, error = resolve_job()
+    if error:
+        return error
+
+    status = get_job_queue().status(workspace.job_id)
+    if status is None:  # uploaded, not submitted yet
+        status = {"job_id": workspace.job_id, "state": "uploaded", "step": "not_started", "running": False}
     return jsonify(status)
 
 
+@app.route("/api/events", methods=["GET"])
+def analysis_events():
+    """
+    Server-Sent Events stream of a job: job_queued / job_started / job_finished,
+    stage_start / stage_end (with timings), substep and progress events ("CEX 4/12 object crops").
+    Replays the events already published; resumes after the Last-Event-ID header on reconnect.
+    The stream ends after job_finished.
+    """
+    workspace, error = resolve_job()
+    if error:
+        return error
+
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID") or request.args.get("last_event_id") or 0)
+    except ValueError:
+        last_event_id = 0
+
+    def generate():
+        yield "retry: 2000\n\n"
+        for event in stream_events(workspace.job_id, last_event_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/api/cancel", methods=["POST"])
+def cancel_analysis():
+    """Cancel a queued job, or stop a running one before its next pipeline step."""
+    workspace, error = resolve_job()
+    if error:
+        return error
+
+    if not get_job_queue().cancel(workspace.job_id):
+        return jsonify({"success": False, "error": "Job is not queued or running."}), 409
+    return jsonify({"success": True, "job_id": workspace.job_id, "message": "Cancellation requested."})
+
+
+@app.route("/api/resume", methods=["POST"])
+def resume_analysis():
+    """Queue a failed or cancelled job again; steps already completed are not re-run."""
+    workspace, error = resolve_job()
+    if error:
+        return error
+
+    job_queue = get_job_queue()
+    job = job_queue.resume(workspace.job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Only failed or cancelled jobs can be resumed."}), 409
+    return jsonify({
+        "success": True,
+        "job_id": job.job_id,
+        "state": job.state,
+        "queue_position": job_queue.position(job.job_id),
+        "message": "Analysis resumed."
+    }), 202
+
+
+@app.route("/api/jobs", methods=["GET"])
+def jobs():
+    """Number of workers and of jobs in each state."""
+    return jsonify(get_job_queue().stats())
+
+
 @app.route("/api/download", methods=["GET"])
 def download_results():
-    """Provide the final ZIP for download."""
-    zip_path = package_results_as_zip()
+    """Provide the final ZIP of a job for download."""
+    workspace, error = resolve_job()
+    if error:
+        return error
+
+    job = get_job_queue().get(workspace.job_id)
+    if job is not None and job.state != COMPLETED:
+        return jsonify({"error": f"Job is {job.state}, no results available yet."}), 409
+
+    zip_path = package_results_as_zip(workspace)
     if zip_path and zip_path.exists():
         return send_file(zip_path, as_attachment=True)
     return jsonify({"error": "No results available yet."}), 404
 
 
+@app.route("/api/plots", methods=["GET"])
+def list_plots():
+    """Plots of a job: rendered ones and those deferred until requested (plot mode on_demand)."""
+    workspace, error = resolve_job()
+    if error:
+        return error
+    rendered = sorted(p.relative_to(workspace.root).as_posix() for p in workspace.root.glob(PLOT_GLOB))
+    return jsonify({
+        "job_id": workspace.job_id,
+        "mode": get_plot_mode(workspace),
+        "rendered": rendered,
+        "pending": pending_plots(workspace)
+    })
+
+
+@app.route("/api/plot", methods=["GET"])
+def get_plot():
+    """Serve one plot of a job (path as listed by /api/plots), rendering it first if it was deferred."""
+    workspace, error = resolve_job()
+    if error:
+        return error
+    rel_path = (request.args.get("path") or "").strip("/")
+    plot_path = workspace.path(rel_path).resolve()
+    if not rel_path or plot_path.suffix != ".png" or workspace.root.resolve() not in plot_path.parents:
+        return jsonify({"error": "Invalid plot path."}), 400
+
+    if rel_path in pending_plots(workspace):
+        request_plots(rel_path, workspace)
+    if plot_path.is_file():
+        return send_file(plot_path, mimetype="image/png")
+    return jsonify({"error": f"Plot not available (plot mode: {get_plot_mode(workspace)})."}), 404
+
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    """
+    Per-stage and per-sub-step timing / memory aggregates (p50, p95, p99, wall-time histogram)
+    of the analyses run by this server, and the resident models. With ?job_id=..., returns the
+    raw records of that job.
+    """
+    job_id = request.args.get("job_id")
+    if not job_id:
+        return jsonify({"stages": get_registry().summary(), "models": get_model_registry().stats()})
+
+    workspace = get_job_workspace(job_id)
+    if workspace is None:
+        return jsonify({"success": False, "error": f"Unknown job: {job_id}"}), 404
+
+    records = []
+    for metrics_file in sorted(workspace.log_dir.glob("metrics_*.jsonl")):
+        with open(metrics_file, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return jsonify({"job_id": job_id, "records": records})
+
+
 @app.route("/api/cleanup", methods=["POST"])
 def cleanup():
-    """Run cleanup script to clear temp data."""
+    """
+    Run cleanup script to clear temp data (and the workspaces of completed jobs).
+    Failed and cancelled jobs are kept so they can be resumed, unless {"all": true} is sent.
+    """
     if CLEANUP_SCRIPT.exists():
         subprocess.run([sys.executable, str(CLEANUP_SCRIPT)], check=False)  # ✅ Utilise le même venv
+        body = request.get_json(silent=True) or {}
+        states = FINISHED_STATES if body.get("all") else {COMPLETED}
+        for job in get_job_queue().clear_finished(states):
+            job.workspace.remove()
+            if latest_job["id"] == job.job_id:
+                latest_job["id"] = None
         return jsonify({"success": True, "message": "Cleanup completed."})
     return jsonify({"success": False, "error": "Cleanup script not found."}), 404
 
@@ -20,7 +20,7 @@ import zipfile
 import threading
 import time
 import subprocess
-from backend_app.upload_image import upload_image_to_shared
+from backend_app.upload_image import upload_image_bytes
 from backend_app.full_flow_runner import run_analysis_flow, get_current_step
 
 # === CONFIGURATION ===
@@ -147,11 +147,7 @@ if uploaded_file:
 
     if st.button("📤 Upload Image to System"):
         with st.spinner("Uploading..."):
-            tmp_input_path = Path("tmp_uploaded_image.png")
-            with open(tmp_input_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            result = upload_image_to_shared(str(tmp_input_path), verbose=True)
-            tmp_input_path.unlink(missing_ok=True)
+            result = upload_image_bytes(uploaded_file.getvalue(), verbose=True)
 
             if result["success"]:
                 st.success("✅ Image uploaded successfully.")
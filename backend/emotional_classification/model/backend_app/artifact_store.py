@@ -0,0 +1,321 @@
+"""
+Project: SoulSketch
+File   : backend_app/artifact_store.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+In-memory artifact store shared by the pipeline stages of one job.
+- Artifacts are addressed by their path inside the job workspace
+  (e.g. "2_OBJ_DET_out/objects/colored/crops/0042_house.png"), so every artifact
+  still has a well-defined place on disk
+- Images are kept decoded (numpy arrays, BGR like cv2) and JSON artifacts as Python objects:
+  a stage reading the crops of another stage gets the arrays directly instead of
+  encoding PNGs, copying them between folders and decoding them again
+- Writes are deferred while the flow runs in-process; flush() persists the pending
+  artifacts when files are actually needed (PDF sources, end of the flow -> history archive)
+- Outside an in-process flow (stage run as a script / child process), the store writes
+  through to disk, so stages keep communicating through files as before
+- Stored arrays are read-only: a stage must copy an image before drawing on it; crops sliced
+  from a read-only image (e.g. the cached input drawing) are kept as zero-copy views
+- PNG encoding (at flush(), or in put_images() for write-through stores) runs on a thread
+  pool: cv2.imwrite releases the GIL
+- memo() keeps derived values of the job that are never written (e.g. the decoded input
+  image and its grayscale / edge variants, see image_cache.py), computed once per flow
+"""
+
+import os
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.workspace import JobWorkspace, get_workspace
+
+# === CONFIGURATION ===
+ENCODE_WORKERS = min(8, os.cpu_count() or 1)  # threads encoding / writing artifacts
+
+
+def _key(parts) -> str:
+    """Normalized workspace-relative key ('a/b/c.png') from a path or path parts."""
+    if isinstance(parts, (str, Path)):
+        parts = (parts,)
+    return Path(*parts).as_posix()
+
+
+class ArtifactStore:
+    """
+    Decoded images and JSON objects of one job, with deferred persistence.
+
+    Attributes:
+        workspace (JobWorkspace): Job the artifacts belong to.
+        deferred (bool): If True, put_*() keeps artifacts in memory until flush();
+            if False, every put_*() is also written to disk immediately.
+    """
+
+    def __init__(self, workspace: JobWorkspace, deferred: bool = True):
+        self.workspace = workspace
+        self.deferred = deferred
+        self._artifacts: Dict[str, Any] = {}
+        self._pending: set = set()
+        self._derived: Dict[Hashable, Any] = {}
+        self._derived_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    # ---- Images ----
+
+    def put_image(self, parts, image: np.ndarray, persist: bool = False) -> Path:
+        """
+        Stores a BGR image under its workspace path.
+
+        Args:
+            parts: Workspace-relative path (str, Path or tuple of parts).
+            image (np.ndarray): BGR image (copied if it is a writeable view of a larger array;
+                views of a read-only image are kept as they are).
+            persist (bool): Write it to disk now even when writes are deferred.
+
+        Returns:
+            Path: Location of the artifact on disk (written now or at the next flush()).
+        """
+        return self._put(_key(parts), self._freeze(image), persist)
+
+    def put_images(self, items: Iterable[Tuple[Any, np.ndarray]]) -> List[Path]:
+        """
+        Stores several BGR images; a write-through store encodes them in parallel.
+
+        Args:
+            items: (workspace-relative path, image) pairs.
+
+        Returns:
+            List[Path]: Locations of the artifacts on disk, in order.
+        """
+        entries = [(_key(parts), self._freeze(image)) for parts, image in items]
+        with self._lock:
+            for key, image in entries:
+                self._artifacts[key] = image
+                if self.deferred:
+                    self._pending.add(key)
+        if not self.deferred:
+            self._write_many(entries)
+        return [self.workspace.path(key) for key, _ in entries]
+
+    @staticmethod
+    def _freeze(image: np.ndarray) -> np.ndarray:
+        if image.base is not None and image.flags.writeable:
+            image = image.copy()  # detach crops from a full image that may still change
+        frozen = image.view()  # read-only view: the caller's own array stays writeable
+        frozen.flags.writeable = False
+        return frozen
+
+    def get_image(self, parts) -> Optional[np.ndarray]:
+        """
+        Returns:
+            np.ndarray | None: The decoded image (read-only), loaded from disk on first use
+            if it was not produced in memory; None if it does not exist.
+        """
+        key = _key(parts)
+        with self._lock:
+            image = self._artifacts.get(key)
+        if image is not None:
+            return image
+
+        image = cv2.imread(str(self.workspace.path(key)))
+        if image is None:
+            return None
+        image.flags.writeable = False
+        with self._lock:
+            return self._artifacts.setdefault(key, image)
+
+    # ---- JSON ----
+
+    def put_json(self, parts, data: Any, persist: bool = False) -> Path:
+        """
+        Stores a JSON-serializable object under its workspace path
+        (persist=True for files that later stages still read from disk).
+        """
+        return self._put(_key(parts), data, persist)
+
+    def get_json(self, parts, default: Any = None) -> Any:
+        key = _key(parts)
+        with self._lock:
+            if key in self._artifacts:
+                return self._artifacts[key]
+        path = self.workspace.path(key)
+        if not path.is_file():
+            return default
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            return self._artifacts.setdefault(key, data)
+
+    # ---- Derived values ----
+
+    def memo(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Returns the value stored under key, computing it with factory() on first use.
+        Concurrent callers of the same key wait for a single computation; arrays are
+        made read-only. Derived values are never written to disk.
+        """
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+            key_lock = self._derived_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._derived:
+                    return self._derived[key]
+            value = factory()
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            with self._lock:
+                self._derived[key] = value
+                self._derived_locks.pop(key, None)
+            return value
+
+    # ---- Listing / removal ----
+
+    def list(self, folder_parts, suffix: str = "") -> List[str]:
+        """
+        Names of the artifacts directly inside a folder, in memory or on disk.
+
+        Returns:
+            List[str]: Sorted file names (e.g. '0042_house.png').
+        """
+        prefix = _key(folder_parts) + "/"
+        with self._lock:
+            names = {k[len(prefix):] for k in self._artifacts if k.startswith(prefix)}
+        names = {n for n in names if "/" not in n}
+
+        folder = self.workspace.path(prefix)
+        if folder.is_dir():
+            names.update(p.name for p in folder.iterdir() if p.is_file())
+        return sorted(n for n in names if n.endswith(suffix))
+
+    def discard(self, folder_parts) -> None:
+        """
+        Forgets every in-memory artifact under a folder (when a stage resets its outputs).
+        Files already on disk are left to the caller.
+        """
+        prefix = _key(folder_parts) + "/"
+        with self._lock:
+            for key in [k for k in self._artifacts if k.startswith(prefix)]:
+                del self._artifacts[key]
+                self._pending.discard(key)
+
+    # ---- Persistence ----
+
+    def _put(self, key: str, value: Any, persist: bool = False) -> Path:
+        write_now = persist or not self.deferred
+        with self._lock:
+            self._artifacts[key] = value
+            if write_now:
+                self._pending.discard(key)
+            else:
+                self._pending.add(key)
+        if write_now:
+            self._write(key, value)
+        return self.workspace.path(key)
+
+    def _write(self, key: str, value: Any) -> None:
+        path = self.workspace.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(value, np.ndarray):
+            if not cv2.imwrite(str(path), value):
+                raise IOError(f"Could not write image artifact: {path}")
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(value, f, indent=4)
+
+    def _write_many(self, entries: List[Tuple[str, Any]]) -> None:
+        if len(entries) < 2:
+            for key, value in entries:
+                self._write(key, value)
+            return
+        with ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix="artifact-write") as pool:
+            list(pool.map(lambda entry: self._write(*entry), entries))
+
+    def flush(self) -> int:
+        """
+        Writes every pending artifact to disk.
+
+        Returns:
+            int: Number of files written.
+        """
+        with self._lock:
+            pending = sorted(self._pending)
+            self._pending.clear()
+            values = [(key, self._artifacts[key]) for key in pending]
+        self._write_many(values)
+        return len(values)
+
+    def pending_keys(self) -> List[str]:
+        """
+        Returns:
+            List[str]: Workspace-relative paths of the artifacts not written to disk yet.
+        """
+        with self._lock:
+            return sorted(self._pending)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def __len__(self) -> int:
+        return len(self._artifacts)
+
+
+# =============================================================================
+# PER-JOB REGISTRY
+# =============================================================================
+
+_STORES: Dict[str, ArtifactStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_artifact_store(workspace: JobWorkspace, deferred: bool = True) -> ArtifactStore:
+    """
+    Creates (or returns) the store of a job for the duration of its flow.
+    """
+    with _STORES_LOCK:
+        store = _STORES.get(workspace.job_id)
+        if store is None:
+            store = _STORES[workspace.job_id] = ArtifactStore(workspace, deferred=deferred)
+        return store
+
+
+def close_artifact_store(workspace: JobWorkspace, flush: bool = True) -> None:
+    """
+    Persists the pending artifacts of a job (by default) and releases its memory.
+    """
+    with _STORES_LOCK:
+        store = _STORES.pop(workspace.job_id, None)
+    if store is not None and flush:
+        store.flush()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Returns:
+        ArtifactStore: Store of the current job, or a write-through store
+        when no flow has opened one (stage run on its own).
+    """
+    workspace = get_workspace()
+    with _STORES_LOCK:
+        store = _STORES.get(workspace.job_id)
+    if store is not None and store.workspace.root == workspace.root:
+        return store
+    return ArtifactStore(workspace, deferred=False)
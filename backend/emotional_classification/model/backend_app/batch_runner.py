@@ -0,0 +1,287 @@
+"""
+Project: SoulSketch
+File   : backend_app/batch_runner.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Offline batch analysis of many drawings (e.g. reprocessing the archive).
+- Input: a directory of images (optionally recursive) or a manifest file
+  (.txt / .csv: one image path per line, first column; .json: list of paths)
+- The resident pipeline engine loads every stage and its YOLO models once for the whole batch
+- Several drawings are analyzed at the same time (--workers), each in its own job workspace,
+  sharing the loaded models
+- Per drawing: PDF, post_analysis.json, analysis_text.json, flow log and metrics are copied
+  to <output>/<drawing>/ (one distinct folder per image) and the workspace is removed
+- Writes <output>/batch_summary.json: throughput (drawings per minute), per-drawing
+  results and the list of failures
+- --plots none skips every diagnostic plot (JSON results and a PDF without plots)
+
+Usage:
+    python -m backend_app.batch_runner <images_dir | manifest> --output <dir> [--workers 2]
+                                       [--recursive] [--no-cache] [--keep-workspaces]
+                                       [--plots all|none|on_demand]
+"""
+
+import sys
+import csv
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.pipeline_engine import get_engine
+from backend_app.full_flow_runner import run_analysis_flow, forget_job
+from backend_app.upload_image import upload_image_to_shared
+from backend_app.result_cache import CACHED_OUTPUTS
+from backend_app.workspace import create_job_workspace
+from backend_app.plot_policy import PLOT_MODES
+
+# === CONFIGURATION ===
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+DEFAULT_WORKERS = 2
+SUMMARY_FILE = "batch_summary.json"
+
+
+# =============================================================================
+# INPUT DISCOVERY
+# =============================================================================
+
+def _read_manifest(manifest: Path) -> List[Path]:
+    """Image paths listed in a manifest (relative paths are resolved against its folder)."""
+    if manifest.suffix.lower() == ".json":
+        with open(manifest, encoding="utf-8") as f:
+            entries = json.load(f)
+        if isinstance(entries, dict):
+            entries = entries.get("images", [])
+    else:
+        with open(manifest, encoding="utf-8", newline="") as f:
+            entries = [row[0].strip() for row in csv.reader(f) if row and row[0].strip()]
+        entries = [e for e in entries if not e.startswith("#")]
+
+    paths = []
+    for entry in entries:
+        path = Path(entry)
+        paths.append(path if path.is_absolute() else manifest.parent / path)
+    return paths
+
+
+def collect_images(source: Path, recursive: bool = False) -> List[Path]:
+    """
+    Args:
+        source (Path): Folder of images or manifest file.
+        recursive (bool): Also scan sub-folders (folders only).
+
+    Returns:
+        List[Path]: Images to analyze, in a stable order.
+    """
+    if source.is_file():
+        return _read_manifest(source)
+    pattern = "**/*" if recursive else "*"
+    return sorted(p for p in source.glob(pattern) if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def output_name(image: Path, source: Path) -> str:
+    """Output folder name: the path relative to the source folder (or the file name), '/' replaced by '__'."""
+    try:
+        relative = image.resolve().relative_to(source.resolve())
+    except ValueError:
+        relative = Path(image.name)
+    return "__".join(relative.with_suffix("").parts)
+
+
+def _collisions(names: List[str]) -> set:
+    counts = Counter(name.lower() for name in names)  # case-insensitive file systems too
+    return {i for i, name in enumerate(names) if counts[name.lower()] > 1}
+
+
+def output_names(images: List[Path], source: Path) -> List[str]:
+    """
+    One distinct output folder name per image, so concurrent drawings never share a folder.
+    Names that collide (a.png / a.jpg, manifest entries with the same file name) keep their
+    suffix; if they still collide, a short hash of the image path is added, then the index.
+
+    Returns:
+        List[str]: Output folder names, in the order of images.
+    """
+    names = [output_name(image, source) for image in images]
+    for i in _collisions(names):
+        names[i] += "_" + images[i].suffix.lstrip(".").lower()
+    for i in _collisions(names):
+        names[i] += "_" + hashlib.sha1(str(images[i].resolve()).encode("utf-8")).hexdigest()[:8]
+    for i in _collisions(names):
+        names[i] += f"_{i}"  # the same image listed twice
+    return names
+
+
+# =============================================================================
+# BATCH EXECUTION
+# =============================================================================
+
+def _collect_outputs(workspace, target: Path) -> None:
+    """Copies the results, flow log and metrics of a finished job to the output folder."""
+    target.mkdir(parents=True, exist_ok=True)
+    for name, parts in CACHED_OUTPUTS.items():
+        source = workspace.path(*parts)
+        if source.is_file():
+            shutil.copy2(source, target / name)
+    for pattern, name in (("flow_log_*.txt", "flow_log.txt"), ("metrics_*.jsonl", "metrics.jsonl")):
+        logs = sorted(workspace.log_dir.glob(pattern), key=lambda f: f.stat().st_mtime)
+        if logs:
+            shutil.copy2(logs[-1], target / name)
+
+
+def analyze_one(image: Path, target: Path, use_cache: bool = True, keep_workspace: bool = False,
+                plots: str = None) -> dict:
+    """
+    Validates and analyzes one drawing in its own workspace.
+
+    Returns:
+        dict: {"image", "output", "success", "cached", "seconds", "error"}
+    """
+    started = time.perf_counter()
+    result = {"image": str(image), "output": str(target), "success": False, "cached": False, "error": None}
+    workspace = create_job_workspace()
+    try:
+        upload = upload_image_to_shared(str(image), shared_dir=workspace.input_image.parent, verbose=False)
+        if not upload["success"]:
+            result["error"] = upload["error"]
+            return result
+
+        flow = run_analysis_flow(verbose=False, workspace=workspace, use_cache=use_cache, plots=plots)
+        _collect_outputs(workspace, target)
+        final_pdf = workspace.final_pdf
+        if final_pdf.exists() and final_pdf.stat().st_size > 0:
+            result.update(success=True, cached=flow["cached"])
+        else:
+            result["error"] = "PDF was not generated correctly."
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        forget_job(workspace.job_id)
+        if not keep_workspace:
+            workspace.remove()
+    return result
+
+
+def run_batch(images: List[Path], output_dir: Path, source: Path, workers: int = DEFAULT_WORKERS,
+              use_cache: bool = True, keep_workspaces: bool = False, plots: str = None) -> dict:
+    """
+    Analyzes a list of drawings with a shared, pre-loaded pipeline engine.
+
+    Args:
+        images (List[Path]): Drawings to analyze.
+        output_dir (Path): Folder receiving one sub-folder per drawing and the summary.
+        source (Path): Input folder (used to name the output folders).
+        workers (int): Drawings analyzed at the same time.
+        use_cache (bool): Reuse results of drawings already analyzed with the same models.
+        keep_workspaces (bool): Keep the job workspaces (for debugging).
+        plots (str | None): Plot mode of every drawing ("all", "none" or "on_demand").
+
+    Returns:
+        dict: Batch summary (also written to <output_dir>/batch_summary.json).
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.now().isoformat(timespec="seconds")
+
+    # Load every stage (and its models) once, before the drawings run concurrently
+    warm_start = time.perf_counter()
+    get_engine().warm_up()
+    warm_up_s = time.perf_counter() - warm_start
+    print(f"[INFO] Pipeline engine ready in {warm_up_s:.1f}s")
+
+    results, print_lock = [], threading.Lock()
+    batch_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as pool:
+        futures = [
+            pool.submit(analyze_one, image, output_dir / name, use_cache, keep_workspaces, plots)
+            for image, name in zip(images, output_names(images, source))
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            with print_lock:
+                status = "OK" if result["success"] else f"FAILED ({result['error']})"
+                print(f"[{done}/{len(images)}] {result['image']}: {status} in {result['seconds']:.1f}s")
+    elapsed = time.perf_counter() - batch_start
+
+    results.sort(key=lambda r: r["image"])
+    failures = [{"image": r["image"], "error": r["error"]} for r in results if not r["success"]]
+    succeeded = len(results) - len(failures)
+    summary = {
+        "started_at": started_at,
+        "source": str(source),
+        "workers": workers,
+        "plots": plots,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(failures),
+        "cached": sum(1 for r in results if r["cached"]),
+        "warm_up_s": round(warm_up_s, 3),
+        "elapsed_s": round(elapsed, 3),
+        "drawings_per_minute": round(succeeded / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "failures": failures,
+        "results": results
+    }
+    with open(output_dir / SUMMARY_FILE, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a directory (or manifest) of drawings in one batch.")
+    parser.add_argument("source", type=Path, help="Folder of images, or manifest (.txt/.csv/.json)")
+    parser.add_argument("--output", "-o", type=Path, required=True, help="Output folder")
+    parser.add_argument("--workers", "-w", type=int, default=DEFAULT_WORKERS, help="Drawings analyzed at once")
+    parser.add_argument("--recursive", "-r", action="store_true", help="Scan sub-folders of the source folder")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the result cache")
+    parser.add_argument("--keep-workspaces", action="store_true", help="Keep job workspaces after each drawing")
+    parser.add_argument("--plots", choices=PLOT_MODES, help="Diagnostic plots: all, none or on_demand (PDF only)")
+    args = parser.parse_args(argv)
+
+    if not args.source.exists():
+        print(f"[ERROR] Source not found: {args.source}")
+        return 2
+
+    images = collect_images(args.source, recursive=args.recursive)
+    if not images:
+        print(f"[ERROR] No images found in {args.source}")
+        return 2
+
+    source_dir = args.source if args.source.is_dir() else args.source.parent
+    print(f"[INFO] {len(images)} drawing(s), {args.workers} worker(s), output: {args.output}")
+    summary = run_batch(images, args.output, source_dir, workers=args.workers,
+                        use_cache=not args.no_cache, keep_workspaces=args.keep_workspaces, plots=args.plots)
+
+    print("==================================================")
+    print(f"[DONE] {summary['succeeded']}/{summary['total']} succeeded in {summary['elapsed_s']:.1f}s "
+          f"({summary['drawings_per_minute']:.1f} drawings/min, {summary['cached']} from cache)")
+    for failure in summary["failures"]:
+        print(f"[FAILED] {failure['image']}: {failure['error']}")
+    print(f"[INFO] Summary: {args.output / SUMMARY_FILE}")
+    return 0 if not summary["failures"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
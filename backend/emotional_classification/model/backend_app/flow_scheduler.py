@@ -0,0 +1,157 @@
+"""
+Project: SoulSketch
+File   : backend_app/flow_scheduler.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Dependency-graph scheduler for the SoulSketch pipeline.
+- Pipeline steps declare the steps whose outputs they read (STEP_DEPENDENCIES)
+- A step starts as soon as all of its dependencies have finished
+- Independent steps (EMCLS, OBJ_DET, FED) run side by side on a thread pool,
+  so the flow takes as long as its critical path instead of the sum of all steps
+- The first failing step stops the flow: nothing new is started, running steps finish,
+  and the error is raised to the caller
+- A flow can be cancelled between steps (should_stop): running steps finish, then
+  FlowCancelled is raised
+"""
+
+import sys
+import contextvars
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# === CONFIGURATION ===
+
+# Step -> steps whose shared memory outputs it reads
+STEP_DEPENDENCIES = {
+    "run_yolo_EMCLS": [],                                   # 0_BE_input only
+    "run_OBJ_DET": [],                                      # 0_BE_input only
+    "run_FED": [],                                          # 0_BE_input only
+    "run_CEX": ["run_OBJ_DET", "run_FED"],                  # object + face crops
+    "run_JB_A": ["run_yolo_EMCLS", "run_OBJ_DET", "run_FED", "run_CEX"],
+    "run_AG": ["run_JB_A"],                                 # pre_analysis.json
+    "run_JB_B": ["run_JB_A", "run_AG"],                     # pre_analysis + analysis_text
+    "run_PDFG": ["run_JB_B"]                                # every *_out folder
+}
+
+# Widest level of the graph (the three vision stages)
+MAX_PARALLEL_STEPS = 3
+
+
+class FlowCancelled(Exception):
+    """Raised when a flow is stopped on request before all of its steps ran."""
+
+
+def topological_order(dependencies: Dict[str, List[str]], preferred: Optional[List[str]] = None) -> List[str]:
+    """
+    Orders the steps so every step comes after its dependencies.
+
+    Args:
+        dependencies (Dict[str, List[str]]): Step -> required steps.
+        preferred (List[str] | None): Tie-break order among steps that are ready together.
+
+    Returns:
+        List[str]: Steps in a valid execution order.
+
+    Raises:
+        ValueError: On an unknown dependency or a dependency cycle.
+    """
+    rank = {step: i for i, step in enumerate(preferred or dependencies)}
+    for step, required in dependencies.items():
+        unknown = [dep for dep in required if dep not in dependencies]
+        if unknown:
+            raise ValueError(f"Step {step} depends on unknown step(s): {unknown}")
+
+    order, done = [], set()
+    while len(order) < len(dependencies):
+        ready = [s for s in dependencies if s not in done and all(d in done for d in dependencies[s])]
+        if not ready:
+            pending = [s for s in dependencies if s not in done]
+            raise ValueError(f"Dependency cycle between steps: {pending}")
+        ready.sort(key=lambda s: rank.get(s, len(rank)))
+        order.append(ready[0])
+        done.add(ready[0])
+    return order
+
+
+class FlowScheduler:
+    """
+    Runs pipeline steps as a dependency graph on a thread pool.
+
+    Attributes:
+        dependencies (Dict[str, List[str]]): Step -> required steps.
+        max_workers (int): Maximum number of steps running at the same time (1 = sequential).
+    """
+
+    def __init__(self, dependencies: Dict[str, List[str]] = None, max_workers: int = MAX_PARALLEL_STEPS,
+                 step_order: Optional[List[str]] = None):
+        self.dependencies = dependencies or STEP_DEPENDENCIES
+        self.max_workers = max(1, max_workers)
+        # Validates the graph and fixes the start order of steps that become ready together
+        self.order = topological_order(self.dependencies, step_order)
+
+    def run(self, run_step: Callable[[str], None], should_stop: Optional[Callable[[], bool]] = None) -> List[str]:
+        """
+        Executes every step once its dependencies have completed.
+        Each step runs in a copy of the caller's context, so the job workspace follows it.
+
+        Args:
+            run_step (Callable[[str], None]): Runs one step by name; raises on failure.
+            should_stop (Callable[[], bool] | None): Checked before starting each step;
+                once it returns True no further step is started.
+
+        Returns:
+            List[str]: Steps in the order they completed.
+
+        Raises:
+            FlowCancelled: If should_stop ended the flow early.
+        """
+        done, completed = set(), []
+        running = {}
+        first_error = None
+        cancelled = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="flow-step") as pool:
+            while True:
+                if first_error is None and not cancelled and should_stop is not None and should_stop():
+                    cancelled = True
+
+                if first_error is None and not cancelled:
+                    for step in self.order:
+                        if len(running) >= self.max_workers:
+                            break
+                        if step in done or step in running.values():
+                            continue
+                        if all(dep in done for dep in self.dependencies[step]):
+                            context = contextvars.copy_context()
+                            running[pool.submit(context.run, run_step, step)] = step
+
+                if not running:
+                    break
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        first_error = first_error or error
+                        continue
+                    done.add(step)
+                    completed.append(step)
+
+        if first_error is not None:
+            raise first_error
+        if cancelled and len(done) < len(self.dependencies):
+            raise FlowCancelled(f"Flow cancelled after {len(done)} of {len(self.dependencies)} steps")
+        return completed
@@ -4,14 +4,33 @@ File   : backend_app/run_full_flow.py
 Authors: Itay Vazana & Oriya Even Chen
 
 Description:
-Runs the entire emotional analysis pipeline in sequential steps:
-- Executes each submodule script in order
-- Tracks current progress step in memory
-- Logs output to file
-- Supports real-time monitoring via get_current_step()
+Runs the entire emotional analysis pipeline as a dependency graph of steps:
+- Executes each submodule in-process through the resident pipeline engine
+  (or as separate child interpreters when in_process=False)
+- Starts every step as soon as the steps it depends on are done, so the independent
+  vision stages run in parallel (parallel=False keeps the classic sequential order)
+- Runs inside a job workspace (defaults to the classic shared_memory/ folder)
+- Tracks current progress step in memory (globally and per job)
+- Logs output to file (one contiguous block per step, in completion order)
+- Records wall time, CPU time and peak RSS per step (metrics_<timestamp>.jsonl next to the log)
+- Skips the pipeline when the same drawing was already analyzed with the same models
+  (result cache, see result_cache.py)
+- Opens the job's artifact store for the run, so stages pass crops in memory
+  (artifact_store.py); pending artifacts are written to disk when the flow ends
+- Skips steps whose code and inputs did not change since their last run in the same
+  workspace (incremental re-run, see stage_fingerprints.py)
+- Commits a completion marker (key + output manifest) after every successful step and keeps
+  a flow checkpoint, so a failed run can be resumed from its first incomplete step (resume=True)
+- Supports real-time monitoring via get_current_step() and per-job progress events
+  (flow / stage start and end with timings, see progress_events.py)
+- Applies the job's plot mode: diagnostic plots rendered, skipped or rendered on demand
+  (plots="all" / "none" / "on_demand", see plot_policy.py)
 """
 
+import io
+import os
 import sys
+import threading
 from pathlib import Path
 import subprocess
 from datetime import datetime
@@ -50,20 +69,78 @@ SCRIPT_PATHS = {
     "run_PDFG": "pdf_generator/run_PDFG.py"
 }
 
+from backend_app.pipeline_engine import get_engine
+from backend_app.flow_scheduler import FlowScheduler, FlowCancelled, STEP_DEPENDENCIES, MAX_PARALLEL_STEPS
+from backend_app.result_cache import get_result_cache, compute_cache_key
+from backend_app.metrics import track_stage, write_records, measure
+from backend_app.artifact_store import open_artifact_store, close_artifact_store
+from backend_app.progress_events import publish, drop_channel
+from backend_app.plot_policy import set_plot_mode, get_plot_mode, plot_variant, child_env, discard_plots
+from backend_app.inference_backend import backend_variants, backend_variant
+from backend_app.stage_fingerprints import (
+    compute_stage_keys, is_up_to_date, commit_stage, invalidate_stage, first_incomplete_step,
+    write_flow_checkpoint, read_flow_checkpoint
+)
+from backend_app.workspace import JobWorkspace, get_workspace, use_workspace
+
 BASE_DIR = PROJECT_ROOT
-FINAL_PDF = BASE_DIR / "shared_memory/7_PDFG_out/full_analysis_report.pdf"
-CURRENT_FLOW_STEP = "not_started"  # Global step tracker
+CURRENT_FLOW_STEP = "not_started"  # Global step tracker (last job that moved)
+JOB_FLOW_STEPS = {}                 # job_id -> current step (last step started)
+JOB_RUNNING_STEPS = {}              # job_id -> steps running right now
+_STEPS_LOCK = threading.Lock()
 
 
-def get_current_step() -> str:
+def get_current_step(job_id: str = None) -> str:
     """
+    Args:
+        job_id (str | None): Job to query. If omitted, returns the most recent step of any job.
+
     Returns:
         str: Name of the current step being executed (or "completed").
     """
+    if job_id is not None:
+        return JOB_FLOW_STEPS.get(job_id, "not_started")
     return CURRENT_FLOW_STEP
 
 
-def run_script(script_path: Path, script_alias: str, verbose: bool = False, log_file=None) -> None:
+def get_running_steps(job_id: str) -> list:
+    """
+    Returns:
+        list: Steps of the job executing right now (several while the vision stages run in parallel).
+    """
+    with _STEPS_LOCK:
+        return sorted(JOB_RUNNING_STEPS.get(job_id, ()))
+
+
+def forget_job(job_id: str) -> None:
+    """
+    Drops the progress entries (event channel, deferred plots) of a job that is no longer tracked.
+    """
+    with _STEPS_LOCK:
+        JOB_FLOW_STEPS.pop(job_id, None)
+        JOB_RUNNING_STEPS.pop(job_id, None)
+    drop_channel(job_id)
+    discard_plots(job_id)
+
+
+def _set_step(workspace: JobWorkspace, step: str) -> None:
+    global CURRENT_FLOW_STEP
+    with _STEPS_LOCK:
+        CURRENT_FLOW_STEP = step
+        JOB_FLOW_STEPS[workspace.job_id] = step
+
+
+def _mark_running(workspace: JobWorkspace, step: str, running: bool) -> None:
+    with _STEPS_LOCK:
+        steps = JOB_RUNNING_STEPS.setdefault(workspace.job_id, set())
+        if running:
+            steps.add(step)
+        else:
+            steps.discard(step)
+
+
+def run_script(script_path: Path, script_alias: str, verbose: bool = False, log_file=None,
+               workspace: JobWorkspace = None) -> None:
     """
     Runs a script by absolute path and logs output.
 
@@ -72,9 +149,15 @@ def run_script(script_path: Path, script_alias: str, verbose: bool = False, log_
         script_alias (str): Human-readable label of the step.
         verbose (bool): If True, prints stdout to console.
         log_file (file): Log file to append output.
+        workspace (JobWorkspace | None): Job workspace handed to the child process.
     """
     import platform
 
+    workspace = workspace or get_workspace()
+    env = dict(os.environ)
+    env.update(workspace.env())
+    env.update(child_env(workspace))
+
     header = f"[RUNNING] {script_path}"
     divider = "=" * len(header)
 
@@ -85,6 +168,7 @@ def run_script(script_path: Path, script_alias: str, verbose: bool = False, log_
     result = subprocess.run(
         [sys.executable, str(script_path.resolve())],
         cwd=BASE_DIR,
+        env=env,
         shell=(platform.system() == "Windows"),
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
@@ -112,59 +196,272 @@ def run_script(script_path: Path, script_alias: str, verbose: bool = False, log_
             log_file.write(f"[SUCCESS] Finished: {script_alias}\n\n")
 
 
-def run_analysis_flow(verbose: bool = True) -> dict:
+def run_analysis_flow(verbose: bool = True, in_process: bool = True, workspace: JobWorkspace = None,
+                      parallel: bool = True, use_cache: bool = True, cancel_event: threading.Event = None,
+                      incremental: bool = True, resume: bool = False, plots: str = None) -> dict:
     """
-    Executes the full SoulSketch pipeline, step-by-step.
+    Executes the full SoulSketch pipeline along the step dependency graph.
 
     Args:
         verbose (bool): Whether to print real-time output.
+        in_process (bool): Run stages inside the resident engine (default) instead of
+            starting a new interpreter per step.
+        workspace (JobWorkspace | None): Job workspace to analyze. Defaults to the
+            current workspace (shared_memory/ when no job is active).
+        parallel (bool): Run independent steps concurrently. If False, steps run one
+            at a time in FLOW_STEPS order.
+        use_cache (bool): Reuse the results of an identical earlier analysis, and store
+            the results of this one.
+        cancel_event (threading.Event | None): When set, no further step is started
+            and FlowCancelled is raised once the running steps are done.
+        incremental (bool): Skip steps that already ran in this workspace with the same
+            code and inputs (e.g. after editing templates only AG, JB_B and PDFG run again).
+        resume (bool): Restart a failed or cancelled flow of this workspace from its first
+            incomplete step (implies incremental; completed steps are kept).
+        plots (str | None): Plot mode - "all" (render every diagnostic plot), "none" (JSON results
+            only; the PDF leaves the plots out) or "on_demand" (render a plot only when the PDF stage
+            or a client requests it). Defaults to SOULSKETCH_PLOTS, else "all".
 
     Returns:
-        dict: {"final_step": "completed"}
+        dict: {"final_step": "completed", "job_id": ..., "final_pdf": ..., "cached": bool}
     """
-    global CURRENT_FLOW_STEP
+    workspace = workspace or get_workspace()
+    set_plot_mode(workspace, plots)
+    with use_workspace(workspace):
+        if resume:
+            incremental = True
+            _announce_resume(workspace)
+        return _run_flow(workspace, verbose, in_process, parallel, use_cache, cancel_event, incremental)
+
+
+def _stage_keys(workspace: JobWorkspace) -> dict:
+    """
+    Returns:
+        dict: Step -> stage key for the job's plot mode and the inference backend of each model.
+    """
+    return compute_stage_keys(workspace, STEP_DEPENDENCIES, FLOW_STEPS, plot_variant(workspace), backend_variants())
+
+
+def _cache_variant(workspace: JobWorkspace) -> str:
+    """
+    Returns:
+        str: Result cache key variant: plot mode and inference backends ("" for the defaults).
+    """
+    return "|".join(v for v in (plot_variant(workspace), backend_variant()) if v)
+
+
+def _announce_resume(workspace: JobWorkspace) -> None:
+    """
+    Reports where a resumed flow restarts (from the flow checkpoint and the stage markers).
+    """
+    checkpoint = read_flow_checkpoint(workspace) or {}
+    keys = _stage_keys(workspace)
+    restart_at = first_incomplete_step(workspace, keys, FLOW_STEPS)
+    previous = checkpoint.get("status", "no checkpoint")
+    if restart_at is None:
+        print(f"[RESUME] Previous flow: {previous}; every step is complete")
+    else:
+        done = FLOW_STEPS.index(restart_at)
+        print(f"[RESUME] Previous flow: {previous}; restarting at {restart_at} ({done}/{len(FLOW_STEPS)} steps kept)")
+    publish(workspace.job_id, "flow_resume", previous_status=previous,
+            failed_step=checkpoint.get("failed_step"), restart_at=restart_at)
+
+
+def _run_steps(workspace: JobWorkspace, verbose: bool, in_process: bool, parallel: bool, log_file,
+               records: list, cancel_event: threading.Event = None, incremental: bool = True) -> None:
+    """
+    Runs every pipeline step along the dependency graph, appending each step's output to the log
+    and its metrics record to records. With incremental=True, a step is skipped when its completion
+    marker matches and none of the steps it depends on ran in this flow.
+    The flow checkpoint is updated after every step and when the flow stops.
+    """
+    engine = get_engine() if in_process else None
+    if engine is not None and parallel:
+        # Stage imports swap modules in sys.modules; finish them before steps run concurrently
+        engine.warm_up()
+    log_lock = threading.Lock()
+    stage_keys = _stage_keys(workspace)
+    executed = set()
+    completed = []
+    failed = {}
+    write_flow_checkpoint(workspace, "running", completed)
+
+    def complete(step: str) -> None:
+        with log_lock:
+            completed.append(step)
+            write_flow_checkpoint(workspace, "running", list(completed))
+
+    def run_step(step: str) -> None:
+        with log_lock:
+            upstream_ran = any(dep in executed for dep in STEP_DEPENDENCIES[step])
+        if incremental and not upstream_ran and is_up_to_date(workspace, step, stage_keys[step]):
+            with log_lock:
+                log_file.write(f"\n[SKIP] {step}: code and inputs unchanged since its last run\n")
+                log_file.flush()
+            if verbose:
+                print(f"[SKIP] {step}: unchanged")
+            publish(workspace.job_id, "stage_skipped", stage=step)
+            complete(step)
+            return
+
+        # Steps may run side by side: buffer each one and append it to the log as a block
+        _set_step(workspace, step)
+        _mark_running(workspace, step, True)
+        step_log = io.StringIO()
+        record = None
+        invalidate_stage(workspace, step)
+        with log_lock:
+            executed.add(step)
+        publish(workspace.job_id, "stage_start", stage=step)
+        try:
+            with track_stage(step, workspace.job_id, measure_cpu=engine is not None) as record:
+                if engine is not None:
+                    engine.run_stage(step, verbose=verbose, log_file=step_log)
+                else:
+                    script_rel_path = SCRIPT_PATHS[step]
+                    full_script_path = BASE_DIR / script_rel_path
+                    run_script(full_script_path, step, verbose=verbose, log_file=step_log, workspace=workspace)
+        except Exception as e:
+            failed.setdefault("step", step)
+            failed.setdefault("error", str(e))
+            raise
+        finally:
+            _mark_running(workspace, step, False)
+            with log_lock:
+                if record is not None:
+                    records.append(record)
+                    step_log.write(record.summary_line() + "\n")
+                log_file.write(step_log.getvalue())
+                log_file.flush()
+            if record is not None:
+                publish(workspace.job_id, "stage_end", **{k: v for k, v in record.to_dict().items()
+                                                          if k not in ("job_id", "substeps")})
+
+        pending = open_artifact_store(workspace).pending_keys()
+        if commit_stage(workspace, step, stage_keys[step], pending):
+            complete(step)
+        else:
+            with log_lock:
+                log_file.write(f"\n[WARN] {step} finished without its outputs; not checkpointed\n")
+                log_file.flush()
+            print(f"[WARN] {step} finished without its outputs; not checkpointed")
+
+    scheduler = FlowScheduler(
+        STEP_DEPENDENCIES,
+        max_workers=MAX_PARALLEL_STEPS if parallel else 1,
+        step_order=FLOW_STEPS
+    )
+    try:
+        scheduler.run(run_step, should_stop=cancel_event.is_set if cancel_event is not None else None)
+    except FlowCancelled:
+        write_flow_checkpoint(workspace, "cancelled", list(completed))
+        raise
+    except Exception as e:
+        write_flow_checkpoint(workspace, "failed", list(completed), failed.get("step"), failed.get("error", str(e)))
+        raise
+    write_flow_checkpoint(workspace, "completed", list(completed))
+
 
+def _run_flow(workspace: JobWorkspace, verbose: bool, in_process: bool, parallel: bool, use_cache: bool,
+              cancel_event: threading.Event = None, incremental: bool = True) -> dict:
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    log_path = BASE_DIR / f"shared_memory/0_BE_out/flow_log_{timestamp}.txt"
+    log_path = workspace.log_dir / f"flow_log_{timestamp}.txt"
+    metrics_path = workspace.log_dir / f"metrics_{timestamp}.jsonl"
     log_path.parent.mkdir(parents=True, exist_ok=True)
+    final_pdf = workspace.final_pdf
+    records = []
 
     print("==================================================")
     print("[START] Starting Full Analysis Flow")
     print("==================================================")
 
-    with open(log_path, "w", encoding="utf-8") as log_file:
-        log_file.write("==================================================\n")
-        log_file.write("[START] Full Analysis Flow Log\n")
-        log_file.write(f"Started at: {timestamp}\n")
-        log_file.write("==================================================\n")
-
-        for step in FLOW_STEPS:
-            CURRENT_FLOW_STEP = step
-            script_rel_path = SCRIPT_PATHS[step]
-            full_script_path = BASE_DIR / script_rel_path
-            run_script(full_script_path, step, verbose=verbose, log_file=log_file)
-
-        # Final PDF check
-        log_file.write("\n==================================================\n")
-        if FINAL_PDF.exists() and FINAL_PDF.stat().st_size > 0:
-            with open(FINAL_PDF, "rb") as f:
-                first_page = f.read(1000).decode("latin1", errors="ignore")
-                if "PDF generation failed due to invalid input" in first_page:
-                    log_file.write("[WARNING] PDF fallback generated due to invalid input.\n")
-                else:
-                    log_file.write("[SUCCESS] Full PDF report generated successfully.\n")
-        else:
-            log_file.write("[ERROR] No PDF file found or file is empty.\n")
-        log_file.write("==================================================\n")
+    try:
+        with open(log_path, "w", encoding="utf-8") as log_file:
+            cached = _write_flow_log(workspace, timestamp, verbose, in_process, parallel, use_cache, log_file, records,
+                                     cancel_event, incremental)
+    finally:
+        write_records(metrics_path, records)
 
-    CURRENT_FLOW_STEP = "completed"
+    _set_step(workspace, "completed")
     print(f"[LOG] Log saved to: {log_path.resolve()}")
-    return {"final_step": "completed"}
+    return {
+        "final_step": "completed",
+        "job_id": workspace.job_id,
+        "final_pdf": str(final_pdf),
+        "cached": cached,
+        "metrics_path": str(metrics_path)
+    }
+
+
+def _write_flow_log(workspace: JobWorkspace, timestamp: str, verbose: bool, in_process: bool, parallel: bool,
+                    use_cache: bool, log_file, records: list, cancel_event: threading.Event = None,
+                    incremental: bool = True) -> bool:
+    """
+    Runs the flow (or restores it from the result cache) and writes the flow log.
+
+    Returns:
+        bool: True if the results came from the result cache.
+    """
+    final_pdf = workspace.final_pdf
+    log_file.write("==================================================\n")
+    log_file.write("[START] Full Analysis Flow Log\n")
+    log_file.write(f"Started at: {timestamp}\n")
+    log_file.write(f"Job: {workspace.job_id}\n")
+    log_file.write(f"Plots: {get_plot_mode(workspace)}\n")
+    log_file.write("==================================================\n")
+
+    flow_record = None
+    cached = False
+    try:
+        with track_stage("flow", workspace.job_id, measure_cpu=False) as flow_record:
+            cache = get_result_cache() if use_cache else None
+            cache_key = None
+            if cache is not None and workspace.input_image.is_file():
+                cache_key = compute_cache_key(workspace.input_image, _cache_variant(workspace))
+
+            cached = cache_key is not None and cache.restore(cache_key, workspace)
+            publish(workspace.job_id, "flow_start", cache_lookup=cache_key is not None)
+            if cached:
+                publish(workspace.job_id, "cache_hit", key=cache_key[:12])
+                print(f"[CACHE] Hit {cache_key[:12]}: results restored, pipeline skipped")
+                log_file.write(f"\n[CACHE] Hit {cache_key[:12]}: results restored, pipeline skipped\n")
+            else:
+                # In-process stages hand crops to each other in memory; child processes use files
+                open_artifact_store(workspace, deferred=in_process)
+                try:
+                    _run_steps(workspace, verbose, in_process, parallel, log_file, records, cancel_event, incremental)
+                finally:
+                    with measure("artifact_flush"):
+                        close_artifact_store(workspace)  # persist for the cache / history archive
+                if cache_key is not None and cache.store(cache_key, workspace):
+                    log_file.write(f"\n[CACHE] Results stored as {cache_key[:12]}\n")
+    finally:
+        if flow_record is not None:
+            records.append(flow_record)
+            publish(workspace.job_id, "flow_end", status=flow_record.status, cached=cached,
+                    wall_s=round(flow_record.wall_s, 4))
+            log_file.write(f"\n{flow_record.summary_line()}\n")
+
+    # Final PDF check
+    log_file.write("\n==================================================\n")
+    if final_pdf.exists() and final_pdf.stat().st_size > 0:
+        with open(final_pdf, "rb") as f:
+            first_page = f.read(1000).decode("latin1", errors="ignore")
+            if "PDF generation failed due to invalid input" in first_page:
+                log_file.write("[WARNING] PDF fallback generated due to invalid input.\n")
+            else:
+                log_file.write("[SUCCESS] Full PDF report generated successfully.\n")
+    else:
+        log_file.write("[ERROR] No PDF file found or file is empty.\n")
+    log_file.write("==================================================\n")
+    return cached
 
 
 if __name__ == "__main__":
     try:
-        run_analysis_flow(verbose=True)
+        # --full reruns every step, even those whose code and inputs did not change;
+        # --resume restarts a failed flow from its first incomplete step
+        run_analysis_flow(verbose=True, incremental="--full" not in sys.argv, resume="--resume" in sys.argv)
         print("\n[SUCCESS] Analysis pipeline completed successfully!")
         sys.exit(0)
     except Exception as e:
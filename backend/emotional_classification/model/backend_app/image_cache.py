@@ -0,0 +1,98 @@
+"""
+Project: SoulSketch
+File   : backend_app/image_cache.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Decoded-image cache of a job, shared by all stages.
+- The uploaded drawing (0_BE_input/original_input.png) is decoded once per flow; EMCLS,
+  OBJ_DET, FED and CEX read the decoded array instead of the file
+- Variants (RGB, grayscale, a stage's boosted / CLAHE / Canny preprocessing) are computed
+  on first request from another variant and memoized in the job's artifact store
+- Stages register the variants they need next to their preprocessing code
+  (register_variant), so their parameters stay in the stage
+- Every array served is read-only: copy it before drawing on it
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import cv2
+import numpy as np
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.artifact_store import get_artifact_store, _key
+
+# === CONFIGURATION ===
+INPUT_IMAGE_PARTS = ("0_BE_input", "original_input.png")
+BASE_VARIANT = "bgr"  # what cv2.imread returns
+
+# variant -> (source variant, transform)
+_VARIANTS: Dict[str, Tuple[str, Callable[[np.ndarray], np.ndarray]]] = {
+    "rgb": (BASE_VARIANT, lambda image: cv2.cvtColor(image, cv2.COLOR_BGR2RGB)),
+    "gray": (BASE_VARIANT, lambda image: cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+}
+_VARIANTS_LOCK = threading.Lock()
+
+
+def register_variant(name: str, source: str, transform: Callable[[np.ndarray], np.ndarray]) -> None:
+    """
+    Declares an image variant computed from another one.
+
+    Args:
+        name (str): Variant name (prefix stage-specific ones, e.g. "obj_det_edges").
+        source (str): Variant the transform receives ("bgr", "rgb", "gray" or a registered one).
+        transform (Callable): Function of the source array; must not modify it.
+    """
+    if name == BASE_VARIANT:
+        raise ValueError(f"'{BASE_VARIANT}' is the decoded image itself")
+    with _VARIANTS_LOCK:
+        _VARIANTS[name] = (source, transform)
+
+
+def get_image_variant(parts, variant: str = BASE_VARIANT) -> np.ndarray:
+    """
+    Returns a variant of a workspace image, decoding and converting it at most once per flow.
+
+    Args:
+        parts: Workspace-relative path of the image (str, Path or tuple of parts).
+        variant (str): "bgr", "rgb", "gray" or a registered variant.
+
+    Returns:
+        np.ndarray: Read-only array.
+
+    Raises:
+        FileNotFoundError: If the image does not exist.
+        KeyError: If the variant is not registered.
+    """
+    store = get_artifact_store()
+    key = _key(parts)
+
+    if variant == BASE_VARIANT:
+        image = store.memo(("image", key, BASE_VARIANT), lambda: store.get_image(key))
+        if image is None:
+            raise FileNotFoundError(f"Image not found at: {store.workspace.path(key)}")
+        return image
+
+    with _VARIANTS_LOCK:
+        source, transform = _VARIANTS[variant]
+    return store.memo(("image", key, variant), lambda: transform(get_image_variant(key, source)))
+
+
+def get_input_image(variant: str = BASE_VARIANT) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: A variant of the uploaded drawing of the current job (read-only).
+    """
+    return get_image_variant(INPUT_IMAGE_PARTS, variant)
@@ -0,0 +1,400 @@
+"""
+Project: SoulSketch
+File   : backend_app/inference_backend.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Inference backends of the three YOLO models (EMCLS classifier, OBJ_DET and FED detectors).
+- "torch" (default): the .pt checkpoint runs through eager PyTorch, as before
+- "onnx": the checkpoint is exported once to ONNX (in shared_memory/11_Models, re-exported when
+  the .pt is newer) and served by ONNX Runtime on CPU, through the same ultralytics API, so stages
+  keep their predict / result handling. Exports stay out of the stage folders, whose content is
+  the stages' code fingerprint
+- The backend of each model is part of the result cache key and of its stage key
+  (backend_variants), so switching backends never serves results of another one
+- Each stage picks its backend in its model_config (INFERENCE_BACKEND), defaulting to
+  SOULSKETCH_INFERENCE_BACKEND
+- "onnx-int8": the ONNX export is statically quantized to INT8 (QDQ, per-channel weights),
+  calibrated on an explicit folder of drawings (SOULSKETCH_CALIBRATION_DIR or --calibration-dir,
+  first CALIBRATION_SIZE images in name order), so the same folder always gives the same model.
+  The drawings used are recorded next to the model (<model>.int8.json), and a hash of the INT8
+  model is part of the stage and cache keys
+  (benchmarks/quantization_report.py compares its accuracy and speed with FP32)
+- ONNX Runtime threads: SOULSKETCH_ONNX_THREADS per session (default: the CPU cores shared by
+  the three vision stages that run in parallel)
+
+Usage:
+    python -m backend_app.inference_backend --export        # export the three models to ONNX
+    python -m backend_app.inference_backend --quantize --calibration-dir <drawings>  # ... and their INT8 versions
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.flow_scheduler import MAX_PARALLEL_STEPS
+from backend_app.workspace import SHARED_MEMORY_DIR
+from backend_app.result_cache import file_fingerprint
+
+# === CONFIGURATION ===
+BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_BACKEND = os.environ.get("SOULSKETCH_INFERENCE_BACKEND", "torch").lower()
+ONNX_THREADS = int(os.environ.get("SOULSKETCH_ONNX_THREADS", "0")) or max(1, (os.cpu_count() or 1) // MAX_PARALLEL_STEPS)
+ONNX_OPSET = 13  # per-channel QDQ quantization needs opset >= 13
+MODELS_FOLDER = "11_Models"
+EXPORT_DIR = SHARED_MEMORY_DIR / MODELS_FOLDER  # generated ONNX / INT8 models
+CALIBRATION_DIR = os.environ.get("SOULSKETCH_CALIBRATION_DIR")
+CALIBRATION_SIZE = 32  # drawings used to calibrate the INT8 activation ranges
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp"}
+
+# Stage -> (checkpoint relative to the project root, ultralytics task, export image size)
+YOLO_MODELS = {
+    "EMCLS": ("emotional_classification/model/Yolo_Classifier.pt", "classify", 224),
+    "OBJ_DET": ("object_detection/model/Yolo11s_HHT_trained.pt", "detect", 640),
+    "FED": ("facial_expressions_detection/model/Yolo11s_FED_trained.pt", "detect", 640)
+}
+
+# Stage -> flow step whose outputs its model produces
+BACKEND_STEPS = {"EMCLS": "run_yolo_EMCLS", "OBJ_DET": "run_OBJ_DET", "FED": "run_FED"}
+
+_EXPORT_LOCK = threading.Lock()
+
+
+def stage_backend(stage: str) -> str:
+    """
+    Returns:
+        str: Backend of a stage: SOULSKETCH_<STAGE>_BACKEND, else SOULSKETCH_INFERENCE_BACKEND.
+    """
+    backend = os.environ.get(f"SOULSKETCH_{stage}_BACKEND", DEFAULT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}' for {stage} (expected one of {BACKENDS})")
+    return backend
+
+
+def backend_variants() -> Dict[str, str]:
+    """
+    Returns:
+        Dict[str, str]: Flow step -> "backend=<name>" for the steps whose model does not run on
+        "torch" (torch keeps the keys unchanged). For "onnx-int8" the hash of the INT8 model is
+        added (its weights depend on the calibration drawings); the model is built if missing.
+    """
+    variants = {}
+    for stage, step in BACKEND_STEPS.items():
+        backend = stage_backend(stage)
+        if backend == "onnx-int8":
+            rel_path, task, imgsz = YOLO_MODELS[stage]
+            int8_path = quantize_onnx(PROJECT_ROOT / rel_path, task, imgsz)
+            variants[step] = f"backend={backend}:{file_fingerprint(int8_path)[:16]}"
+        elif backend != "torch":
+            variants[step] = f"backend={backend}"
+    return variants
+
+
+def backend_variant() -> str:
+    """
+    Returns:
+        str: Result cache key variant of the backends of the three models ("" if all run on torch).
+    """
+    variants = backend_variants()
+    return ",".join(f"{step}:{variants[step]}" for step in sorted(variants))
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+def onnx_path_for(pt_path) -> Path:
+    return EXPORT_DIR / Path(pt_path).with_suffix(".onnx").name
+
+
+def export_onnx(pt_path, task: str, imgsz: int, force: bool = False) -> Path:
+    """
+    Exports a YOLO checkpoint to ONNX, once: an existing export newer than the checkpoint is reused.
+
+    Args:
+        pt_path: Path to the .pt checkpoint.
+        task (str): ultralytics task ("classify" / "detect").
+        imgsz (int): Export input size (training size of the model).
+        force (bool): Export again even if the ONNX file is up to date.
+
+    Returns:
+        Path: The .onnx file (dynamic batch and image size).
+    """
+    from ultralytics import YOLO
+
+    pt_path = Path(pt_path)
+    onnx_path = onnx_path_for(pt_path)
+    with _EXPORT_LOCK:
+        if not force and onnx_path.is_file() and onnx_path.stat().st_mtime >= pt_path.stat().st_mtime:
+            return onnx_path
+        print(f"[INFO] Exporting {pt_path.name} to ONNX...")
+        exported = YOLO(str(pt_path), task=task).export(
+            format="onnx", imgsz=imgsz, dynamic=True, simplify=True, opset=ONNX_OPSET, device="cpu"
+        )
+        onnx_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(exported, onnx_path)  # ultralytics writes the export next to the .pt
+    return onnx_path
+
+
+# =============================================================================
+# INT8 QUANTIZATION
+# =============================================================================
+
+def int8_path_for(pt_path) -> Path:
+    return EXPORT_DIR / Path(pt_path).with_suffix(".int8.onnx").name
+
+
+def calibration_manifest_for(pt_path) -> Path:
+    return EXPORT_DIR / Path(pt_path).with_suffix(".int8.json").name
+
+
+def calibration_images(directory=CALIBRATION_DIR, limit: int = CALIBRATION_SIZE) -> list:
+    """
+    Args:
+        directory: Folder of calibration drawings (SOULSKETCH_CALIBRATION_DIR by default).
+        limit (int): Maximum number of drawings.
+
+    Returns:
+        List[Path]: The first `limit` drawings of the folder (recursive, in path order).
+
+    Raises:
+        ValueError: No calibration folder is set, or it holds no drawing.
+    """
+    if not directory:
+        raise ValueError("INT8 calibration needs a folder of drawings: set SOULSKETCH_CALIBRATION_DIR "
+                         "or run python -m backend_app.inference_backend --quantize --calibration-dir <folder>")
+    images = sorted(p for p in Path(directory).rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not images:
+        raise ValueError(f"No calibration drawing found in {directory}")
+    return images[:limit]
+
+
+def calibration_record(pt_path) -> list:
+    """
+    Returns:
+        List[str]: Drawings the INT8 model of a checkpoint was calibrated on ([] if unknown).
+    """
+    try:
+        with open(calibration_manifest_for(pt_path), encoding="utf-8") as f:
+            return json.load(f).get("calibration_images", [])
+    except (OSError, ValueError):
+        return []
+
+
+def _to_tensor(image: np.ndarray, imgsz: int) -> np.ndarray:
+    """BGR image -> 1x3ximgszximgsz float32 RGB in [0, 1], the layout the exported models take."""
+    import cv2
+
+    resized = cv2.resize(image, (imgsz, imgsz), interpolation=cv2.INTER_LINEAR)
+    rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+class _DrawingCalibrationReader:
+    """
+    onnxruntime CalibrationDataReader over calibration drawings, decoded one at a time.
+    Detector inputs also include the OBJ_DET edge image of every drawing, since the detector sees both.
+    """
+
+    def __init__(self, input_name: str, images: list, imgsz: int, with_edges: bool):
+        self.input_name = input_name
+        self.images = images
+        self.imgsz = imgsz
+        self.with_edges = with_edges
+        self.rewind()
+
+    def _batches(self):
+        import cv2
+        from object_detection.input_processor import preprocess_image
+
+        for path in self.images:
+            image = cv2.imread(str(path))
+            if image is None:
+                print(f"[WARN] Calibration drawing skipped (unreadable): {path}")
+                continue
+            yield {self.input_name: _to_tensor(image, self.imgsz)}
+            if self.with_edges:
+                yield {self.input_name: _to_tensor(preprocess_image(image), self.imgsz)}
+
+    def get_next(self):
+        return next(self._iter, None)
+
+    def rewind(self):
+        self._iter = self._batches()
+
+
+def quantize_onnx(pt_path, task: str, imgsz: int, images: list = None, force: bool = False) -> Path:
+    """
+    Statically quantizes the ONNX export of a checkpoint to INT8, once.
+
+    Args:
+        pt_path: Path to the .pt checkpoint (the FP32 export is created if needed).
+        task (str): ultralytics task ("classify" / "detect").
+        imgsz (int): Model input size.
+        images (list | None): Calibration drawings (defaults to calibration_images()), recorded
+            in the <model>.int8.json manifest.
+        force (bool): Quantize again even if the INT8 file is up to date.
+
+    Returns:
+        Path: The .int8.onnx file (with the metadata of the FP32 export: names, task, imgsz).
+    """
+    import onnx
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType, CalibrationMethod
+
+    fp32_path = export_onnx(pt_path, task, imgsz)
+    int8_path = int8_path_for(pt_path)
+    with _EXPORT_LOCK:
+        if not force and int8_path.is_file() and int8_path.stat().st_mtime >= fp32_path.stat().st_mtime:
+            return int8_path
+
+        images = images or calibration_images()
+        print(f"[INFO] Quantizing {fp32_path.name} to INT8 ({len(images)} calibration drawing(s))...")
+        input_name = ort.InferenceSession(str(fp32_path), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        reader = _DrawingCalibrationReader(input_name, images, imgsz, with_edges=task == "detect")
+        quantize_static(
+            str(fp32_path), str(int8_path), reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            calibrate_method=CalibrationMethod.MinMax
+        )
+
+        # ultralytics reads class names, task and image size from the model metadata
+        fp32_model, int8_model = onnx.load(str(fp32_path)), onnx.load(str(int8_path))
+        del int8_model.metadata_props[:]
+        int8_model.metadata_props.extend(fp32_model.metadata_props)
+        onnx.save(int8_model, str(int8_path))
+        with open(calibration_manifest_for(pt_path), "w", encoding="utf-8") as f:
+            json.dump({"model": int8_path.name,
+                       "calibration_images": [str(Path(image).resolve()) for image in images]}, f, indent=2)
+    return int8_path
+
+
+# =============================================================================
+# LOADING
+# =============================================================================
+
+def session_options(threads: int = None):
+    """
+    Returns:
+        onnxruntime.SessionOptions: CPU options (full graph optimization, fixed intra-op threads).
+    """
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = threads or ONNX_THREADS
+    options.inter_op_num_threads = 1
+    return options
+
+
+def _tune_onnx_session(model, onnx_path: Path, threads: int = None) -> None:
+    """
+    ultralytics opens its ONNX Runtime session with default options on the first predict:
+    run a tiny warm-up predict, then replace that session by one with our thread settings.
+    """
+    import onnxruntime as ort
+
+    model.predict(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+    backend = getattr(getattr(model, "predictor", None), "model", None)
+    if backend is None or not hasattr(backend, "session"):
+        print("[WARN] ONNX session not found on the predictor; default thread settings kept")
+        return
+    backend.session = ort.InferenceSession(str(onnx_path), sess_options=session_options(threads),
+                                           providers=["CPUExecutionProvider"])
+
+
+def load_yolo(stage: str, pt_path=None, backend: str = None, threads: int = None):
+    """
+    Loads the YOLO model of a stage with its configured backend.
+
+    Args:
+        stage (str): Key of YOLO_MODELS ("EMCLS", "OBJ_DET", "FED").
+        pt_path: Checkpoint path (defaults to YOLO_MODELS).
+        backend (str | None): "torch", "onnx" or "onnx-int8" (defaults to stage_backend(stage)).
+        threads (int | None): ONNX Runtime intra-op threads (defaults to ONNX_THREADS).
+
+    Returns:
+        YOLO: ultralytics model; predict() works the same with both backends.
+    """
+    from ultralytics import YOLO
+
+    rel_path, task, imgsz = YOLO_MODELS[stage]
+    pt_path = Path(pt_path) if pt_path else PROJECT_ROOT / rel_path
+    backend = backend or stage_backend(stage)
+
+    if backend == "torch":
+        return YOLO(str(pt_path), task=task)
+
+    if backend == "onnx-int8":
+        onnx_path = quantize_onnx(pt_path, task, imgsz)
+    else:
+        onnx_path = export_onnx(pt_path, task, imgsz)
+    print(f"[INFO] {stage}: ONNX Runtime {backend} backend ({threads or ONNX_THREADS} thread(s)) - {onnx_path.name}")
+    model = YOLO(str(onnx_path), task=task)
+    _tune_onnx_session(model, onnx_path, threads)
+    return model
+
+
+def yolo_warm_up(stage: str):
+    """
+    Returns:
+        Callable: Warm-up for the model registry - one dummy predict at the model's input size
+        (allocates the predictor and the first activation buffers before the first job).
+    """
+    imgsz = YOLO_MODELS[stage][2]
+
+    def warm_up(model) -> None:
+        model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), verbose=False)
+    return warm_up
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export the SoulSketch YOLO models to ONNX (and INT8).")
+    parser.add_argument("--export", action="store_true", help="Export every model (skips up-to-date exports)")
+    parser.add_argument("--quantize", action="store_true", help="Also build the INT8 models")
+    parser.add_argument("--force", action="store_true", help="Export again even if up to date")
+    parser.add_argument("--stages", nargs="*", choices=list(YOLO_MODELS), help="Subset of the models")
+    parser.add_argument("--calibration-dir", type=Path, default=CALIBRATION_DIR,
+                        help="Folder of calibration drawings (default: SOULSKETCH_CALIBRATION_DIR)")
+    args = parser.parse_args(argv)
+
+    if not (args.export or args.quantize or args.force):
+        parser.print_help()
+        return 0
+    for stage in args.stages or YOLO_MODELS:
+        rel_path, task, imgsz = YOLO_MODELS[stage]
+        path = export_onnx(PROJECT_ROOT / rel_path, task, imgsz, force=args.force)
+        print(f"[INFO] {stage}: {path}")
+        if args.quantize:
+            images = calibration_images(args.calibration_dir)
+            path = quantize_onnx(PROJECT_ROOT / rel_path, task, imgsz, images=images, force=args.force)
+            print(f"[INFO] {stage}: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
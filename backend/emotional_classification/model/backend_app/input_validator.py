@@ -9,10 +9,19 @@ Provides three key checks:
 1. File format validation
 2. Content visibility (whiteness test)
 3. Resolution threshold check
+
+The checks accept a file path or an already decoded PIL image, so an upload can be
+decoded once (decode_image_bytes) and validated without touching the disk.
+Pixel checks are NumPy array operations on the decoded image; large images can be
+checked on a seeded random sample of max_pixels pixels.
 """
 
+import io
 import sys
 from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
 from PIL import Image
 
 # === Auto-injected project root resolver ===
@@ -26,10 +35,43 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 
+ImageSource = Union[str, Path, Image.Image]
+
+
+def _open(image: ImageSource) -> Image.Image:
+    """Returns the image itself when already decoded, else opens the file."""
+    return image if isinstance(image, Image.Image) else Image.open(image)
+
+
 # =============================================================================
 # FORMAT VALIDATION
 # =============================================================================
 
+def decode_image_bytes(data: bytes, verbose: bool = True) -> Optional[Image.Image]:
+    """
+    Checks that raw bytes hold a valid image and decodes them once, in memory.
+
+    Args:
+        data (bytes): Encoded image (PNG, JPG, ...).
+        verbose (bool): Whether to print debug information.
+
+    Returns:
+        Image.Image | None: The decoded image (pixels loaded), or None if the format is invalid.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.verify()  # verify() leaves the image unusable: decode from the buffer again
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        if verbose:
+            print(f"[VALID FORMAT] ✅ Image is readable: {img.format} {img.size[0]}x{img.size[1]}")
+        return img
+    except Exception as e:
+        if verbose:
+            print(f"[VALID FORMAT] ❌ Invalid image format: {e}")
+        return None
+
+
 def is_valid_format(image_path: str, verbose: bool = True) -> bool:
     """
     Checks if the image file is in a valid and readable format.
@@ -56,44 +98,86 @@ def is_valid_format(image_path: str, verbose: bool = True) -> bool:
 # CONTENT VISIBILITY CHECK (WHITENESS)
 # =============================================================================
 
+# Default sample size of the whiteness check on uploads. Pixels are drawn independently and
+# uniformly (seeded, so a given image always gets the same answer): with 1M sampled pixels, the
+# standard error of the non-white percentage is below 0.01 points around the 1% threshold.
+# A regular grid would not give that bound: its stride can alias with regular thin-line drawings.
+WHITENESS_SAMPLE_PIXELS = 1_000_000
+WHITENESS_SAMPLE_SEED = 0
+SAMPLING_MIN_FACTOR = 4  # a random gather costs more than a full scan below ~4x the sample size
+
+
+def _random_sample(pixels: np.ndarray, max_pixels: Optional[int], seed: int = WHITENESS_SAMPLE_SEED) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: max_pixels pixels drawn uniformly at random (with replacement, fixed seed)
+        as an N x channels array; every pixel unless the image has more than
+        SAMPLING_MIN_FACTOR * max_pixels pixels.
+    """
+    pixels = pixels.reshape((-1, pixels.shape[-1]))
+    if not max_pixels or len(pixels) <= SAMPLING_MIN_FACTOR * max_pixels:
+        return pixels
+    rng = np.random.default_rng(seed)
+    return pixels[rng.integers(0, len(pixels), max_pixels)]
+
+
+def non_white_percent(image_path: ImageSource, white_threshold: int = 245, max_pixels: int = None) -> float:
+    """
+    Percentage of pixels with at least one RGB channel below white_threshold.
+
+    Args:
+        image_path (str | Image.Image): Path to the image file, or the decoded image.
+        white_threshold (int): RGB value above which a channel is considered white.
+        max_pixels (int | None): Check a seeded random sample of this many pixels
+            (None = every pixel).
+
+    Returns:
+        float: Non-white pixel percentage (0-100).
+    """
+    img = _open(image_path)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    pixels = _random_sample(np.asarray(img), max_pixels)
+    if pixels.size == 0:
+        return 0.0
+    # A pixel is white only if all three channels are >= threshold
+    non_white = (pixels < white_threshold).any(axis=1)
+    return float(np.count_nonzero(non_white)) * 100.0 / non_white.size
+
+
 def is_mostly_white(
-    image_path: str,
+    image_path: ImageSource,
     white_threshold: int = 245,
     min_non_white_percent: float = 1.0,
-    verbose: bool = True
+    verbose: bool = True,
+    max_pixels: int = None
 ) -> bool:
     """
     Determines if the image lacks visual content (i.e., mostly white).
 
     Args:
-        image_path (str): Path to the image file.
+        image_path (str | Image.Image): Path to the image file, or the decoded image.
         white_threshold (int): RGB value above which a pixel is considered white.
         min_non_white_percent (float): Minimum required percentage of non-white pixels.
         verbose (bool): Whether to print debug information.
+        max_pixels (int | None): Estimate on a seeded random sample of this many pixels
+            (None = exact count over every pixel).
 
     Returns:
         bool: True if the image is mostly white (invalid), False if it has enough content.
     """
-    img = Image.open(image_path).convert('RGB')
-    pixels = list(img.getdata())
-    total_pixels = len(pixels)
-
-    non_white_pixels = sum(
-        1 for r, g, b in pixels if not (r >= white_threshold and g >= white_threshold and b >= white_threshold)
-    )
-
-    non_white_percent = (non_white_pixels / total_pixels) * 100
+    percent = non_white_percent(image_path, white_threshold, max_pixels)
     if verbose:
-        print(f"[WHITENESS CHECK] 🧪 Non-white pixel percentage: {round(non_white_percent, 2)}%")
+        print(f"[WHITENESS CHECK] 🧪 Non-white pixel percentage: {round(percent, 2)}%")
 
-    return non_white_percent < min_non_white_percent
+    return percent < min_non_white_percent
 
 # =============================================================================
 # RESOLUTION CHECK
 # =============================================================================
 
 def is_resolution_too_small(
-    image_path: str,
+    image_path: ImageSource,
     min_width: int = 128,
     min_height: int = 128,
     verbose: bool = True
@@ -102,7 +186,7 @@ def is_resolution_too_small(
     Checks whether the image resolution is too small.
 
     Args:
-        image_path (str): Path to the image file.
+        image_path (str | Image.Image): Path to the image file, or the decoded image.
         min_width (int): Minimum allowed width in pixels.
         min_height (int): Minimum allowed height in pixels.
         verbose (bool): Whether to print debug information.
@@ -110,8 +194,7 @@ def is_resolution_too_small(
     Returns:
         bool: True if resolution is below threshold, False otherwise.
     """
-    img = Image.open(image_path)
-    width, height = img.size
+    width, height = _open(image_path).size
 
     if verbose:
         print(f"[RESOLUTION CHECK] 📐 Image size: {width}x{height}")
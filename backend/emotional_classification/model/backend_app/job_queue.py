@@ -0,0 +1,297 @@
+"""
+Project: SoulSketch
+File   : backend_app/job_queue.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Queue of analysis jobs served by a fixed pool of worker threads.
+- submit() queues a job (its workspace already holds the uploaded image) and returns at once
+- ANALYSIS_WORKERS jobs run at the same time; bursts wait in the queue instead of being rejected
+- Each job keeps its own state, current step, timings and error
+- Queued jobs can be cancelled immediately; running jobs stop before their next step
+- Failed or cancelled jobs can be resumed: the flow restarts from the first step without
+  a completion marker (see stage_fingerprints.py)
+- Publishes job_queued / job_started / job_finished progress events
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.workspace import JobWorkspace
+from backend_app.flow_scheduler import FlowCancelled
+from backend_app.progress_events import publish
+from backend_app.full_flow_runner import run_analysis_flow, get_current_step, get_running_steps, forget_job
+
+# === CONFIGURATION ===
+ANALYSIS_WORKERS = int(os.environ.get("SOULSKETCH_ANALYSIS_WORKERS", "2"))
+JOB_HISTORY_LIMIT = 500  # finished jobs kept for status / download
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = "queued", "running", "completed", "failed", "cancelled"
+FINISHED_STATES = {COMPLETED, FAILED, CANCELLED}
+
+
+class Job:
+    """
+    One analysis request.
+
+    Attributes:
+        job_id (str): Identifier (same as the workspace job ID).
+        workspace (JobWorkspace): Workspace holding the input image and the outputs.
+        state (str): queued | running | completed | failed | cancelled.
+        error (str | None): Failure message.
+        result (dict | None): Return value of run_analysis_flow on success.
+    """
+
+    def __init__(self, workspace: JobWorkspace, options: Optional[dict] = None):
+        self.job_id = workspace.job_id
+        self.workspace = workspace
+        self.options = options or {}
+        self.state = QUEUED
+        self.error: Optional[str] = None
+        self.result: Optional[dict] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def to_dict(self) -> dict:
+        step = get_current_step(self.job_id) if self.state == RUNNING else self.state
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "step": step,
+            "running_steps": get_running_steps(self.job_id) if self.state == RUNNING else [],
+            "running": self.state == RUNNING,
+            "error": self.error,
+            "cached": bool(self.result and self.result.get("cached")),
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobQueue:
+    """
+    FIFO job queue with a pool of worker threads.
+
+    Attributes:
+        num_workers (int): Number of jobs analyzed at the same time.
+    """
+
+    def __init__(self, num_workers: int = ANALYSIS_WORKERS, runner: Callable[..., dict] = run_analysis_flow):
+        self.num_workers = max(1, num_workers)
+        self._runner = runner
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._started = False
+
+    def start(self) -> "JobQueue":
+        with self._lock:
+            if not self._started:
+                for i in range(self.num_workers):
+                    worker = threading.Thread(target=self._worker_loop, name=f"analysis-worker-{i}", daemon=True)
+                    worker.start()
+                    self._workers.append(worker)
+                self._started = True
+        return self
+
+    # ---- Submission / lookup ----
+
+    def submit(self, workspace: JobWorkspace, **options) -> Job:
+        """
+        Queues the analysis of a workspace.
+
+        Args:
+            workspace (JobWorkspace): Workspace with the uploaded image.
+            **options: Extra keyword arguments for run_analysis_flow (e.g. use_cache=False).
+
+        Returns:
+            Job: The queued job, or the existing one if it is still queued or running.
+        """
+        self.start()
+        with self._lock:
+            existing = self._jobs.get(workspace.job_id)
+            if existing is not None and not existing.finished:
+                return existing
+            job = Job(workspace, options)
+            self._jobs[job.job_id] = job
+            self._jobs.move_to_end(job.job_id)
+            self._prune()
+            position = sum(1 for j in self._jobs.values() if j.state == QUEUED)
+        publish(job.job_id, "job_queued", queue_position=position)
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """
+        Returns:
+            int | None: 1-based position among the queued jobs, or None if not queued.
+        """
+        with self._lock:
+            queued = [j for j in self._jobs.values() if j.state == QUEUED]
+        for index, job in enumerate(queued, start=1):
+            if job.job_id == job_id:
+                return index
+        return None
+
+    def status(self, job_id: str) -> Optional[dict]:
+        job = self.get(job_id)
+        if job is None:
+            return None
+        status = job.to_dict()
+        status["queue_position"] = self.position(job_id)
+        return status
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued job at once, or asks a running job to stop before its next step.
+
+        Returns:
+            bool: False if the job is unknown or already finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_event.set()
+            cancelled_now = job.state == QUEUED
+            if cancelled_now:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+        if cancelled_now:
+            publish(job_id, "job_finished", state=CANCELLED, error=None)
+        return True
+
+    def resume(self, job_id: str) -> Optional[Job]:
+        """
+        Queues a failed or cancelled job again, restarting from its first incomplete step.
+
+        Returns:
+            Job | None: The new job, or None if the job is unknown or not failed / cancelled.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in (FAILED, CANCELLED):
+                return None
+            options = dict(job.options, resume=True)
+        return self.submit(job.workspace, **options)
+
+    def stats(self) -> dict:
+        with self._lock:
+            states = [j.state for j in self._jobs.values()]
+        return {
+            "workers": self.num_workers,
+            **{state: states.count(state) for state in (QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED)}
+        }
+
+    def clear_finished(self, states=FINISHED_STATES) -> list:
+        """
+        Forgets every finished job in one of the given states.
+
+        Args:
+            states: Final states to clear (e.g. {COMPLETED} keeps failed jobs resumable).
+
+        Returns:
+            List[Job]: The jobs removed (their workspaces are left to the caller).
+        """
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.finished and job.state in states]
+            for job in finished:
+                del self._jobs[job.job_id]
+                forget_job(job.job_id)
+        return finished
+
+    # ---- Workers ----
+
+    def _worker_loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            if job.state != QUEUED:  # cancelled while waiting
+                return
+            job.state = RUNNING
+            job.started_at = time.time()
+        publish(job.job_id, "job_started")
+
+        try:
+            result = self._runner(workspace=job.workspace, cancel_event=job.cancel_event, **job.options)
+            state, error = COMPLETED, None
+        except FlowCancelled as e:
+            result, state, error = None, CANCELLED, str(e)
+        except Exception as e:
+            result, state, error = None, FAILED, str(e)
+
+        with self._lock:
+            job.result = result
+            job.state = state
+            job.error = error
+            job.finished_at = time.time()
+        publish(job.job_id, "job_finished", state=state, error=error,
+                wall_s=round(job.finished_at - job.started_at, 3), cached=bool(result and result.get("cached")))
+
+    def _prune(self) -> None:
+        """Forgets the oldest finished jobs beyond JOB_HISTORY_LIMIT (caller holds the lock)."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - JOB_HISTORY_LIMIT)]:
+            del self._jobs[job_id]
+            forget_job(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the workers after the jobs already queued.
+        """
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+
+_JOB_QUEUE: Optional[JobQueue] = None
+_JOB_QUEUE_LOCK = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Returns:
+        JobQueue: The process-wide job queue (workers start on first submission).
+    """
+    global _JOB_QUEUE
+    with _JOB_QUEUE_LOCK:
+        if _JOB_QUEUE is None:
+            _JOB_QUEUE = JobQueue()
+    return _JOB_QUEUE
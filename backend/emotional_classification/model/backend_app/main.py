@@ -6,6 +6,9 @@ Authors: Itay Vazana & Oriya Even Chen
 Description:
 Runs the full analysis pipeline on a drawing image and returns a path to a ZIP file
 containing the final PDF and flow log. This version does not use FastAPI or any server.
+Each call runs in its own job workspace, so several analyses may run at the same time.
+A workspace whose flow failed is kept, so the call can be repeated with resume_job_id
+to restart from the first incomplete step.
 """
 
 import traceback
@@ -14,14 +17,14 @@ import zipfile
 from pathlib import Path
 from backend_app.full_flow_runner import run_analysis_flow, get_current_step
 from backend_app.upload_image import upload_image_to_shared
+from backend_app.workspace import SHARED_MEMORY_DIR, create_job_workspace, get_job_workspace, use_workspace
 from shared_memory.clean_and_archive_current_data import (
     archive_current_process,
-    clean_all_except_history
+    EXCLUDED_FOLDER
 )
 
 # Paths
-FINAL_PDF = Path("8_Shared_Memory/7_PDFG_out/full_analysis_report.pdf")
-LOG_DIR = Path("8_Shared_Memory/0_BE_out")
+HISTORY_DIR = SHARED_MEMORY_DIR / EXCLUDED_FOLDER
 
 
 def describe_step(step: str) -> str:
@@ -40,44 +43,54 @@ def describe_step(step: str) -> str:
     return mapping.get(step, "Processing...")
 
 
-def get_latest_log_file() -> Path | None:
-    log_files = sorted(LOG_DIR.glob("flow_log_*.txt"), key=lambda f: f.stat().st_mtime, reverse=True)
+def get_latest_log_file(log_dir: Path) -> Path | None:
+    log_files = sorted(log_dir.glob("flow_log_*.txt"), key=lambda f: f.stat().st_mtime, reverse=True)
     return log_files[0] if log_files else None
 
 
-def run_full_analysis(input_image_path: str, drawing_id: str = "unknown") -> dict:
+def run_full_analysis(input_image_path: str, drawing_id: str = "unknown", resume_job_id: str = None) -> dict:
     """
     Uploads an image, runs the full analysis flow, and returns the path to the resulting ZIP file.
+    With resume_job_id, the failed job's workspace is reused (no upload) and the flow restarts
+    from its first incomplete step.
     """
+    workspace = get_job_workspace(resume_job_id) if resume_job_id else create_job_workspace()
+    if workspace is None:
+        return {"success": False, "error": f"Unknown job: {resume_job_id}"}
+    keep_workspace = False
     try:
-        # Step 1: Upload and validate the image into shared memory
-        result = upload_image_to_shared(input_image_path)
-        if not result["success"]:
-            return {"success": False, "error": result["error"]}
-
-        # Step 2: Run the analysis
-        run_analysis_flow()
+        with use_workspace(workspace):
+            # Step 1: Upload and validate the image into the job workspace
+            if not resume_job_id:
+                result = upload_image_to_shared(input_image_path)
+                if not result["success"]:
+                    return {"success": False, "error": result["error"]}
+
+            # Step 2: Run the analysis (a failed flow keeps its workspace for a resume)
+            keep_workspace = True
+            run_analysis_flow(workspace=workspace, resume=bool(resume_job_id))
+            keep_workspace = False
 
         # Step 3: Check output
-        if FINAL_PDF.exists() and FINAL_PDF.stat().st_size > 0:
-            latest_log = get_latest_log_file()
+        final_pdf = workspace.final_pdf
+        if final_pdf.exists() and final_pdf.stat().st_size > 0:
+            latest_log = get_latest_log_file(workspace.log_dir)
 
             # Step 4: Create ZIP file with PDF and log
             tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".zip")
             with zipfile.ZipFile(tmp, "w") as zipf:
-                zipf.write(FINAL_PDF, arcname="full_analysis_report.pdf")
+                zipf.write(final_pdf, arcname="full_analysis_report.pdf")
                 if latest_log:
                     zipf.write(latest_log, arcname="flow_log.txt")
 
-            # Step 5: Archive and clean
-            base_shared = FINAL_PDF.parent.parent
-            archive_current_process(base_shared)
-            clean_all_except_history(base_shared)
+            # Step 5: Archive the job
+            archive_current_process(workspace.root, history_dir=HISTORY_DIR, tag=workspace.job_id)
 
             return {
                 "success": True,
+                "job_id": workspace.job_id,
                 "zip_path": tmp.name,
-                "step_description": describe_step(get_current_step())
+                "step_description": describe_step(get_current_step(workspace.job_id))
             }
 
         else:
@@ -85,4 +98,12 @@ def run_full_analysis(input_image_path: str, drawing_id: str = "unknown") -> dic
 
     except Exception as e:
         traceback.print_exc()
-        return {"success": False, "error": str(e)}
+        failure = {"success": False, "error": str(e)}
+        if keep_workspace:
+            failure["job_id"] = workspace.job_id  # pass as resume_job_id to retry
+        return failure
+
+    finally:
+        # Step 6: Drop the job workspace (the history snapshot is kept)
+        if not keep_workspace:
+            workspace.remove()
@@ -0,0 +1,323 @@
+"""
+Project: SoulSketch
+File   : backend_app/metrics.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Per-stage timing and resource metrics for the SoulSketch pipeline.
+- track_stage(): wall time, CPU time and peak RSS of one pipeline step (or the whole flow)
+- measure(): the same for a sub-step inside a stage (model load, inference, plotting,
+  disk writes, ...); a no-op when no stage is being tracked (e.g. a stage run as a script)
+- Every finished flow writes its records as JSON lines next to the flow log
+- A process-wide registry keeps the latest records and aggregates them into
+  p50 / p95 / p99 and a wall-time histogram per stage and sub-step (served by /api/metrics)
+- Finished sub-steps are also published as progress events of the job (progress_events.py)
+
+Notes:
+- CPU time is the CPU time of the thread running the stage (time.thread_time), so stages
+  running side by side do not count each other; work done in native worker threads
+  (e.g. torch intra-op threads) is not included.
+- RSS is a process-wide figure: peak_rss_mb is the highest resident set size sampled
+  while the stage ran, shared with whatever else ran at the same time.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.progress_events import publish
+
+# === CONFIGURATION ===
+METRICS_WINDOW = 1000                # records kept per stage / sub-step for the aggregates
+RSS_SAMPLE_INTERVAL = 0.05           # seconds
+PERCENTILES = (50, 95, 99)
+WALL_HISTOGRAM_EDGES = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]  # seconds; last bucket is open
+
+
+# =============================================================================
+# RESIDENT SET SIZE
+# =============================================================================
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """
+    Returns:
+        int: Current resident set size of this process (0 if it cannot be read).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil  # installed with ultralytics
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+class RssSampler:
+    """
+    Background thread recording the highest RSS seen between start() and stop().
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> None:
+        self.peak = max(self.peak, current_rss_bytes())
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "RssSampler":
+        self._sample()
+        self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> int:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        return self.peak
+
+
+# =============================================================================
+# RECORDS
+# =============================================================================
+
+class StageRecord:
+    """
+    Metrics of one pipeline step (or of the whole flow) of one job.
+
+    Attributes:
+        stage (str): Step name (e.g. 'run_OBJ_DET', or 'flow' for the whole run).
+        job_id (str): Job the step belonged to.
+        status (str): 'success' or 'error'.
+        substeps (List[dict]): Sub-step measurements, in execution order.
+    """
+
+    def __init__(self, stage: str, job_id: str):
+        self.stage = stage
+        self.job_id = job_id
+        self.started_at = time.time()
+        self.wall_s = 0.0
+        self.cpu_s = None
+        self.peak_rss_mb = 0.0
+        self.status = "success"
+        self.substeps: List[dict] = []
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "job_id": self.job_id,
+            "started_at": round(self.started_at, 3),
+            "status": self.status,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": None if self.cpu_s is None else round(self.cpu_s, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "substeps": self.substeps
+        }
+
+    def summary_line(self) -> str:
+        cpu = "n/a" if self.cpu_s is None else f"{self.cpu_s:.2f}s"
+        return f"[METRICS] {self.stage}: wall={self.wall_s:.2f}s cpu={cpu} peak_rss={self.peak_rss_mb:.0f}MB"
+
+
+_CURRENT_RECORD: contextvars.ContextVar = contextvars.ContextVar("soulsketch_stage_record", default=None)
+
+
+@contextmanager
+def track_stage(stage: str, job_id: str, measure_cpu: bool = True):
+    """
+    Measures a pipeline step and registers the record when it ends.
+
+    Args:
+        stage (str): Step name.
+        job_id (str): Job identifier.
+        measure_cpu (bool): False when the work happens in a child process
+            (the CPU time of this thread would be meaningless).
+
+    Yields:
+        StageRecord: The record being filled (sub-steps are attached to it).
+    """
+    record = StageRecord(stage, job_id)
+    token = _CURRENT_RECORD.set(record)
+    sampler = RssSampler().start()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield record
+    except BaseException:
+        record.status = "error"
+        raise
+    finally:
+        record.wall_s = time.perf_counter() - wall_start
+        if measure_cpu:
+            record.cpu_s = time.thread_time() - cpu_start
+        record.peak_rss_mb = sampler.stop() / (1024 * 1024)
+        _CURRENT_RECORD.reset(token)
+        get_registry().add(record)
+
+
+@contextmanager
+def measure(name: str):
+    """
+    Measures a sub-step of the stage currently being tracked, e.g.:
+
+        with measure("inference"):
+            results = model.predict(...)
+
+    Does nothing when no stage is tracked in this context.
+    """
+    record = _CURRENT_RECORD.get()
+    if record is None:
+        yield
+        return
+
+    sampler = RssSampler().start()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        substep = {
+            "name": name,
+            "wall_s": round(time.perf_counter() - wall_start, 4),
+            "cpu_s": round(time.thread_time() - cpu_start, 4),
+            "peak_rss_mb": round(sampler.stop() / (1024 * 1024), 1)
+        }
+        record.substeps.append(substep)
+        publish(record.job_id, "substep", stage=record.stage, **substep)
+
+
+def write_records(path: Path, records: List[StageRecord]) -> None:
+    """
+    Appends records to a JSON lines file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record.to_dict()) + "\n")
+
+
+# =============================================================================
+# AGGREGATION
+# =============================================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _distribution(values: List[float]) -> dict:
+    values = sorted(values)
+    summary = {f"p{p}": round(percentile(values, p), 4) for p in PERCENTILES}
+    summary["mean"] = round(sum(values) / len(values), 4) if values else 0.0
+    summary["max"] = round(values[-1], 4) if values else 0.0
+    return summary
+
+
+def _wall_histogram(values: List[float]) -> Dict[str, int]:
+    labels = [f"<={edge}s" for edge in WALL_HISTOGRAM_EDGES] + [f">{WALL_HISTOGRAM_EDGES[-1]}s"]
+    counts = [0] * len(labels)
+    for value in values:
+        index = next((i for i, edge in enumerate(WALL_HISTOGRAM_EDGES) if value <= edge), len(WALL_HISTOGRAM_EDGES))
+        counts[index] += 1
+    return dict(zip(labels, counts))
+
+
+class MetricsRegistry:
+    """
+    Keeps the most recent measurements per stage and per 'stage/sub-step'.
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _append(self, key: str, sample: dict) -> None:
+        self._samples.setdefault(key, deque(maxlen=self.window)).append(sample)
+
+    def add(self, record: StageRecord) -> None:
+        with self._lock:
+            if record.status != "success":
+                self._errors[record.stage] = self._errors.get(record.stage, 0) + 1
+                return
+            self._append(record.stage, {
+                "wall_s": record.wall_s, "cpu_s": record.cpu_s, "peak_rss_mb": record.peak_rss_mb
+            })
+            for sub in record.substeps:
+                self._append(f"{record.stage}/{sub['name']}", sub)
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: key -> {"count", "errors", "wall_s", "cpu_s", "peak_rss_mb", "wall_histogram"}
+        """
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+            errors = dict(self._errors)
+
+        summary = {}
+        for key, samples in sorted(snapshot.items()):
+            walls = [s["wall_s"] for s in samples]
+            cpus = [s["cpu_s"] for s in samples if s.get("cpu_s") is not None]
+            summary[key] = {
+                "count": len(samples),
+                "errors": errors.get(key, 0),
+                "wall_s": _distribution(walls),
+                "cpu_s": _distribution(cpus) if cpus else None,
+                "peak_rss_mb": _distribution([s["peak_rss_mb"] for s in samples]),
+                "wall_histogram": _wall_histogram(walls)
+            }
+        for key, count in errors.items():
+            summary.setdefault(key, {"count": 0, "errors": count})
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._errors.clear()
+
+
+_REGISTRY = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Returns:
+        MetricsRegistry: The process-wide metrics registry.
+    """
+    return _REGISTRY
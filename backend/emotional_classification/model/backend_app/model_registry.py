@@ -0,0 +1,226 @@
+"""
+Project: SoulSketch
+File   : backend_app/model_registry.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Process-wide registry of the models used by the pipeline stages.
+- Stages register a loader (and a warm-up) at import; nothing is loaded until first use
+- A model is loaded once, warmed with a dummy inference and shared by every job; a resident
+  model is handed out without waiting for other models being loaded (e.g. a first ONNX export)
+- use_model() hands out the model for one inference section: calls on the same model are
+  serialized (ultralytics predictors are not thread-safe), different models run in parallel
+- Each model's RAM cost is measured as the RSS growth of its load; when the total exceeds
+  SOULSKETCH_MODEL_RAM_MB, the least recently used idle models are unloaded
+  (they are loaded again on next use)
+"""
+
+import gc
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.metrics import current_rss_bytes
+
+# === CONFIGURATION ===
+MODEL_RAM_BUDGET_MB = int(os.environ.get("SOULSKETCH_MODEL_RAM_MB", "0"))  # 0 = no limit
+
+
+class ModelEntry:
+    """
+    A registered model and its usage state.
+
+    Attributes:
+        name (str): Registry key (e.g. "OBJ_DET").
+        loader (Callable): Returns the loaded model.
+        warm_up (Callable | None): Runs a dummy inference on a freshly loaded model.
+        model (Any): Loaded model, or None.
+        size_bytes (int): RSS growth measured when it was loaded.
+        last_used (float): time.monotonic() of the last use (LRU order).
+        users (int): Callers currently inside use_model() (never unloaded while > 0).
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any], warm_up: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.loader = loader
+        self.warm_up = warm_up
+        self.model = None
+        self.size_bytes = 0
+        self.last_used = 0.0
+        self.users = 0
+        self.use_lock = threading.Lock()
+        self.load_lock = threading.Lock()  # one load of this model at a time
+
+
+class ModelRegistry:
+    """
+    Lazy, thread-safe model registry with an LRU RAM budget.
+    """
+
+    def __init__(self, budget_mb: int = MODEL_RAM_BUDGET_MB):
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._measure_lock = threading.Lock()  # loads measured one at a time, so RSS deltas are per model
+
+    def register(self, name: str, loader: Callable[[], Any], warm_up: Optional[Callable[[Any], None]] = None) -> None:
+        """
+        Declares a model. Registering a name again (stage re-imported) keeps a loaded model.
+
+        Args:
+            name (str): Registry key.
+            loader (Callable): Function returning the loaded model.
+            warm_up (Callable | None): Function running a dummy inference on the model.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self._entries[name] = ModelEntry(name, loader, warm_up)
+            else:
+                entry.loader, entry.warm_up = loader, warm_up
+
+    def _entry(self, name: str) -> ModelEntry:
+        with self._lock:
+            if name not in self._entries:
+                raise KeyError(f"Model '{name}' is not registered")
+            return self._entries[name]
+
+    def load(self, name: str) -> Any:
+        """
+        Loads and warms a model if it is not resident.
+
+        Returns:
+            Any: The model. Use it through use_model() for inference.
+        """
+        entry = self._entry(name)
+        with self._lock:
+            if entry.model is not None:  # resident: no load lock on the inference path
+                entry.last_used = time.monotonic()
+                return entry.model
+
+        with entry.load_lock:
+            with self._lock:
+                model = entry.model
+            if model is None:
+                with self._measure_lock:
+                    print(f"[INFO] Loading model {name}...")
+                    rss_before = current_rss_bytes()
+                    start = time.perf_counter()
+                    model = entry.loader()
+                    if entry.warm_up is not None:
+                        entry.warm_up(model)
+                    size_bytes = max(0, current_rss_bytes() - rss_before)
+                with self._lock:
+                    entry.model, entry.size_bytes = model, size_bytes
+                print(f"[INFO] Model {name} ready in {time.perf_counter() - start:.1f}s "
+                      f"(+{size_bytes / 2 ** 20:.0f} MB)")
+            with self._lock:
+                entry.last_used = time.monotonic()
+        self._enforce_budget()
+        return model
+
+    @contextmanager
+    def use(self, name: str):
+        """
+        Context manager giving exclusive use of a model (loaded on demand) for one inference section.
+        """
+        entry = self._entry(name)
+        with self._lock:
+            entry.users += 1  # pinned: not evicted between load and use
+        try:
+            model = self.load(name)
+            with entry.use_lock:
+                yield model
+        finally:
+            with self._lock:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+    def warm_up(self, names=None) -> None:
+        """
+        Loads the given models (all registered by default) ahead of the first job.
+        """
+        with self._lock:
+            names = list(names or self._entries)
+        for name in names:
+            self.load(name)
+
+    def unload(self, name: str) -> bool:
+        """
+        Drops a resident model unless it is in use.
+
+        Returns:
+            bool: True if the model was unloaded.
+        """
+        entry = self._entry(name)
+        with self._lock:
+            if entry.model is None or entry.users:
+                return False
+            entry.model = None
+        print(f"[INFO] Unloaded model {name} (~{entry.size_bytes / 2 ** 20:.0f} MB)")
+        entry.size_bytes = 0
+        gc.collect()
+        return True
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(e.size_bytes for e in self._entries.values() if e.model is not None)
+
+    def _enforce_budget(self) -> None:
+        """Unloads the least recently used idle models while the budget is exceeded."""
+        if not self.budget_bytes:
+            return
+        while self.resident_bytes() > self.budget_bytes:
+            with self._lock:
+                loaded = sorted((e for e in self._entries.values() if e.model is not None),
+                                key=lambda e: e.last_used)
+                # the most recently used model stays, even alone above the budget
+                idle = [e for e in loaded[:-1] if not e.users]
+            if not idle or not self.unload(idle[0].name):
+                print(f"[WARN] Models use {self.resident_bytes() / 2 ** 20:.0f} MB, above the "
+                      f"{self.budget_bytes / 2 ** 20:.0f} MB budget, but none can be unloaded")
+                return
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Returns:
+            Dict[str, dict]: Per model: loaded, size_mb, users.
+        """
+        with self._lock:
+            return {
+                name: {"loaded": e.model is not None, "size_mb": round(e.size_bytes / 2 ** 20, 1), "users": e.users}
+                for name, e in self._entries.items()
+            }
+
+
+_REGISTRY = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    return _REGISTRY
+
+
+def register_model(name: str, loader: Callable[[], Any], warm_up: Optional[Callable[[Any], None]] = None) -> None:
+    _REGISTRY.register(name, loader, warm_up)
+
+
+def use_model(name: str):
+    """
+    Returns:
+        Context manager yielding the model `name`, loaded on demand, for exclusive use.
+    """
+    return _REGISTRY.use(name)
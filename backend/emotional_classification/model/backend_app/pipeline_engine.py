@@ -0,0 +1,348 @@
+"""
+Project: SoulSketch
+File   : backend_app/pipeline_engine.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Resident in-process execution engine for the SoulSketch pipeline.
+- Imports every stage script once as a regular module and calls its entry point
+- Keeps loaded stages alive across runs; their models live in the model registry
+  (model_registry.py), loaded on first use or by warm_up()
+- Isolates the per-stage bare imports (model/, save_to_shared, input_processor, ...)
+  so modules with the same name in different stage folders never clash
+- Captures the printed output of each stage into the flow log, per thread
+"""
+
+import sys
+import threading
+import traceback
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, Optional
+
+from backend_app.plot_lock import PLOT_LOCK
+from backend_app.model_registry import get_model_registry
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# === CONFIGURATION ===
+
+# Stage name -> (script path relative to project root, entry point function name)
+STAGE_ENTRY_POINTS = {
+    "run_yolo_EMCLS": ("emotional_classification/run_yolo_EMCLS.py", "main"),
+    "run_OBJ_DET": ("object_detection/run_OBJ_DET.py", "main"),
+    "run_FED": ("facial_expressions_detection/run_FED.py", "main"),
+    "run_CEX": ("colors_extractor/run_CEX.py", "main"),
+    "run_JB_A": ("json_builder/run_JB_A.py", "run_json_builder_part_a"),
+    "run_AG": ("analysis_generator/run_AG.py", "main"),
+    "run_JB_B": ("json_builder/run_JB_B.py", "run_json_builder_part_b"),
+    "run_PDFG": ("pdf_generator/run_PDFG.py", "run_pdf_generation")
+}
+
+# Top-level packages that are imported by their qualified name and must stay shared
+SHARED_PACKAGES = {"backend_app"}
+
+_IMPORT_LOCK = threading.RLock()
+
+
+# =============================================================================
+# OUTPUT CAPTURE
+# =============================================================================
+
+class _ThreadOutputRouter:
+    """
+    Replacement for sys.stdout / sys.stderr that sends writes from a thread
+    to that thread's active sink (if any) and everything else to the original stream.
+    """
+
+    def __init__(self, original):
+        self._original = original
+        self._local = threading.local()
+
+    def push_sink(self, sink: Callable[[str], None]) -> None:
+        stack = getattr(self._local, "sinks", None)
+        if stack is None:
+            stack = self._local.sinks = []
+        stack.append(sink)
+
+    def pop_sink(self) -> None:
+        self._local.sinks.pop()
+
+    def write(self, text: str) -> int:
+        stack = getattr(self._local, "sinks", None)
+        if stack:
+            stack[-1](text)
+            return len(text)
+        return self._original.write(text)
+
+    def flush(self) -> None:
+        self._original.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._original, name)
+
+
+def _install_router(stream_name: str) -> _ThreadOutputRouter:
+    stream = getattr(sys, stream_name)
+    if not isinstance(stream, _ThreadOutputRouter):
+        stream = _ThreadOutputRouter(stream)
+        setattr(sys, stream_name, stream)
+    return stream
+
+
+class StageOutputCapture:
+    """
+    Context manager that collects everything the current thread prints while a stage runs.
+    Output is appended to the flow log (if given) and echoed to the console when verbose.
+    """
+
+    def __init__(self, log_file=None, verbose: bool = False):
+        self.log_file = log_file
+        self.verbose = verbose
+        self.chunks = []
+        self._console = None
+
+    def _sink(self, text: str) -> None:
+        self.chunks.append(text)
+        if self.log_file:
+            self.log_file.write(text)
+        if self.verbose and self._console is not None:
+            self._console.write(text)
+
+    def __enter__(self):
+        with _IMPORT_LOCK:
+            self._stdout = _install_router("stdout")
+            self._stderr = _install_router("stderr")
+        self._console = self._stdout._original
+        self._stdout.push_sink(self._sink)
+        self._stderr.push_sink(self._sink)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stdout.pop_sink()
+        self._stderr.pop_sink()
+        return False
+
+    @property
+    def output(self) -> str:
+        return "".join(self.chunks)
+
+
+# =============================================================================
+# ISOLATED STAGE IMPORTS
+# =============================================================================
+
+def _is_environment_path(path: Path) -> bool:
+    """Returns True for files that belong to an installed environment (e.g. a .venv inside the project)."""
+    return any(part in ("site-packages", "dist-packages") for part in path.parts)
+
+
+def _is_stage_local(name: str, module) -> bool:
+    """
+    Checks whether a loaded module was imported from a stage folder by a bare name
+    (e.g. 'save_to_shared', 'model.model_config') and must therefore not leak into
+    other stages.
+    """
+    if module is None or name.split(".")[0] in SHARED_PACKAGES:
+        return False
+
+    locations = []
+    module_file = getattr(module, "__file__", None)
+    if module_file:
+        locations.append(module_file)
+    else:
+        locations.extend(getattr(module, "__path__", []) or [])
+
+    for location in locations:
+        try:
+            path = Path(location).resolve()
+        except (TypeError, OSError):
+            continue
+        if PROJECT_ROOT in path.parents and not _is_environment_path(path):
+            return True
+    return False
+
+
+def load_stage_module(stage_name: str, script_path: Path) -> ModuleType:
+    """
+    Imports a stage script as a module, with its folder first on sys.path (as when it runs
+    as a script) and with its bare local imports kept out of the shared sys.modules.
+
+    Args:
+        stage_name (str): Pipeline step name, used to build a unique module name.
+        script_path (Path): Absolute path of the stage script.
+
+    Returns:
+        ModuleType: The executed stage module.
+    """
+    script_dir = str(script_path.parent)
+    module_name = f"soulsketch_stage_{stage_name}"
+
+    with _IMPORT_LOCK:
+        stashed = {name: mod for name, mod in list(sys.modules.items()) if _is_stage_local(name, mod)}
+        for name in stashed:
+            del sys.modules[name]
+
+        sys.path.insert(0, script_dir)
+        try:
+            spec = importlib.util.spec_from_file_location(module_name, script_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        finally:
+            sys.path.remove(script_dir)
+            for name, mod in list(sys.modules.items()):
+                if _is_stage_local(name, mod):
+                    del sys.modules[name]
+            sys.modules.update(stashed)
+
+    return module
+
+
+class StageModule:
+    """
+    A pipeline stage loaded once and kept resident.
+
+    Attributes:
+        name (str): Pipeline step name (e.g. 'run_OBJ_DET').
+        script_path (Path): Absolute path of the stage script.
+        entry_point (str): Name of the function executed for each run.
+        module (ModuleType | None): Loaded module, or None until first use.
+    """
+
+    def __init__(self, name: str, script_path: Path, entry_point: str):
+        self.name = name
+        self.script_path = script_path
+        self.entry_point = entry_point
+        self.module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> ModuleType:
+        with self._lock:
+            if self.module is None:
+                self.module = load_stage_module(self.name, self.script_path)
+        return self.module
+
+    def __call__(self):
+        module = self.load()
+        return getattr(module, self.entry_point)()
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class PipelineEngine:
+    """
+    Holds every pipeline stage in memory and runs them by name.
+    """
+
+    def __init__(self, base_dir: Path = PROJECT_ROOT, entry_points: Dict[str, tuple] = None):
+        self.base_dir = base_dir
+        self.stages: Dict[str, StageModule] = {
+            name: StageModule(name, base_dir / rel_path, entry)
+            for name, (rel_path, entry) in (entry_points or STAGE_ENTRY_POINTS).items()
+        }
+
+    def warm_up(self, stage_names=None, load_models: bool = True) -> None:
+        """
+        Imports the given stages (all by default) ahead of the first run and, by default,
+        loads and warms every model they registered.
+        """
+        _use_non_interactive_plotting()
+        for name in stage_names or self.stages:
+            self.stages[name].load()
+        if load_models:
+            get_model_registry().warm_up()
+
+    def run_stage(self, stage_name: str, verbose: bool = False, log_file=None) -> str:
+        """
+        Runs a single stage in-process and logs its output in the flow log format.
+
+        Args:
+            stage_name (str): Name of the pipeline step.
+            verbose (bool): If True, echoes stage output to the console.
+            log_file (file): Log file to append output.
+
+        Returns:
+            str: Captured stage output.
+        """
+        stage = self.stages[stage_name]
+        _use_non_interactive_plotting()
+
+        header = f"[RUNNING] {stage.script_path}"
+        divider = "=" * len(header)
+
+        print(f"\n{header}")
+        if log_file:
+            log_file.write(f"\n{divider}\n{header}\n{divider}\n")
+
+        exit_code = 0
+        with StageOutputCapture(log_file=log_file, verbose=verbose) as capture:
+            try:
+                stage()
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                _close_open_figures()
+
+        if not capture.output and log_file:
+            log_file.write("[NO OUTPUT RECEIVED]\n")
+        if log_file:
+            log_file.write(f"[EXIT CODE] {exit_code}\n")
+
+        if exit_code != 0:
+            print(f"[ERROR] Error in {stage_name}")
+            if log_file:
+                log_file.write(f"[ERROR] Error in {stage_name}\n")
+            raise RuntimeError(f"Script failed: {stage_name}")
+
+        print(f"[SUCCESS] Finished: {stage_name}")
+        if log_file:
+            log_file.write(f"[SUCCESS] Finished: {stage_name}\n\n")
+        return capture.output
+
+
+def _use_non_interactive_plotting() -> None:
+    """
+    Stages render figures from worker threads; force the Agg backend before pyplot is imported.
+    """
+    import matplotlib
+    with PLOT_LOCK:
+        if matplotlib.get_backend().lower() != "agg":
+            matplotlib.use("Agg")
+
+
+def _close_open_figures() -> None:
+    """
+    A resident process does not get its figures freed at exit like a child process did.
+    Figures only exist inside PLOT_LOCK sections, so holding the lock never closes a
+    figure another stage is still drawing.
+    """
+    if "matplotlib.pyplot" in sys.modules:
+        with PLOT_LOCK:
+            sys.modules["matplotlib.pyplot"].close("all")
+
+
+_ENGINE: Optional[PipelineEngine] = None
+
+
+def get_engine() -> PipelineEngine:
+    """
+    Returns:
+        PipelineEngine: The process-wide engine (created on first use).
+    """
+    global _ENGINE
+    with _IMPORT_LOCK:
+        if _ENGINE is None:
+            _ENGINE = PipelineEngine()
+    return _ENGINE
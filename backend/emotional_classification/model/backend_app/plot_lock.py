@@ -0,0 +1,27 @@
+"""
+Project: SoulSketch
+File   : backend_app/plot_lock.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Process-wide lock for matplotlib.pyplot.
+- pyplot keeps a global "current figure" state and is not thread-safe
+- Stages that run side by side (and concurrent jobs) render their plots one at a time
+- Model inference and the rest of each stage still run in parallel
+"""
+
+import threading
+from functools import wraps
+
+PLOT_LOCK = threading.RLock()
+
+
+def pyplot_section(func):
+    """
+    Decorator that runs a plotting function while holding PLOT_LOCK.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with PLOT_LOCK:
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,218 @@
+"""
+Project: SoulSketch
+File   : backend_app/plot_policy.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Plot mode of a job: when the diagnostic figures of the stages are rendered.
+- "all"       : every stage renders its plots while it runs (classic behavior)
+- "none"      : no plot is rendered; the JSON results are unchanged and the PDF report
+                leaves the plot slots out
+- "on_demand" : stages register how to render each plot instead of rendering it; the plots
+                are rendered only when the PDF stage or a client asks for them (request_plots)
+- Each plot is identified by its workspace-relative path (e.g. "1_EC_out/plots/emotion_probs_plot.png");
+  deferred plots are written straight to that path
+- Stages started as child processes cannot hand their renderers back: there "on_demand"
+  renders everything, as "all" does
+"""
+
+import os
+import sys
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.workspace import JobWorkspace, get_workspace, use_workspace
+
+# === CONFIGURATION ===
+PLOT_MODES = ("all", "none", "on_demand")
+PLOTS_ENV_VAR = "SOULSKETCH_PLOTS"
+DEFAULT_PLOT_MODE = os.environ.get(PLOTS_ENV_VAR, "all")
+
+_JOB_MODES: Dict[str, str] = {}                            # job_id -> plot mode of its running flow
+_DEFERRED: Dict[str, Dict[str, Callable[[Path], None]]] = {}  # job_id -> plot key -> renderer
+_RENDER_LOCKS: Dict[str, threading.Lock] = {}               # job_id -> one render pass at a time
+_LOCK = threading.Lock()
+
+
+def check_plot_mode(mode: str) -> str:
+    """
+    Returns:
+        str: The mode, if it is one of PLOT_MODES.
+
+    Raises:
+        ValueError: Unknown plot mode.
+    """
+    if mode not in PLOT_MODES:
+        raise ValueError(f"Unknown plot mode '{mode}' (expected one of {', '.join(PLOT_MODES)})")
+    return mode
+
+
+def set_plot_mode(workspace: JobWorkspace, mode: Optional[str]) -> str:
+    """
+    Sets the plot mode of a job for its next flow. Plots deferred by an earlier flow with the
+    same mode stay requestable (a stage skipped by an incremental re-run does not defer them again).
+
+    Args:
+        workspace (JobWorkspace): Job workspace.
+        mode (str | None): One of PLOT_MODES (DEFAULT_PLOT_MODE if None).
+
+    Returns:
+        str: The mode set.
+    """
+    mode = check_plot_mode(mode or DEFAULT_PLOT_MODE)
+    with _LOCK:
+        if _JOB_MODES.get(workspace.job_id) != mode:
+            _DEFERRED.pop(workspace.job_id, None)
+        _JOB_MODES[workspace.job_id] = mode
+    return mode
+
+
+def get_plot_mode(workspace: JobWorkspace = None) -> str:
+    """
+    Returns:
+        str: Plot mode of the job (or of this process, for a stage run as a child process).
+    """
+    workspace = workspace or get_workspace()
+    with _LOCK:
+        mode = _JOB_MODES.get(workspace.job_id)
+    return mode or check_plot_mode(os.environ.get(PLOTS_ENV_VAR, DEFAULT_PLOT_MODE))
+
+
+def plot_variant(workspace: JobWorkspace = None) -> str:
+    """
+    Returns:
+        str: Stage / result cache key variant of the job's plot mode ("" for "all", whose keys are unchanged).
+    """
+    mode = get_plot_mode(workspace)
+    return "" if mode == "all" else f"plots={mode}"
+
+
+def child_env(workspace: JobWorkspace) -> dict:
+    """
+    Returns:
+        dict: Environment giving a stage child process the plot mode of the job.
+    """
+    mode = get_plot_mode(workspace)
+    return {PLOTS_ENV_VAR: "all" if mode == "on_demand" else mode}
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+# =============================================================================
+# STAGE SIDE
+# =============================================================================
+
+def render_plot(render: Callable[[Path], None], local_path: Path, key: Optional[str] = None) -> bool:
+    """
+    Renders a diagnostic plot now, defers it or skips it, following the plot mode of the job.
+
+    Args:
+        render (Callable): Function writing the plot to the path it receives. With on_demand it
+            runs after the stage, so it must only use values it captured (not the stage's temp files).
+        local_path (Path): Where the stage writes the plot when it renders it now.
+        key (str | None): Workspace-relative path the plot is published at. Without a key the plot
+            cannot be requested later and is rendered now unless the mode is "none".
+
+    Returns:
+        bool: True if the plot was written to local_path.
+    """
+    workspace = get_workspace()
+    mode = get_plot_mode(workspace)
+    if key is not None:
+        with _LOCK:
+            _DEFERRED.get(workspace.job_id, {}).pop(key, None)
+
+    if mode == "all" or (mode == "on_demand" and key is None):
+        Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+        render(Path(local_path))
+        return True
+
+    if key is not None:
+        _remove(workspace.path(key))  # a plot of an earlier run must not outlive its results
+        if mode == "on_demand":
+            with _LOCK:
+                _DEFERRED.setdefault(workspace.job_id, {})[key] = render
+    return False
+
+
+# =============================================================================
+# REQUEST SIDE
+# =============================================================================
+
+def _matches(key: str, prefix: str) -> bool:
+    prefix = prefix.strip("/")
+    return not prefix or key == prefix or key.startswith(prefix + "/") or prefix.startswith(key + "/")
+
+
+def pending_plots(workspace: JobWorkspace = None) -> List[str]:
+    """
+    Returns:
+        List[str]: Keys of the deferred plots of the job not rendered yet.
+    """
+    workspace = workspace or get_workspace()
+    with _LOCK:
+        return sorted(_DEFERRED.get(workspace.job_id, {}))
+
+
+def request_plots(prefix: str = "", workspace: JobWorkspace = None) -> List[str]:
+    """
+    Renders the deferred plots of a job whose key is under prefix (all of them by default).
+    A plot that fails to render is reported and skipped: plots never fail a job.
+
+    Args:
+        prefix (str): Workspace-relative path of a plot or of a folder of plots.
+        workspace (JobWorkspace | None): Job workspace (the current one by default).
+
+    Returns:
+        List[str]: Keys of the plots rendered.
+    """
+    workspace = workspace or get_workspace()
+    with _LOCK:
+        render_lock = _RENDER_LOCKS.setdefault(workspace.job_id, threading.Lock())
+
+    rendered = []
+    with render_lock, use_workspace(workspace):  # a second caller waits for the plots to exist
+        with _LOCK:
+            deferred = _DEFERRED.get(workspace.job_id, {})
+            todo = {key: deferred.pop(key) for key in sorted(deferred) if _matches(key, prefix)}
+        for key, render in todo.items():
+            path = workspace.path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                render(path)
+                rendered.append(key)
+            except Exception as e:
+                print(f"[WARN] Plot {key} could not be rendered: {e}")
+    if rendered:
+        print(f"[INFO] Rendered {len(rendered)} deferred plot(s) of job {workspace.job_id}")
+    return rendered
+
+
+def render_pending_plots() -> None:
+    """Renders every deferred plot of the current job (PDF stage, before collecting its sources)."""
+    request_plots()
+
+
+def discard_plots(job_id: str) -> None:
+    """Drops the plot mode and the deferred plots of a job that is no longer tracked."""
+    with _LOCK:
+        _JOB_MODES.pop(job_id, None)
+        _DEFERRED.pop(job_id, None)
+        _RENDER_LOCKS.pop(job_id, None)
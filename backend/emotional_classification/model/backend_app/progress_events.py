@@ -0,0 +1,138 @@
+"""
+Project: SoulSketch
+File   : backend_app/progress_events.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Per-job progress event channels (served as Server-Sent Events by /api/events).
+- The job queue, the flow runner, metrics.measure() and the stages publish events:
+  job_queued / job_started / job_finished, flow_start / flow_end, stage_start / stage_end /
+  stage_skipped (with timings), substep (timed sub-step) and progress ("CEX 4/12 crops")
+- Every event gets an increasing id; a channel keeps its recent history, so a client that
+  connects late (or reconnects with Last-Event-ID) replays what it missed
+- Publishing never blocks a stage: it appends to a list and wakes the waiting readers
+"""
+
+import sys
+import time
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.workspace import get_workspace
+
+# === CONFIGURATION ===
+EVENT_HISTORY_LIMIT = 500   # events kept per job
+TERMINAL_EVENTS = {"job_finished"}
+
+
+class EventChannel:
+    """
+    Ordered events of one job, with blocking reads.
+    """
+
+    def __init__(self, job_id: str, history: int = EVENT_HISTORY_LIMIT):
+        self.job_id = job_id
+        self._events = deque(maxlen=history)
+        self._next_id = 1
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def publish(self, event: str, data: dict) -> dict:
+        with self._condition:
+            entry = {"id": self._next_id, "event": event, "job_id": self.job_id, "time": round(time.time(), 3), **data}
+            self._next_id += 1
+            self._events.append(entry)
+            if event in TERMINAL_EVENTS:
+                self._closed = True
+            elif event == "job_queued":  # job submitted again
+                self._closed = False
+            self._condition.notify_all()
+        return entry
+
+    def read(self, after_id: int = 0, timeout: float = None) -> tuple:
+        """
+        Waits until there are events newer than after_id (or the timeout expires).
+
+        Returns:
+            tuple: (list of new events, closed flag)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed or self._last_id() > after_id, timeout=timeout)
+            return [e for e in self._events if e["id"] > after_id], self._closed
+
+    def _last_id(self) -> int:
+        return self._events[-1]["id"] if self._events else 0
+
+
+_CHANNELS: Dict[str, EventChannel] = {}
+_CHANNELS_LOCK = threading.Lock()
+
+
+def get_channel(job_id: str) -> EventChannel:
+    with _CHANNELS_LOCK:
+        channel = _CHANNELS.get(job_id)
+        if channel is None:
+            channel = _CHANNELS[job_id] = EventChannel(job_id)
+        return channel
+
+
+def drop_channel(job_id: str) -> None:
+    with _CHANNELS_LOCK:
+        _CHANNELS.pop(job_id, None)
+
+
+# =============================================================================
+# PUBLISHING
+# =============================================================================
+
+def publish(job_id: Optional[str], event: str, **data) -> Optional[dict]:
+    """
+    Publishes an event on a job channel (ignored without a job ID).
+    """
+    if not job_id:
+        return None
+    return get_channel(job_id).publish(event, data)
+
+
+def report_progress(stage: str, done: int, total: int, unit: str) -> None:
+    """
+    Publishes the progress of a loop inside a stage for the current job,
+    e.g. report_progress("CEX", 4, 12, "crops") -> "CEX 4/12 crops".
+    """
+    publish(get_workspace().job_id, "progress", stage=stage, done=done, total=total, unit=unit,
+            message=f"{stage} {done}/{total} {unit}")
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+def stream_events(job_id: str, last_event_id: int = 0, heartbeat: float = 15.0) -> Iterator[Optional[dict]]:
+    """
+    Yields the events of a job as they are published, starting after last_event_id.
+    Yields None when nothing happened for `heartbeat` seconds (keep-alive);
+    returns after the terminal event.
+    """
+    channel = get_channel(job_id)
+    after_id = last_event_id
+    while True:
+        events, closed = channel.read(after_id, timeout=heartbeat)
+        for event in events:
+            after_id = event["id"]
+            yield event
+        if closed and not events:
+            return
+        if not events:
+            yield None
@@ -0,0 +1,278 @@
+"""
+Project: SoulSketch
+File   : backend_app/result_cache.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Content-addressed cache of finished analyses.
+- Key = SHA-256 of the uploaded image bytes + fingerprints of the three YOLO weights, the
+  analysis generator templates and the code of every stage (stage_fingerprints.code_fingerprint,
+  with the backend_app modules it imports): a new model, template or code fix invalidates old entries
+- Entry = post_analysis.json, analysis_text.json and full_analysis_report.pdf
+- A hit copies the entry into the job workspace instead of running the pipeline
+- Entries live in shared_memory/10_Cache/<key>/ and are evicted least-recently-used
+  first once the cache grows past CACHE_MAX_BYTES
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.workspace import SHARED_MEMORY_DIR, JobWorkspace
+
+# === CONFIGURATION ===
+CACHE_FOLDER = "10_Cache"
+CACHE_DIR = SHARED_MEMORY_DIR / CACHE_FOLDER
+CACHE_MAX_BYTES = int(os.environ.get("SOULSKETCH_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Files whose content changes the analysis result
+MODEL_FILES = [
+    PROJECT_ROOT / "emotional_classification" / "model" / "Yolo_Classifier.pt",
+    PROJECT_ROOT / "object_detection" / "model" / "Yolo11s_HHT_trained.pt",
+    PROJECT_ROOT / "facial_expressions_detection" / "model" / "Yolo11s_FED_trained.pt"
+]
+TEMPLATE_DIRS = [
+    PROJECT_ROOT / "analysis_generator" / "mapping_and_templates",
+    PROJECT_ROOT / "analysis_generator" / "data"
+]
+
+# Cached file name -> location inside a workspace
+CACHED_OUTPUTS = {
+    "post_analysis.json": ("5_JSON_out", "post_analysis.json"),
+    "analysis_text.json": ("6_AG_out", "analysis_text.json"),
+    "full_analysis_report.pdf": ("7_PDFG_out", "full_analysis_report.pdf")
+}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+
+_FINGERPRINTS: Dict[str, tuple] = {}  # path -> (size, mtime_ns, digest)
+_FINGERPRINT_LOCK = threading.Lock()
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    SHA-256 of a file, recomputed only when its size or modification time changes
+    (the model weights are large and do not change between requests).
+
+    Returns:
+        str: Hex digest, or "missing" if the file does not exist.
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return "missing"
+
+    key = str(path)
+    with _FINGERPRINT_LOCK:
+        cached = _FINGERPRINTS.get(key)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    with _FINGERPRINT_LOCK:
+        _FINGERPRINTS[key] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def pipeline_fingerprint() -> str:
+    """
+    Returns:
+        str: Combined fingerprint of the model weights, analysis templates and stage code.
+    """
+    from backend_app.stage_fingerprints import STAGE_CODE_DIRS, code_fingerprint  # imports this module
+
+    digest = hashlib.sha256()
+    files = list(MODEL_FILES)
+    for folder in TEMPLATE_DIRS:
+        if folder.is_dir():
+            files.extend(sorted(p for p in folder.rglob("*") if p.is_file() and p.suffix in (".json", ".py")))
+
+    for path in files:
+        digest.update(str(path.relative_to(PROJECT_ROOT)).encode("utf-8"))
+        digest.update(file_fingerprint(path).encode("ascii"))
+    for stage in STAGE_CODE_DIRS:
+        digest.update(f"{stage}:{code_fingerprint(stage)}".encode("ascii"))
+    return digest.hexdigest()
+
+
+def compute_cache_key(image_path: Path, variant: str = "") -> str:
+    """
+    Args:
+        image_path (Path): Uploaded image (0_BE_input/original_input.png).
+        variant (str): Flow options changing the outputs (e.g. "plots=none"); "" for the defaults.
+
+    Returns:
+        str: Cache key of the analysis of this image with the current models, code and options.
+    """
+    digest = hashlib.sha256(Path(image_path).read_bytes())
+    digest.update(pipeline_fingerprint().encode("ascii"))
+    if variant:
+        digest.update(variant.encode("ascii"))
+    return digest.hexdigest()
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+def _dir_size(folder: Path) -> int:
+    return sum(p.stat().st_size for p in folder.iterdir() if p.is_file())
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of analysis outputs on disk.
+
+    Attributes:
+        cache_dir (Path): Folder holding one sub-folder per entry.
+        max_bytes (int): Total size above which the least recently used entries are removed.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuilds the LRU order from the entry folders (last use = folder mtime)."""
+        if not self.cache_dir.exists():
+            return
+        entries = [p for p in self.cache_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        for entry in sorted(entries, key=lambda p: p.stat().st_mtime):
+            size = _dir_size(entry)
+            self._entries[entry.name] = size
+            self._total += size
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """
+        Returns:
+            Path | None: Entry folder for the key (marked as recently used), or None on a miss.
+        """
+        entry = self.cache_dir / key
+        with self._lock:
+            if key not in self._entries:
+                # May have been stored by another process sharing the folder
+                if not entry.is_dir():
+                    return None
+                self._entries[key] = _dir_size(entry)
+                self._total += self._entries[key]
+            elif not entry.is_dir():
+                self._total -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+        os.utime(entry)
+        return entry
+
+    def restore(self, key: str, workspace: JobWorkspace) -> bool:
+        """
+        Copies a cached analysis into a workspace.
+
+        Returns:
+            bool: True on a hit, False if the key is not cached.
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            return False
+        try:
+            for name, parts in CACHED_OUTPUTS.items():
+                target = workspace.path(*parts)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(entry / name, target)
+        except OSError as e:
+            print(f"[WARN] Cache entry {key[:12]} unreadable, ignoring it: {e}")
+            self.discard(key)
+            return False
+        return True
+
+    def store(self, key: str, workspace: JobWorkspace) -> bool:
+        """
+        Saves the outputs of a finished analysis under the key.
+
+        Returns:
+            bool: True if stored, False if an output is missing.
+        """
+        sources = {name: workspace.path(*parts) for name, parts in CACHED_OUTPUTS.items()}
+        if not all(p.is_file() and p.stat().st_size > 0 for p in sources.values()):
+            return False
+
+        # Write to a private folder, then publish it with a single rename
+        staging = self.cache_dir / f".staging_{key}_{threading.get_ident()}"
+        staging.mkdir(parents=True, exist_ok=True)
+        for name, source in sources.items():
+            shutil.copy2(source, staging / name)
+        size = _dir_size(staging)
+
+        entry = self.cache_dir / key
+        with self._lock:
+            if key in self._entries or entry.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+                return True
+            staging.rename(entry)
+            self._entries[key] = size
+            self._total += size
+            self._evict()
+        return True
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._total -= self._entries.pop(key)
+            shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+
+    def _evict(self) -> None:
+        """Drops least recently used entries until the cache fits (caller holds the lock)."""
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+            print(f"[CACHE] Evicted entry {key[:12]} ({size} bytes)")
+
+    @property
+    def size_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_CACHE: Optional[ResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Returns:
+        ResultCache: The process-wide result cache (created on first use).
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResultCache()
+    return _CACHE
@@ -0,0 +1,360 @@
+"""
+Project: SoulSketch
+File   : backend_app/stage_fingerprints.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Input / code fingerprints and completion checkpoints of the pipeline stages,
+for incremental and resumed re-runs.
+- Code fingerprint: content of the stage's module folder (sources, mappings, templates,
+  page builders, assets, model weights) - or of its own files when two stages share a folder
+  (JB_A / JB_B) - plus the backend_app modules it imports, directly or through other
+  backend_app modules (artifact store, image cache, inference backend, ...)
+- Stage key: code fingerprint + uploaded image + the keys of the stages it depends on,
+  so a change propagates downstream along STEP_DEPENDENCIES
+  (editing text_templates.json changes run_AG, hence run_JB_B and run_PDFG)
+- After a successful run the stage commits a completion marker next to its outputs
+  (<workspace>/<output folder>/.<stage>.fingerprint): its key and the manifest of its output
+  files (written atomically, removed before the stage runs again). A later flow in the same
+  workspace skips the stage when the key matches and every file of the manifest is still there
+- Plots the stage deferred (plot mode "on_demand") are listed in the marker too: the stage is
+  only skipped while each of them is rendered or still requestable in this process, so a
+  restart re-runs it instead of losing its plots
+- The flow checkpoint (<workspace>/0_BE_out/flow_checkpoint.json) tells where the last flow
+  stopped, so a resumed run can report which step it restarts from
+"""
+
+import os
+import sys
+import ast
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.workspace import JobWorkspace
+from backend_app.result_cache import file_fingerprint
+from backend_app.plot_policy import pending_plots
+
+# === CONFIGURATION ===
+FINGERPRINT_VERSION = 1  # bump when the way stages exchange data changes
+
+# Stage -> module folder whose content defines the stage's code
+STAGE_CODE_DIRS = {
+    "run_yolo_EMCLS": "emotional_classification",
+    "run_OBJ_DET": "object_detection",
+    "run_FED": "facial_expressions_detection",
+    "run_CEX": "colors_extractor",
+    "run_JB_A": "json_builder",
+    "run_AG": "analysis_generator",
+    "run_JB_B": "json_builder",
+    "run_PDFG": "pdf_generator"
+}
+
+# Stages sharing a module folder: files (globs relative to the folder) that define each one
+STAGE_CODE_FILES = {
+    "run_JB_A": ["run_JB_A.py", "build_pre_analysis_format.py", "get_data_from_shared.py",
+                 "validate_input_using_scheme.py", "maps/*.py",
+                 "Schemes/pre_analysis_scheme.json", "Schemes/Moduls_Schemes/*.json"],
+    "run_JB_B": ["run_JB_B.py", "build_post_analysis_format.py", "Schemes/post_analysis_scheme.json"]
+}
+BACKEND_PACKAGE = "backend_app"
+
+# Stage -> outputs (workspace-relative) that must exist for the stage to be skipped;
+# the fingerprint record is written in the folder of the first one
+STAGE_OUTPUTS = {
+    "run_yolo_EMCLS": ["1_EC_out/EC_result.json"],
+    "run_OBJ_DET": ["2_OBJ_DET_out/processed_input.png", "2_OBJ_DET_out/objects"],
+    "run_FED": ["3_FED_out/facial_expressions/expressions.json"],
+    "run_CEX": ["4_CEX_out/colors/JSON/drawing_results.json"],
+    "run_JB_A": ["5_JSON_out/pre_analysis.json"],
+    "run_AG": ["6_AG_out/analysis_text.json"],
+    "run_JB_B": ["5_JSON_out/post_analysis.json"],
+    "run_PDFG": ["7_PDFG_out/full_analysis_report.pdf"]
+}
+
+# generated ONNX exports are not code: their backend is part of the stage key instead
+CODE_SUFFIXES = {".py", ".json", ".yaml", ".yml", ".pt", ".png", ".jpg", ".ttf", ".otf"}
+SKIPPED_CODE_DIRS = {"__pycache__", "output", "tmp"}
+FLOW_CHECKPOINT_FILE = "flow_checkpoint.json"
+
+_IMPORTS: Dict[Tuple[str, str], List[str]] = {}  # (path, file fingerprint) -> backend_app modules imported
+
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+
+def _backend_imports(path: Path) -> List[str]:
+    """
+    Returns:
+        List[str]: Names of the backend_app modules a Python file imports (memoized per file version).
+    """
+    memo_key = (str(path), file_fingerprint(path))
+    if memo_key not in _IMPORTS:
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+        except (OSError, SyntaxError, ValueError):
+            tree = ast.Module(body=[], type_ignores=[])
+        modules = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module == BACKEND_PACKAGE:
+                modules.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and (node.module or "").startswith(BACKEND_PACKAGE + "."):
+                modules.add(node.module.split(".")[1])
+            elif isinstance(node, ast.Import):
+                modules.update(alias.name.split(".")[1] for alias in node.names
+                               if alias.name.startswith(BACKEND_PACKAGE + "."))
+        _IMPORTS[memo_key] = sorted(modules)
+    return _IMPORTS[memo_key]
+
+
+def stage_code_files(stage: str) -> List[Path]:
+    """
+    Returns:
+        List[Path]: Files defining the stage's code: its module folder (or its own files in a
+        shared folder) and the backend_app modules they import, transitively.
+    """
+    folder = PROJECT_ROOT / STAGE_CODE_DIRS[stage]
+    if stage in STAGE_CODE_FILES:
+        candidates = [p for pattern in STAGE_CODE_FILES[stage] for p in folder.glob(pattern)]
+    else:
+        candidates = folder.rglob("*")
+    files = {
+        p for p in candidates
+        if p.is_file() and p.suffix.lower() in CODE_SUFFIXES
+        and not SKIPPED_CODE_DIRS.intersection(p.relative_to(folder).parts[:-1])
+    }
+
+    todo = [p for p in files if p.suffix == ".py"]
+    while todo:
+        for name in _backend_imports(todo.pop()):
+            module = PROJECT_ROOT / BACKEND_PACKAGE / f"{name}.py"
+            if module.is_file() and module not in files:
+                files.add(module)
+                todo.append(module)
+    return sorted(files)
+
+
+def code_fingerprint(stage: str) -> str:
+    """
+    Returns:
+        str: SHA-256 over the files of stage_code_files(stage)
+        (file hashes are memoized by size and modification time).
+    """
+    digest = hashlib.sha256(f"v{FINGERPRINT_VERSION}:{stage}".encode("utf-8"))
+    for path in stage_code_files(stage):
+        digest.update(path.relative_to(PROJECT_ROOT).as_posix().encode("utf-8"))
+        digest.update(file_fingerprint(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def input_fingerprint(workspace: JobWorkspace) -> str:
+    """
+    Returns:
+        str: Fingerprint of the uploaded image of the job ("missing" if absent).
+    """
+    return file_fingerprint(workspace.input_image)
+
+
+def stage_key(stage: str, image_fingerprint: str, dependency_keys: List[str]) -> str:
+    """
+    Returns:
+        str: Key identifying the outputs a stage would produce with the current code and inputs.
+    """
+    digest = hashlib.sha256(code_fingerprint(stage).encode("ascii"))
+    digest.update(image_fingerprint.encode("ascii"))
+    for key in dependency_keys:
+        digest.update(key.encode("ascii"))
+    return digest.hexdigest()
+
+
+# =============================================================================
+# RECORDS
+# =============================================================================
+
+def _record_path(workspace: JobWorkspace, stage: str) -> Path:
+    return workspace.path(STAGE_OUTPUTS[stage][0]).parent / f".{stage}.fingerprint"
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    """Writes a JSON file through a temporary file, so readers never see a partial marker."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _output_manifest(workspace: JobWorkspace, stage: str, pending: Iterable[str]) -> Optional[Dict[str, Optional[int]]]:
+    """
+    Returns:
+        dict | None: Workspace-relative path -> size (None for artifacts not written yet),
+        or None if a declared output is missing.
+    """
+    manifest = {}
+    pending = list(pending)
+    for rel_path in STAGE_OUTPUTS[stage]:
+        path = workspace.path(rel_path)
+        found = [key for key in pending if key == rel_path or key.startswith(rel_path + "/")]
+        if path.is_dir():
+            files = [p for p in path.rglob("*") if p.is_file() and not p.name.endswith(".fingerprint")]
+            manifest.update({p.relative_to(workspace.root).as_posix(): p.stat().st_size for p in files})
+        elif path.is_file() and path.stat().st_size > 0:
+            manifest[rel_path] = path.stat().st_size
+        elif not found:
+            return None
+        manifest.update({key: None for key in found if key not in manifest})
+        if path.is_dir() and not any(k.startswith(rel_path + "/") for k in manifest):
+            return None
+    return manifest
+
+
+def _deferred_plots(workspace: JobWorkspace, stage: str) -> List[str]:
+    """
+    Returns:
+        List[str]: Deferred plots of the job published under the stage's output folder.
+    """
+    folder = Path(STAGE_OUTPUTS[stage][0]).parts[0]
+    return [key for key in pending_plots(workspace) if key.startswith(folder + "/")]
+
+
+def _read_marker(workspace: JobWorkspace, stage: str) -> Optional[dict]:
+    try:
+        with open(_record_path(workspace, stage), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_stage_key(workspace: JobWorkspace, stage: str) -> Optional[str]:
+    """
+    Returns:
+        str | None: Key committed by the last successful run of the stage in this workspace.
+    """
+    marker = _read_marker(workspace, stage)
+    return marker.get("key") if marker else None
+
+
+def is_up_to_date(workspace: JobWorkspace, stage: str, key: str) -> bool:
+    """
+    Returns:
+        bool: True if the stage completed with this key, every output of its manifest is still present
+        (with the recorded size) and each plot it deferred is rendered or can still be requested.
+    """
+    marker = _read_marker(workspace, stage)
+    if not marker or marker.get("key") != key:
+        return False
+    for rel_path, size in marker.get("outputs", {}).items():
+        path = workspace.path(rel_path)
+        if not path.is_file() or (size is not None and path.stat().st_size != size):
+            return False
+    requestable = set(pending_plots(workspace))
+    return all(workspace.path(plot).exists() or plot in requestable for plot in marker.get("deferred_plots", []))
+
+
+def commit_stage(workspace: JobWorkspace, stage: str, key: str, pending: Iterable[str] = ()) -> bool:
+    """
+    Commits the completion marker of a successful run next to the stage outputs.
+
+    Args:
+        workspace (JobWorkspace): Job workspace.
+        stage (str): Step name.
+        key (str): Stage key of the run.
+        pending (Iterable[str]): Workspace-relative artifacts produced in memory and not written yet
+            (they are listed in the manifest and must exist when the marker is used).
+            The plots the stage deferred are recorded from the plot policy.
+
+    Returns:
+        bool: False (and no marker) if a declared output is missing.
+    """
+    manifest = _output_manifest(workspace, stage, pending)
+    if manifest is None:
+        return False
+    _write_json_atomic(_record_path(workspace, stage), {
+        "stage": stage,
+        "key": key,
+        "code": code_fingerprint(stage),
+        "completed_at": datetime.now().isoformat(timespec="seconds"),
+        "outputs": manifest,
+        "deferred_plots": _deferred_plots(workspace, stage)
+    })
+    return True
+
+
+def invalidate_stage(workspace: JobWorkspace, stage: str) -> None:
+    """Removes the marker before a stage runs, so a failed run is never taken as complete."""
+    _record_path(workspace, stage).unlink(missing_ok=True)
+
+
+def first_incomplete_step(workspace: JobWorkspace, keys: Dict[str, str], order: List[str]) -> Optional[str]:
+    """
+    Returns:
+        str | None: First step (in order) without a valid completion marker, None if all are complete.
+    """
+    return next((step for step in order if not is_up_to_date(workspace, step, keys[step])), None)
+
+
+# =============================================================================
+# FLOW CHECKPOINT
+# =============================================================================
+
+def write_flow_checkpoint(workspace: JobWorkspace, status: str, completed: List[str],
+                          failed_step: str = None, error: str = None) -> None:
+    """
+    Records the state of the current flow (running / completed / failed / cancelled).
+    """
+    _write_json_atomic(workspace.log_dir / FLOW_CHECKPOINT_FILE, {
+        "job_id": workspace.job_id,
+        "status": status,
+        "completed_steps": completed,
+        "failed_step": failed_step,
+        "error": error,
+        "updated_at": datetime.now().isoformat(timespec="seconds")
+    })
+
+
+def read_flow_checkpoint(workspace: JobWorkspace) -> Optional[dict]:
+    """
+    Returns:
+        dict | None: State of the last flow run in this workspace.
+    """
+    try:
+        with open(workspace.log_dir / FLOW_CHECKPOINT_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compute_stage_keys(workspace: JobWorkspace, dependencies: Dict[str, List[str]], order: List[str],
+                       variant: str = "", stage_variants: Dict[str, str] = None) -> Dict[str, str]:
+    """
+    Args:
+        workspace (JobWorkspace): Job workspace.
+        dependencies (Dict[str, List[str]]): Step dependency graph.
+        order (List[str]): Steps in topological order.
+        variant (str): Flow options changing the outputs (e.g. "plots=none"); "" for the defaults.
+        stage_variants (Dict[str, str] | None): Step -> option changing only that step's outputs
+            (e.g. its inference backend); it reaches the downstream steps through their dependency keys.
+
+    Returns:
+        Dict[str, str]: Step -> key for the current code, input image and options.
+    """
+    image = input_fingerprint(workspace) + (f"|{variant}" if variant else "")
+    stage_variants = stage_variants or {}
+    keys = {}
+    for stage in order:
+        stage_image = image + (f"|{stage_variants[stage]}" if stage_variants.get(stage) else "")
+        keys[stage] = stage_key(stage, stage_image, [keys[dep] for dep in dependencies[stage]])
+    return keys
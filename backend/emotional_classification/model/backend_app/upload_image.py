@@ -7,15 +7,20 @@ Description:
 Provides functionality to:
 - Validate user-uploaded drawing images (format, content, resolution)
 - Copy valid image into shared memory under a consistent name: 'original_input.png'
+  (the input folder of the current job workspace unless a folder is given)
+- Uploads received as bytes (API, Streamlit) are decoded once in memory, validated on the
+  decoded image and written once, without an intermediate temp file
 """
 
+import os
 import sys
+import tempfile
 from pathlib import Path
-import shutil
 from backend_app.input_validator import (
-    is_valid_format,
+    decode_image_bytes,
     is_mostly_white,
-    is_resolution_too_small
+    is_resolution_too_small,
+    WHITENESS_SAMPLE_PIXELS
 )
 
 # === Auto-injected project root resolver ===
@@ -28,13 +33,15 @@ while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.workspace import get_workspace
+
 # =============================================================================
 # MAIN FUNCTION
 # =============================================================================
 
 def upload_image_to_shared(
     image_path: str,
-    shared_dir: Path = PROJECT_ROOT / "shared_memory" / "0_BE_input",
+    shared_dir: Path = None,
     verbose: bool = True
 ) -> dict:
     """
@@ -43,7 +50,8 @@ def upload_image_to_shared(
 
     Args:
         image_path (str): Path to the input image.
-        shared_dir (Path): Path to the shared memory input folder.
+        shared_dir (Path | None): Path to the shared memory input folder.
+            Defaults to 0_BE_input/ of the current job workspace.
         verbose (bool): Whether to print debug information.
 
     Returns:
@@ -57,23 +65,61 @@ def upload_image_to_shared(
     if not source_path.is_file():
         return {"success": False, "error": f"Image not found: {source_path}"}
 
-    if not is_valid_format(str(source_path), verbose=verbose):
+    return upload_image_bytes(source_path.read_bytes(), shared_dir=shared_dir, verbose=verbose)
+
+
+def upload_image_bytes(
+    data: bytes,
+    shared_dir: Path = None,
+    verbose: bool = True
+) -> dict:
+    """
+    Validates an image held in memory and writes it to the shared memory input folder
+    as 'original_input.png'. The bytes are decoded once and every check runs on the
+    decoded image; the file is written once, through a uniquely named temporary file
+    in the target folder, so concurrent uploads never share a file name.
+
+    Args:
+        data (bytes): Encoded image, as received.
+        shared_dir (Path | None): Path to the shared memory input folder.
+            Defaults to 0_BE_input/ of the current job workspace.
+        verbose (bool): Whether to print debug information.
+
+    Returns:
+        dict: {
+            "success": bool,
+            "path": str (if success),
+            "error": str (if failed)
+        }
+    """
+    image = decode_image_bytes(data, verbose=verbose)
+    if image is None:
         return {"success": False, "error": "Uploaded file is not a valid image format."}
 
-    if is_mostly_white(str(source_path), verbose=verbose):
-        return {"success": False, "error": "Uploaded image is mostly white or empty."}
+    with image:
+        if is_mostly_white(image, verbose=verbose, max_pixels=WHITENESS_SAMPLE_PIXELS):
+            return {"success": False, "error": "Uploaded image is mostly white or empty."}
+
+        if is_resolution_too_small(image, verbose=verbose):
+            return {"success": False, "error": "Uploaded image resolution is too small. Minimum 128x128 required."}
 
-    if is_resolution_too_small(str(source_path), verbose=verbose):
-        return {"success": False, "error": "Uploaded image resolution is too small. Minimum 128x128 required."}
+    if shared_dir is None:
+        shared_dir = get_workspace().input_image.parent
 
+    tmp_path = None
     try:
         shared_dir.mkdir(parents=True, exist_ok=True)
         target_path = shared_dir / "original_input.png"
-        shutil.copy2(source_path, target_path)
+        with tempfile.NamedTemporaryFile(dir=shared_dir, prefix=".upload_", suffix=".tmp", delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+            tmp.write(data)
+        os.replace(tmp_path, target_path)
 
         if verbose:
             print(f"✅ Image copied to shared memory as: {target_path}")
 
         return {"success": True, "path": str(target_path)}
     except Exception as e:
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
         return {"success": False, "error": str(e)}
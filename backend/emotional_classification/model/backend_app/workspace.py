@@ -0,0 +1,207 @@
+"""
+Project: SoulSketch
+File   : backend_app/workspace.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Per-job workspace resolution for the shared memory structure.
+- Every analysis job gets its own root holding the usual 0_BE_input ... 7_PDFG_out folders
+- Stage modules resolve their paths against the *current* workspace at call time
+- The current workspace follows the running job (context variable), or the
+  SOULSKETCH_WORKSPACE environment variable for stages started as child processes
+- Without a job, the classic shared_memory/ folder is used (single-drawing mode)
+"""
+
+import os
+import re
+import sys
+import uuid
+import shutil
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# === CONFIGURATION ===
+SHARED_MEMORY_DIR = PROJECT_ROOT / "shared_memory"
+JOBS_FOLDER = "9_Jobs"
+JOBS_DIR = SHARED_MEMORY_DIR / JOBS_FOLDER
+TEMP_FOLDER = "tmp"
+
+WORKSPACE_ENV_VAR = "SOULSKETCH_WORKSPACE"
+JOB_ID_ENV_VAR = "SOULSKETCH_JOB_ID"
+DEFAULT_JOB_ID = "default"
+JOB_ID_LENGTH = 12
+JOB_ID_PATTERN = re.compile(rf"[0-9a-f]{{{JOB_ID_LENGTH}}}")  # the ids new_job_id() produces
+
+WORKSPACE_FOLDERS = [
+    "0_BE_input", "0_BE_out", "1_EC_out", "2_OBJ_DET_out", "3_FED_out",
+    "4_CEX_out", "5_JSON_out", "6_AG_out", "7_PDFG_out"
+]
+
+
+class JobWorkspace:
+    """
+    Root folder of a single analysis job.
+
+    Attributes:
+        job_id (str): Identifier of the job ("default" for the classic shared_memory/).
+        root (Path): Folder that replaces shared_memory/ for this job.
+    """
+
+    def __init__(self, root: Path, job_id: str = DEFAULT_JOB_ID):
+        self.root = Path(root)
+        self.job_id = job_id
+
+    def path(self, *parts) -> Path:
+        """
+        Returns:
+            Path: root / parts (e.g. path("0_BE_input", "original_input.png")).
+        """
+        return self.root.joinpath(*parts)
+
+    def temp_dir(self, stage: str) -> Path:
+        """
+        Returns:
+            Path: Private scratch folder of a stage inside this workspace.
+        """
+        return self.root / TEMP_FOLDER / stage
+
+    @property
+    def input_image(self) -> Path:
+        return self.path("0_BE_input", "original_input.png")
+
+    @property
+    def final_pdf(self) -> Path:
+        return self.path("7_PDFG_out", "full_analysis_report.pdf")
+
+    @property
+    def log_dir(self) -> Path:
+        return self.path("0_BE_out")
+
+    @property
+    def is_default(self) -> bool:
+        return self.root.resolve() == SHARED_MEMORY_DIR.resolve()
+
+    def create(self) -> "JobWorkspace":
+        """
+        Creates the standard shared memory folder structure under the root.
+        """
+        for folder in WORKSPACE_FOLDERS:
+            self.path(folder).mkdir(parents=True, exist_ok=True)
+        return self
+
+    def remove(self) -> None:
+        """
+        Deletes a job workspace from disk (never the default shared_memory/).
+        """
+        if not self.is_default and self.root.exists():
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def env(self) -> dict:
+        """
+        Returns:
+            dict: Environment variables that select this workspace in a child process.
+        """
+        return {WORKSPACE_ENV_VAR: str(self.root), JOB_ID_ENV_VAR: self.job_id}
+
+    def __repr__(self) -> str:
+        return f"JobWorkspace(job_id={self.job_id!r}, root={str(self.root)!r})"
+
+
+DEFAULT_WORKSPACE = JobWorkspace(SHARED_MEMORY_DIR, DEFAULT_JOB_ID)
+
+_CURRENT_WORKSPACE: contextvars.ContextVar = contextvars.ContextVar("soulsketch_workspace", default=None)
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:JOB_ID_LENGTH]
+
+
+def is_valid_job_id(job_id: str) -> bool:
+    """
+    Returns:
+        bool: True if job_id has the shape of a generated id (so it cannot leave JOBS_DIR).
+    """
+    return isinstance(job_id, str) and JOB_ID_PATTERN.fullmatch(job_id) is not None
+
+
+def create_job_workspace(job_id: Optional[str] = None) -> JobWorkspace:
+    """
+    Creates a fresh workspace under shared_memory/9_Jobs/<job_id>.
+
+    Args:
+        job_id (str | None): Job identifier, generated if omitted.
+
+    Returns:
+        JobWorkspace: The created workspace.
+
+    Raises:
+        ValueError: job_id is not a generated job id.
+    """
+    job_id = job_id or new_job_id()
+    if not is_valid_job_id(job_id):
+        raise ValueError(f"Invalid job id '{job_id}'")
+    return JobWorkspace(JOBS_DIR / job_id, job_id).create()
+
+
+def get_job_workspace(job_id: str) -> Optional[JobWorkspace]:
+    """
+    Returns:
+        JobWorkspace | None: Existing workspace of the given job, or None if unknown or not a
+        job id (a client-supplied id must never resolve outside JOBS_DIR).
+    """
+    if job_id == DEFAULT_JOB_ID:
+        return DEFAULT_WORKSPACE
+    if not is_valid_job_id(job_id):
+        return None
+    root = JOBS_DIR / job_id
+    if not root.is_dir() or root.resolve().parent != JOBS_DIR.resolve():
+        return None
+    return JobWorkspace(root, job_id)
+
+
+def get_workspace() -> JobWorkspace:
+    """
+    Returns:
+        JobWorkspace: Workspace of the job running in the current context.
+    """
+    workspace = _CURRENT_WORKSPACE.get()
+    if workspace is not None:
+        return workspace
+
+    env_root = os.environ.get(WORKSPACE_ENV_VAR)
+    if env_root:
+        return JobWorkspace(Path(env_root), os.environ.get(JOB_ID_ENV_VAR, DEFAULT_JOB_ID))
+
+    return DEFAULT_WORKSPACE
+
+
+def shared_path(*parts) -> Path:
+    """
+    Resolves a shared memory path against the current workspace,
+    e.g. shared_path("1_EC_out", "EC_result.json").
+    """
+    return get_workspace().path(*parts)
+
+
+@contextmanager
+def use_workspace(workspace: Optional[JobWorkspace]):
+    """
+    Makes the given workspace current for the enclosed block (and the stages it calls).
+    """
+    token = _CURRENT_WORKSPACE.set(workspace or DEFAULT_WORKSPACE)
+    try:
+        yield workspace or DEFAULT_WORKSPACE
+    finally:
+        _CURRENT_WORKSPACE.reset(token)
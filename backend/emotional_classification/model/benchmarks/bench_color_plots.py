@@ -0,0 +1,154 @@
+"""
+Project: SoulSketch
+File   : benchmarks/bench_color_plots.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Throughput and memory benchmark of the CEX color-emotion figures.
+- Renders the same seeded entities (1 to 5 colors, some unusual) with the former pyplot
+  functions (models/plot_color_emotions.py: two intermediate figures pasted into a third)
+  and with the pooled renderer (models/plot_renderer.py)
+- Reports figures per second and the RSS after every block of renders
+- The pooled renderer must keep memory flat: RSS growth between the first block (after the
+  warm-up) and the last one stays under --max-growth-mb, and no pyplot figure is left open
+
+Usage:
+    python benchmarks/bench_color_plots.py
+    python benchmarks/bench_color_plots.py --renders 1000 --skip-legacy
+"""
+
+import gc
+import io
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "colors_extractor"))  # CEX imports its models as "models.*"
+
+from backend_app.metrics import current_rss_bytes
+from models.plot_renderer import render_color_plot
+from models.plot_color_emotions import (
+    draw_color_map,
+    draw_color_proportion_pie,
+    combine_mapping_and_pie,
+    COLOR_RGB_REFERENCE,
+    match_color_by_range
+)
+
+# === CONFIGURATION ===
+DEFAULT_RENDERS = 1000
+WARM_UP = 20
+BLOCK = 100
+MAX_GROWTH_MB = 10.0
+EMOTIONS = ["Happiness", "Sadness", "Fear", "Anger", "Calm", "Surprise"]
+
+
+def make_entities(n: int, seed: int = 3) -> List[List[Dict]]:
+    """
+    Returns:
+        List[List[Dict]]: n color-emotion result lists shaped like extract_emotional_colors output.
+    """
+    rng = random.Random(seed)
+    names = list(COLOR_RGB_REFERENCE)
+    entities = []
+    for _ in range(n):
+        colors = []
+        for _ in range(rng.randint(1, 5)):
+            rgb = [min(255, max(0, v + rng.randint(-15, 15))) for v in COLOR_RGB_REFERENCE[rng.choice(names)]]
+            colors.append({
+                "color_name": match_color_by_range(tuple(rgb)),
+                "rgb": rgb,
+                "emotion": rng.choice(EMOTIONS),
+                "proportion": rng.randint(50, 5000),
+                "is_unusual": rng.random() < 0.2
+            })
+        entities.append(colors)
+    return entities
+
+
+def render_legacy(colors: List[Dict], title: str, pie_title: str, highlight_unusual: bool) -> bytes:
+    """The CEX plot as extract_emotional_colors drew it before the pooled renderer."""
+    fig_map = draw_color_map(colors, title=title, highlight_unusual=highlight_unusual)
+    fig_pie = draw_color_proportion_pie(colors, title=pie_title)
+    combined_fig = combine_mapping_and_pie(fig_map, fig_pie, title)
+    buffer = io.BytesIO()
+    combined_fig.savefig(buffer, dpi=150)
+    plt.close(combined_fig)
+    return buffer.getvalue()
+
+
+def run(name: str, render, entities: List[List[Dict]]) -> Dict:
+    """
+    Returns:
+        dict: figures_per_s, rss_mb per block, growth_mb (last block - first block), open_figures.
+    """
+    for i, colors in enumerate(entities[:WARM_UP]):
+        render(colors, f"Object Analysis - {i}", "Object Color Proportion", True)
+    gc.collect()
+
+    rss_mb, start = [], time.perf_counter()
+    for i, colors in enumerate(entities, start=1):
+        png = render(colors, f"Object Analysis - {i}", "Object Color Proportion", True)
+        if not png.startswith(b"\x89PNG"):
+            raise RuntimeError(f"{name}: render {i} is not a PNG")
+        if i % BLOCK == 0 or i == len(entities):
+            rss_mb.append(current_rss_bytes() / 2 ** 20)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "figures_per_s": len(entities) / elapsed,
+        "rss_mb": rss_mb,
+        "growth_mb": rss_mb[-1] - rss_mb[0],
+        "open_figures": len(plt.get_fignums())
+    }
+    print(f"[INFO] {name:<8} {result['figures_per_s']:6.1f} figures/s, RSS "
+          f"{rss_mb[0]:.0f} -> {rss_mb[-1]:.0f} MB ({result['growth_mb']:+.1f} MB), "
+          f"{result['open_figures']} pyplot figure(s) open")
+    print(f"         RSS per {BLOCK} renders (MB): {' '.join(f'{v:.0f}' for v in rss_mb)}")
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Figures/s and memory of the CEX color-emotion plots.")
+    parser.add_argument("--renders", type=int, default=DEFAULT_RENDERS, help="Figures rendered per renderer")
+    parser.add_argument("--max-growth-mb", type=float, default=MAX_GROWTH_MB,
+                        help="Allowed RSS growth of the pooled renderer over the run")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only run the pooled renderer")
+    args = parser.parse_args(argv)
+
+    entities = make_entities(max(args.renders, WARM_UP))[:args.renders]
+    print("==================================================")
+    print(f"[INFO] {args.renders} renders per renderer (after {WARM_UP} warm-up renders)")
+    pooled = run("pooled", render_color_plot, entities)
+    legacy = None if args.skip_legacy else run("legacy", render_legacy, entities)
+    if legacy:
+        print(f"[INFO] Speedup: {pooled['figures_per_s'] / legacy['figures_per_s']:.2f}x")
+    print("==================================================")
+
+    if pooled["growth_mb"] > args.max_growth_mb or pooled["open_figures"]:
+        print(f"[FAIL] Pooled renderer memory is not flat ({pooled['growth_mb']:+.1f} MB, "
+              f"{pooled['open_figures']} figure(s) open)")
+        return 1
+    print(f"[PASS] Pooled renderer: {pooled['figures_per_s']:.1f} figures/s, "
+          f"RSS growth {pooled['growth_mb']:+.1f} MB over {args.renders} renders")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Project: SoulSketch
+File   : benchmarks/bench_input_validator.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Micro-benchmark of the upload whiteness check (backend_app/input_validator.py).
+- Builds synthetic uploads of phone-photo sizes (up to 4000x3000): white paper with
+  random crayon strokes covering a few percent of the page
+- Times the former pure-Python check (list(img.getdata()) + generator count),
+  the NumPy check over every pixel and the NumPy check on a WHITENESS_SAMPLE_PIXELS random sample
+- Reports the speedup and the difference between the sampled and the exact percentage
+
+Usage:
+    python benchmarks/bench_input_validator.py
+    python benchmarks/bench_input_validator.py --sizes 1600x1200 4000x3000 --repeat 5 --skip-legacy
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from PIL import Image, ImageDraw
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.input_validator import non_white_percent, WHITENESS_SAMPLE_PIXELS
+
+# === CONFIGURATION ===
+DEFAULT_SIZES = ["640x480", "1600x1200", "4000x3000"]
+DEFAULT_REPEAT = 3
+WHITE_THRESHOLD = 245
+
+
+def make_upload(width: int, height: int, seed: int = 7) -> Image.Image:
+    """
+    Returns:
+        Image.Image: White page with random strokes (a few percent of non-white pixels).
+    """
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    lw = max(2, width // 300)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        color = (rng.randrange(200), rng.randrange(200), rng.randrange(200))
+        draw.line([x, y, x + rng.randrange(-width // 4, width // 4), y + rng.randrange(-height // 4, height // 4)],
+                  fill=color, width=lw)
+    return img
+
+
+def legacy_non_white_percent(img: Image.Image, white_threshold: int = WHITE_THRESHOLD) -> float:
+    """The check as it was before vectorization (kept here for comparison only)."""
+    pixels = list(img.convert('RGB').getdata())
+    non_white = sum(
+        1 for r, g, b in pixels if not (r >= white_threshold and g >= white_threshold and b >= white_threshold)
+    )
+    return non_white / len(pixels) * 100
+
+
+def best_of(func: Callable[[], float], repeat: int) -> Tuple[float, float]:
+    """
+    Returns:
+        tuple: (fastest wall time in seconds, value returned by func)
+    """
+    times, value = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        times.append(time.perf_counter() - start)
+    return min(times), value
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the upload whiteness check.")
+    parser.add_argument("--sizes", nargs="*", default=DEFAULT_SIZES, help="Image sizes, e.g. 4000x3000")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per variant (best is kept)")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not time the pure-Python check")
+    args = parser.parse_args(argv)
+
+    print("==================================================")
+    print(f"{'size':<12}{'legacy (s)':>12}{'numpy (s)':>12}{'sampled (s)':>13}{'speedup':>10}{'sample err':>12}")
+    for size in args.sizes:
+        width, height = parse_size(size)
+        img = make_upload(width, height)
+
+        exact_s, exact = best_of(lambda: non_white_percent(img, WHITE_THRESHOLD), args.repeat)
+        sampled_s, sampled = best_of(
+            lambda: non_white_percent(img, WHITE_THRESHOLD, max_pixels=WHITENESS_SAMPLE_PIXELS), args.repeat)
+
+        if args.skip_legacy:
+            legacy_text, speedup_text = f"{'-':>12}", f"{'-':>10}"
+        else:
+            legacy_s, legacy = best_of(lambda: legacy_non_white_percent(img), 1)
+            if abs(legacy - exact) > 1e-9:
+                print(f"[FAIL] {size}: NumPy result {exact:.4f}% differs from the legacy {legacy:.4f}%")
+                return 1
+            legacy_text = f"{legacy_s:>12.3f}"
+            speedup_text = f"{legacy_s / sampled_s:>9.0f}x"
+
+        print(f"{size:<12}{legacy_text}{exact_s:>12.4f}{sampled_s:>13.4f}{speedup_text}"
+              f"{abs(sampled - exact):>11.3f}%")
+    print("==================================================")
+    print(f"[INFO] Speedup = legacy / sampled (random sample of {WHITENESS_SAMPLE_PIXELS:,} pixels); "
+          f"sample err = |sampled - exact| in percentage points")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Project: SoulSketch
+File   : benchmarks/check_color_clustering.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Quality check and timing of the CEX dominant-color clustering (colors_extractor/models/color_clustering.py).
+- The integer pixel pre-filter must keep exactly the pixels of the former float64
+  np.mean / np.std test, on every possible gray level and on random pixels
+- Each drawing of the synthetic corpus (with scan-like noise, optionally upscaled) and of
+  --images is clustered by the former full-pixel KMeans (reference) and by the "histogram"
+  and "minibatch" methods
+- Palette distance: mean distance (RGB) from each reference color to the nearest color found,
+  weighted by the reference cluster sizes
+- Named-color shift: total variation between the shares of the named colors
+  (match_color_by_range) of the two palettes, i.e. what the emotion mapping sees
+- The reference run again with another seed gives the noise floor of KMeans itself
+
+Usage:
+    python benchmarks/check_color_clustering.py
+    python benchmarks/check_color_clustering.py --scale 2 --images path/to/drawings
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "colors_extractor"))  # CEX imports its models as "models.*"
+
+from benchmarks.synthetic_corpus import CORPUS_SPEC, render_drawing
+from models.color_clustering import cluster_colors, filter_pixels
+from models.models_config import NUM_DOMINANT_COLORS
+from models.plot_color_emotions import match_color_by_range
+
+# === CONFIGURATION ===
+NOISE_STD = 8                # scan-like noise added to the synthetic drawings
+MAX_PALETTE_DISTANCE = 20.0  # mean weighted RGB distance to the reference palette
+MAX_NAME_SHIFT = 0.15        # total variation of the named-color shares
+METHODS = ("histogram", "minibatch")
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp"}
+
+
+def legacy_filter(pixels: np.ndarray) -> np.ndarray:
+    """The pre-filter as KNN_model applied it before the integer version."""
+    return pixels[~((np.mean(pixels, axis=1) >= 240) | (np.std(pixels, axis=1) <= 15))]
+
+
+def check_filter(seed: int = 5) -> int:
+    rng = np.random.default_rng(seed)
+    grays = np.repeat(np.arange(256, dtype=np.uint8), 3).reshape(-1, 3)
+    near_gray = np.clip(rng.integers(0, 256, (200_000, 1)) + rng.integers(-30, 31, (200_000, 3)), 0, 255)
+    samples = [grays, rng.integers(0, 256, (500_000, 3)).astype(np.uint8), near_gray.astype(np.uint8)]
+
+    failures = 0
+    for name, pixels in zip(("gray levels", "random", "near gray"), samples):
+        kept, expected = filter_pixels(pixels), legacy_filter(pixels)
+        if kept.shape != expected.shape or not np.array_equal(kept, expected):
+            print(f"[FAIL] Pre-filter ({name}): {len(kept)} pixel(s) kept, {len(expected)} expected")
+            failures += 1
+    return failures
+
+
+def load_images(scale: int, folder: Path = None) -> List[Tuple[str, np.ndarray]]:
+    """
+    Returns:
+        List[Tuple[str, np.ndarray]]: (name, H x W x 3 uint8 RGB) for the corpus and the folder.
+    """
+    rng = np.random.default_rng(0)
+    images = []
+    for name, (width, height, objects, faces, seed) in CORPUS_SPEC.items():
+        drawing = render_drawing(width, height, objects, faces, seed).convert("RGB")
+        if scale > 1:
+            drawing = drawing.resize((width * scale, height * scale), Image.BICUBIC)
+        rgb = np.asarray(drawing).astype(np.int16) + rng.normal(0, NOISE_STD, (drawing.height, drawing.width, 3)).astype(np.int16)
+        images.append((name, np.clip(rgb, 0, 255).astype(np.uint8)))
+    if folder:
+        for path in sorted(p for p in Path(folder).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES):
+            images.append((path.name, np.asarray(Image.open(path).convert("RGB"))))
+    return images
+
+
+def palette_distance(reference: Tuple[np.ndarray, np.ndarray], found: Tuple[np.ndarray, np.ndarray]) -> float:
+    ref_colors, ref_counts = reference
+    distances = np.linalg.norm(ref_colors[:, None, :] - found[0][None, :, :], axis=2).min(axis=1)
+    return float(np.average(distances, weights=ref_counts))
+
+
+def name_shares(palette: Tuple[np.ndarray, np.ndarray]) -> Dict[str, float]:
+    shares: Dict[str, float] = {}
+    total = float(np.sum(palette[1]))
+    for color, count in zip(*palette):
+        name = match_color_by_range(tuple(int(v) for v in color))
+        shares[name] = shares.get(name, 0.0) + count / total
+    return shares
+
+
+def name_shift(reference: Tuple[np.ndarray, np.ndarray], found: Tuple[np.ndarray, np.ndarray]) -> float:
+    a, b = name_shares(reference), name_shares(found)
+    return 0.5 * sum(abs(a.get(k, 0.0) - b.get(k, 0.0)) for k in set(a) | set(b))
+
+
+def timed(pixels: np.ndarray, method: str, seed: int = 0):
+    start = time.perf_counter()
+    palette = cluster_colors(pixels, NUM_DOMINANT_COLORS, method, seed)
+    return palette, time.perf_counter() - start
+
+
+def check_palettes(images: List[Tuple[str, np.ndarray]]) -> int:
+    failures = 0
+    header = "".join(f"{m + ' (ms / dist / shift)':>34}" for m in ("kmeans seed 1",) + METHODS)
+    print(f"{'image':<16}{'pixels':>10}{'kmeans (ms)':>13}{header}")
+    for name, rgb in images:
+        pixels = rgb.reshape((-1, 3))
+        reference, ref_s = timed(pixels, "kmeans")
+        row = f"{name[:15]:<16}{len(pixels):>10}{ref_s * 1000:>13.0f}"
+        if len(reference[0]) == 0:
+            print(f"{row}   (no pixel left after the pre-filter)")
+            continue
+
+        runs = [("kmeans seed 1",) + timed(pixels, "kmeans", seed=1)] + [(m,) + timed(pixels, m) for m in METHODS]
+        for method, palette, seconds in runs:
+            distance, shift = palette_distance(reference, palette), name_shift(reference, palette)
+            row += f"{seconds * 1000:>19.0f} / {distance:5.1f} / {shift:4.2f}"
+            if method in METHODS and (distance > MAX_PALETTE_DISTANCE or shift > MAX_NAME_SHIFT):
+                failures += 1
+                row += " !"
+        print(row)
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the fast CEX clustering methods with full-pixel KMeans.")
+    parser.add_argument("--scale", type=int, default=1, help="Upscale factor of the synthetic drawings")
+    parser.add_argument("--images", type=Path, default=None, help="Folder of real drawings to add to the check")
+    args = parser.parse_args(argv)
+
+    print("==================================================")
+    failures = check_filter()
+    images = load_images(args.scale, args.images)
+    failures += check_palettes(images)
+    print("==================================================")
+    if failures:
+        print(f"[FAIL] {failures} check(s) out of tolerance (distance <= {MAX_PALETTE_DISTANCE}, "
+              f"shift <= {MAX_NAME_SHIFT})")
+        return 1
+    print(f"[PASS] Pre-filter matches the float test; {', '.join(METHODS)} stay within "
+          f"{MAX_PALETTE_DISTANCE} RGB and {MAX_NAME_SHIFT} named-color shift of KMeans on {len(images)} image(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Project: SoulSketch
+File   : benchmarks/check_color_lut.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Equivalence check and timing of the CEX color lookup tables (colors_extractor/models/color_lut.py).
+- Every one of the 2^24 RGB values must get the named color of the former COLOR_RANGES dict
+  walk (first matching range wins); the walk itself is replayed on random values as a scalar
+- Every named color must get the emotion of the former EMOTION_COLOR_MAP scan
+- Times the dict walk against the tables for the cluster centers of a drawing, then the
+  per-pixel color / emotion proportions of whole images
+
+Usage:
+    python benchmarks/check_color_lut.py
+    python benchmarks/check_color_lut.py --megapixels 1 4 12
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "colors_extractor"))  # CEX imports its models as "models.*"
+
+from models.models_config import COLOR_RANGES, EMOTION_COLOR_MAP
+from models.color_lut import (
+    COLOR_NAMES,
+    UNKNOWN_COLOR,
+    color_ids,
+    color_name,
+    color_emotion,
+    pixel_color_proportions
+)
+
+# === CONFIGURATION ===
+DEFAULT_MEGAPIXELS = [1, 4, 12]
+SCALAR_SAMPLES = 200_000
+
+
+def legacy_match(rgb) -> Optional[str]:
+    """The COLOR_RANGES dict walk as KNN_model did it before the lookup tables."""
+    for color, ranges in COLOR_RANGES.items():
+        r, g, b = rgb
+        if (ranges["r"][0] <= r <= ranges["r"][1] and
+            ranges["g"][0] <= g <= ranges["g"][1] and
+            ranges["b"][0] <= b <= ranges["b"][1]):
+            return color
+    return None
+
+
+def legacy_emotion(name: Optional[str]) -> Optional[str]:
+    for emotion, colors in EMOTION_COLOR_MAP.items():
+        if name in colors:
+            return emotion
+    return None
+
+
+def check_full_cube() -> int:
+    """Compares the tables with a range-by-range replay of the dict walk on every RGB value."""
+    failures = 0
+    for r in range(256):
+        plane = np.stack(np.meshgrid(np.full(1, r), np.arange(256), np.arange(256), indexing="ij"), axis=-1)[0]
+        expected = np.full(plane.shape[:2], UNKNOWN_COLOR, dtype=np.uint8)
+        for color_id in reversed(range(len(COLOR_NAMES))):  # earlier ranges overwrite later ones
+            ranges = COLOR_RANGES[COLOR_NAMES[color_id]]
+            inside = np.ones(plane.shape[:2], dtype=bool)
+            for k, channel in enumerate("rgb"):
+                inside &= (plane[..., k] >= ranges[channel][0]) & (plane[..., k] <= ranges[channel][1])
+            expected[inside] = color_id
+        mismatches = int(np.count_nonzero(color_ids(plane) != expected))
+        if mismatches:
+            print(f"[FAIL] r={r}: {mismatches} RGB value(s) mapped to another color")
+            failures += 1
+    return failures
+
+
+def check_scalar(seed: int = 3) -> int:
+    rng = np.random.default_rng(seed)
+    failures = 0
+    for rgb in map(tuple, rng.integers(0, 256, (SCALAR_SAMPLES, 3)).tolist()):
+        if color_name(rgb) != legacy_match(rgb):
+            failures += 1
+            if failures <= 5:
+                print(f"[FAIL] {rgb}: {color_name(rgb)} instead of {legacy_match(rgb)}")
+    for name in list(COLOR_NAMES) + [None, "unknown"]:
+        if color_emotion(name) != legacy_emotion(name):
+            print(f"[FAIL] {name}: emotion {color_emotion(name)} instead of {legacy_emotion(name)}")
+            failures += 1
+    return failures
+
+
+def bench(megapixels: List[int], seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    centers = [tuple(c) for c in rng.integers(0, 256, (5, 3)).tolist()]
+    start = time.perf_counter()
+    for _ in range(2000):
+        [legacy_emotion(legacy_match(c)) for c in centers]
+    walk_us = (time.perf_counter() - start) / 2000 * 1e6
+    start = time.perf_counter()
+    for _ in range(2000):
+        [color_emotion(color_name(c)) for c in centers]
+    lut_us = (time.perf_counter() - start) / 2000 * 1e6
+    print(f"[INFO] 5 cluster centers: dict walk {walk_us:.1f} us, lookup tables {lut_us:.1f} us")
+
+    print(f"{'megapixels':<12}{'dict walk (s)':>15}{'tables (ms)':>13}{'speedup':>10}")
+    for mp in megapixels:
+        image = rng.integers(0, 256, (1000, mp * 1000, 3), dtype=np.uint8)
+        start = time.perf_counter()
+        pixel_color_proportions(image, drop_background=False)
+        lut_s = time.perf_counter() - start
+        # the walk is timed on 100k pixels and scaled: a full image takes minutes
+        sample = [tuple(p) for p in image.reshape((-1, 3))[:100_000].tolist()]
+        start = time.perf_counter()
+        for p in sample:
+            legacy_emotion(legacy_match(p))
+        walk_s = (time.perf_counter() - start) * mp * 10
+        print(f"{mp:<12}{walk_s:>15.1f}{lut_s * 1000:>13.0f}{walk_s / lut_s:>9.0f}x")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check and time the CEX color lookup tables.")
+    parser.add_argument("--megapixels", type=int, nargs="*", default=DEFAULT_MEGAPIXELS,
+                        help="Image sizes of the per-pixel proportion timing")
+    args = parser.parse_args(argv)
+
+    print("==================================================")
+    failures = check_full_cube() + check_scalar()
+    bench(args.megapixels)
+    print("==================================================")
+    if failures:
+        print(f"[FAIL] {failures} mismatch(es)")
+        return 1
+    print("[PASS] Lookup tables match the COLOR_RANGES walk on all 2^24 RGB values and the emotion scan on every color")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Project: SoulSketch
+File   : benchmarks/check_duplicate_filter.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Equivalence check and micro-benchmark of the duplicate-detection filter
+(object_detection/filter_duplicate_objects.py).
+- Builds a seeded corpus of detection sets shaped like YOLO output: clusters of overlapping
+  boxes around a few objects, several labels, each pass sorted by confidence
+- The NumPy filter must return exactly the detections of the former pairwise loop for a
+  pass, and for two passes sorted together by confidence
+- On raw pass concatenations (pass 1 then pass 2, as OBJ_DET fuses them) the former loop
+  depends on the input order; there the NumPy result is checked for the suppression rules
+  (no kept pair above the threshold, every dropped box covered by a kept box at least as
+  confident) and the number of differing sets is reported
+- Class-aware and cross-pass merging are checked for the same rules
+- Times the former loop and the NumPy filter for growing numbers of detections
+
+Usage:
+    python benchmarks/check_duplicate_filter.py
+    python benchmarks/check_duplicate_filter.py --sets 500 --sizes 50 200 1000
+"""
+
+import sys
+import time
+import random
+import argparse
+import itertools
+from pathlib import Path
+from typing import List
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from object_detection.filter_duplicate_objects import (
+    intersection_over_union,
+    filter_detections_by_iou,
+    merge_detection_passes
+)
+
+# === CONFIGURATION ===
+DEFAULT_SETS = 300
+DEFAULT_SIZES = [20, 100, 400, 1000]
+THRESHOLD = 0.6  # the threshold OBJ_DET uses when it crops
+LABELS = ["house", "tree", "person", "sun", "cloud", "flower"]
+
+
+def legacy_filter(dets: List[dict], threshold: float = 0.5) -> List[dict]:
+    """The filter as it was before vectorization (kept here for comparison only)."""
+    keep_flags = [True] * len(dets)
+    for i, j in itertools.combinations(range(len(dets)), 2):
+        if not keep_flags[i] or not keep_flags[j]:
+            continue
+        if intersection_over_union(dets[i]["bbox"], dets[j]["bbox"]) > threshold:
+            if dets[i]["confidence"] >= dets[j]["confidence"]:
+                keep_flags[j] = False
+            else:
+                keep_flags[i] = False
+    return [d for k, d in zip(keep_flags, dets) if k]
+
+
+def make_pass(rng: random.Random, n: int, size: int = 1024) -> List[dict]:
+    """
+    Returns:
+        List[dict]: n detections around n // 3 + 1 objects, sorted by confidence (like YOLO).
+    """
+    centers = [(rng.uniform(0, size), rng.uniform(0, size), rng.uniform(20, 300), rng.choice(LABELS))
+               for _ in range(n // 3 + 1)]
+    dets = []
+    for _ in range(n):
+        cx, cy, extent, label = rng.choice(centers)
+        w, h = extent * rng.uniform(0.7, 1.3), extent * rng.uniform(0.7, 1.3)
+        cx, cy = cx + rng.gauss(0, extent / 8), cy + rng.gauss(0, extent / 8)
+        dets.append({
+            "label": label if rng.random() < 0.8 else rng.choice(LABELS),
+            "confidence": round(rng.uniform(0.25, 1.0), 2),  # rounded: ties happen
+            "bbox": {"x1": cx - w / 2, "y1": cy - h / 2, "x2": cx + w / 2, "y2": cy + h / 2}
+        })
+    return sorted(dets, key=lambda d: -d["confidence"])
+
+
+def rule_violations(dets: List[dict], kept: List[dict], threshold: float, same_group=None) -> List[str]:
+    """
+    Checks the suppression rules. same_group(a, b) -> True if a and b may be merged.
+    """
+    same_group = same_group or (lambda a, b: True)
+    issues = []
+    for a, b in itertools.combinations(kept, 2):
+        if same_group(a, b) and intersection_over_union(a["bbox"], b["bbox"]) > threshold:
+            issues.append(f"kept pair overlaps: {a['label']} {a['confidence']} / {b['label']} {b['confidence']}")
+    kept_ids = {id(d) for d in kept}
+    for d in dets:
+        if id(d) in kept_ids:
+            continue
+        if not any(same_group(d, k) and k["confidence"] >= d["confidence"]
+                   and intersection_over_union(d["bbox"], k["bbox"]) > threshold for k in kept):
+            issues.append(f"dropped {d['label']} {d['confidence']} is not covered by a kept detection")
+    return issues
+
+
+def check_equivalence(n_sets: int, seed: int = 11) -> int:
+    rng = random.Random(seed)
+    failures = order_dependent = 0
+    for s in range(n_sets):
+        pass1, pass2 = make_pass(rng, rng.randrange(0, 60)), make_pass(rng, rng.randrange(0, 60))
+        fused_sorted = sorted(pass1 + pass2, key=lambda d: -d["confidence"])
+        raw = pass1 + pass2
+
+        for name, dets in (("pass", pass1), ("sorted passes", fused_sorted)):
+            if filter_detections_by_iou(dets, THRESHOLD) != legacy_filter(dets, THRESHOLD):
+                print(f"[FAIL] set {s} ({name}): NumPy filter differs from the pairwise loop")
+                failures += 1
+
+        kept = filter_detections_by_iou(raw, THRESHOLD)
+        order_dependent += kept != legacy_filter(raw, THRESHOLD)
+        issues = rule_violations(raw, kept, THRESHOLD)
+
+        kept = filter_detections_by_iou(raw, THRESHOLD, class_aware=True)
+        issues += rule_violations(raw, kept, THRESHOLD, lambda a, b: a["label"] == b["label"])
+
+        pass_of = {id(d): 1 for d in pass1}
+        kept = merge_detection_passes([pass1, pass2], THRESHOLD, cross_pass_only=True)
+        issues += rule_violations(raw, kept, THRESHOLD,
+                                  lambda a, b: pass_of.get(id(a), 2) != pass_of.get(id(b), 2))
+
+        for issue in issues:
+            print(f"[FAIL] set {s}: {issue}")
+        failures += len(issues)
+
+    print(f"[INFO] {order_dependent}/{n_sets} raw pass concatenation(s) where the former loop "
+          f"(input-order dependent) kept other boxes than confidence-ordered suppression")
+    return failures
+
+
+def bench(sizes: List[int], seed: int = 5) -> None:
+    rng = random.Random(seed)
+    print(f"{'detections':<12}{'loop (ms)':>12}{'numpy (ms)':>12}{'speedup':>10}")
+    for n in sizes:
+        dets = make_pass(rng, n)
+        rng.shuffle(dets)
+        start = time.perf_counter()
+        legacy_filter(dets, THRESHOLD)
+        loop_s = time.perf_counter() - start
+        start = time.perf_counter()
+        filter_detections_by_iou(dets, THRESHOLD)
+        numpy_s = time.perf_counter() - start
+        print(f"{n:<12}{loop_s * 1000:>12.2f}{numpy_s * 1000:>12.2f}{loop_s / numpy_s:>9.1f}x")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check and time the NumPy duplicate-detection filter.")
+    parser.add_argument("--sets", type=int, default=DEFAULT_SETS, help="Random detection sets to compare")
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES, help="Detection counts to time")
+    args = parser.parse_args(argv)
+
+    print("==================================================")
+    failures = check_equivalence(args.sets)
+    bench(args.sizes)
+    print("==================================================")
+    if failures:
+        print(f"[FAIL] {failures} mismatch(es)")
+        return 1
+    print(f"[PASS] NumPy filter matches the pairwise loop on {args.sets} set(s) and follows the suppression rules")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
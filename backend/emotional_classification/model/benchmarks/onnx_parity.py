@@ -0,0 +1,172 @@
+"""
+Project: SoulSketch
+File   : benchmarks/onnx_parity.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Parity check of the ONNX Runtime backend against eager PyTorch (backend_app/inference_backend.py).
+- Runs the three YOLO models with both backends on the synthetic corpus
+  (the original drawings and the OBJ_DET edge images)
+- Classifier (EMCLS): same top-1 label, class probabilities within --conf-tol
+- Detectors (OBJ_DET, FED): every box is matched to a box of the other backend with the
+  same label and IoU >= --iou-min, confidences within --conf-tol; no unmatched box
+- Reports the mean latency of both backends; exits with 1 on any mismatch
+
+Usage:
+    python benchmarks/onnx_parity.py
+    python benchmarks/onnx_parity.py --stages FED --conf-tol 0.01 --drawings medium_crowd
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+os.environ["CUDA_VISIBLE_DEVICES"] = ""  # compare CPU against CPU
+
+import cv2
+import numpy as np
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.synthetic_corpus import build_corpus, CORPUS_SPEC
+from backend_app.inference_backend import load_yolo, YOLO_MODELS
+from object_detection.input_processor import preprocess_image
+from object_detection.filter_duplicate_objects import intersection_over_union
+
+# === CONFIGURATION ===
+DEFAULT_CONF_TOL = 0.02   # max |confidence difference|
+DEFAULT_IOU_MIN = 0.90    # min IoU of matched boxes
+
+
+# =============================================================================
+# COMPARISON
+# =============================================================================
+
+def result_boxes(result) -> List[dict]:
+    """
+    Returns:
+        List[dict]: Boxes of a detection result as {"label", "confidence", "bbox" (x1, y1, x2, y2)}.
+    """
+    return [
+        {
+            "label": result.names[int(box.cls.item())],
+            "confidence": float(box.conf.item()),
+            "bbox": dict(zip(("x1", "y1", "x2", "y2"), box.xyxy[0].tolist()))
+        }
+        for box in result.boxes
+    ]
+
+
+def compare_classification(ref, other, conf_tol: float) -> List[str]:
+    """
+    Returns:
+        List[str]: Mismatches between two classification results (empty if equivalent).
+    """
+    ref_probs = ref.probs.data.cpu().numpy()
+    other_probs = other.probs.data.cpu().numpy()
+    issues = []
+    if int(ref.probs.top1) != int(other.probs.top1):
+        issues.append(f"top-1 {ref.names[int(ref.probs.top1)]} != {other.names[int(other.probs.top1)]}")
+    diff = float(np.max(np.abs(ref_probs - other_probs)))
+    if diff > conf_tol:
+        issues.append(f"max probability difference {diff:.4f} > {conf_tol}")
+    return issues
+
+
+def compare_detections(ref, other, conf_tol: float, iou_min: float) -> List[str]:
+    """
+    Greedy one-to-one matching (same label, best IoU) of the boxes of two detection results.
+
+    Returns:
+        List[str]: Unmatched boxes and confidence mismatches (empty if equivalent).
+    """
+    ref_boxes, other_boxes = result_boxes(ref), result_boxes(other)
+    unmatched = list(range(len(other_boxes)))
+    issues = []
+    for box in sorted(ref_boxes, key=lambda b: -b["confidence"]):
+        candidates = [(intersection_over_union(box["bbox"], other_boxes[j]["bbox"]), j)
+                      for j in unmatched if other_boxes[j]["label"] == box["label"]]
+        iou, j = max(candidates, default=(0.0, None))
+        if j is None or iou < iou_min:
+            issues.append(f"torch box {box['label']} ({box['confidence']:.2f}) has no ONNX match (best IoU {iou:.2f})")
+            continue
+        unmatched.remove(j)
+        diff = abs(box["confidence"] - other_boxes[j]["confidence"])
+        if diff > conf_tol:
+            issues.append(f"{box['label']}: confidence {box['confidence']:.3f} vs {other_boxes[j]['confidence']:.3f}")
+    for j in unmatched:
+        issues.append(f"ONNX box {other_boxes[j]['label']} ({other_boxes[j]['confidence']:.2f}) has no torch match")
+    return issues
+
+
+def timed_predict(model, image: np.ndarray) -> Tuple[object, float]:
+    start = time.perf_counter()
+    result = model.predict(image, verbose=False)[0]
+    return result, time.perf_counter() - start
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check ONNX Runtime outputs against PyTorch.")
+    parser.add_argument("--stages", nargs="*", choices=list(YOLO_MODELS), help="Models to check (all by default)")
+    parser.add_argument("--drawings", nargs="*", choices=list(CORPUS_SPEC), help="Subset of the corpus")
+    parser.add_argument("--conf-tol", type=float, default=DEFAULT_CONF_TOL, help="Allowed confidence difference")
+    parser.add_argument("--iou-min", type=float, default=DEFAULT_IOU_MIN, help="Minimum IoU of matched boxes")
+    args = parser.parse_args(argv)
+
+    images = []
+    for path in build_corpus(names=args.drawings):
+        original = cv2.imread(str(path))
+        images.append((path.stem, original))
+        images.append((f"{path.stem}/edges", preprocess_image(original)))
+
+    failures = 0
+    print("==================================================")
+    for stage in args.stages or YOLO_MODELS:
+        task = YOLO_MODELS[stage][1]
+        torch_model = load_yolo(stage, backend="torch")
+        onnx_model = load_yolo(stage, backend="onnx")
+        torch_times, onnx_times = [], []
+
+        for name, image in images:
+            ref, torch_s = timed_predict(torch_model, image)
+            other, onnx_s = timed_predict(onnx_model, image)
+            torch_times.append(torch_s)
+            onnx_times.append(onnx_s)
+            if task == "classify":
+                issues = compare_classification(ref, other, args.conf_tol)
+            else:
+                issues = compare_detections(ref, other, args.conf_tol, args.iou_min)
+            for issue in issues:
+                print(f"[FAIL] {stage} {name}: {issue}")
+            failures += len(issues)
+
+        torch_mean = sum(torch_times) / len(torch_times)
+        onnx_mean = sum(onnx_times) / len(onnx_times)
+        print(f"[INFO] {stage}: torch {torch_mean * 1000:.1f} ms, onnx {onnx_mean * 1000:.1f} ms "
+              f"per image ({torch_mean / onnx_mean:.2f}x)")
+    print("==================================================")
+
+    if failures:
+        print(f"[FAIL] {failures} mismatch(es) between the backends")
+        return 1
+    print(f"[PASS] ONNX Runtime matches PyTorch (labels, IoU >= {args.iou_min}, confidence ± {args.conf_tol})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Project: SoulSketch
+File   : benchmarks/quantization_report.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Accuracy-versus-speed report of the inference backends (backend_app/inference_backend.py),
+to choose the mode of each stage per deployment.
+- Runs the three YOLO models with FP32 PyTorch (the reference), FP32 ONNX Runtime and
+  INT8 ONNX Runtime on a set of drawings (the original drawings and the OBJ_DET edge images)
+- Classifier (EMCLS): top-1 emotion agreement with the reference, mean probability drift
+- Detectors (OBJ_DET, FED): mAP@0.5 proxy - the reference boxes are taken as ground truth and
+  the AP of the other backend's boxes (ranked by confidence) is averaged over the classes
+- Per-image latency (p50 / mean) and speedup over the reference
+- Saved to benchmarks/results/quant_<timestamp>.json (+ the table as .md)
+
+Held-out evaluation: missing INT8 models are calibrated on the calibration corpus
+(CALIBRATION_SPEC, or --calibration-dir), never on the evaluation drawings (CORPUS_SPEC, or
+--images); drawings an INT8 model was calibrated on (its <model>.int8.json manifest) are left
+out of the evaluation of that stage.
+
+Usage:
+    python benchmarks/quantization_report.py
+    python benchmarks/quantization_report.py --stages FED --images path/to/drawings --repeat 3
+    python benchmarks/quantization_report.py --calibration-dir path/to/other/drawings
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+os.environ["CUDA_VISIBLE_DEVICES"] = ""  # CPU deployment figures
+
+import cv2
+import numpy as np
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.synthetic_corpus import build_corpus, build_calibration_corpus
+from benchmarks.onnx_parity import result_boxes
+from backend_app.inference_backend import (
+    load_yolo,
+    quantize_onnx,
+    calibration_images,
+    calibration_record,
+    YOLO_MODELS,
+    IMAGE_SUFFIXES
+)
+from object_detection.input_processor import preprocess_image
+from object_detection.filter_duplicate_objects import intersection_over_union
+
+# === CONFIGURATION ===
+REFERENCE_BACKEND = "torch"
+CANDIDATE_BACKENDS = ["onnx", "onnx-int8"]
+AP_IOU = 0.5
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+def average_precision(ref_boxes: List[List[dict]], pred_boxes: List[List[dict]], iou_thr: float = AP_IOU) -> float:
+    """
+    mAP proxy: AP@iou_thr of the predicted boxes against the reference boxes (ground truth),
+    per class over all images (all-point interpolation), averaged over the classes.
+
+    Args:
+        ref_boxes: Per image, the reference boxes (label, confidence, bbox).
+        pred_boxes: Per image, the boxes of the backend under test.
+
+    Returns:
+        float: Mean AP in [0, 1] (1.0 if neither side found anything).
+    """
+    labels = {b["label"] for boxes in ref_boxes + pred_boxes for b in boxes}
+    if not labels:
+        return 1.0
+
+    aps = []
+    for label in sorted(labels):
+        gt = [[b for b in boxes if b["label"] == label] for boxes in ref_boxes]
+        n_gt = sum(len(g) for g in gt)
+        preds = sorted(((b["confidence"], i, b) for i, boxes in enumerate(pred_boxes)
+                        for b in boxes if b["label"] == label), key=lambda p: -p[0])
+        if n_gt == 0:
+            aps.append(0.0)  # only false positives
+            continue
+
+        matched = [set() for _ in gt]
+        hits = []
+        for _, i, box in preds:
+            candidates = [(intersection_over_union(box["bbox"], g["bbox"]), j)
+                          for j, g in enumerate(gt[i]) if j not in matched[i]]
+            iou, j = max(candidates, default=(0.0, None))
+            if j is not None and iou >= iou_thr:
+                matched[i].add(j)
+                hits.append(1)
+            else:
+                hits.append(0)
+
+        tp = np.cumsum(hits)
+        recall = np.concatenate(([0.0], tp / n_gt, [1.0]))
+        precision = np.concatenate(([1.0], tp / np.arange(1, len(hits) + 1), [0.0]))
+        precision = np.maximum.accumulate(precision[::-1])[::-1]  # precision envelope
+        aps.append(float(np.sum((recall[1:] - recall[:-1]) * precision[1:])))
+    return float(np.mean(aps))
+
+
+def timed_predict(model, image: np.ndarray, repeat: int) -> Tuple[object, float]:
+    """
+    Returns:
+        tuple: (result, fastest latency in seconds over `repeat` runs)
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = model.predict(image, verbose=False)[0]
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_backend(stage: str, backend: str, images: List[Tuple[str, np.ndarray]], repeat: int) -> Tuple[list, list]:
+    """
+    Returns:
+        tuple: (results per image, latencies per image in seconds)
+    """
+    model = load_yolo(stage, backend=backend)
+    model.predict(images[0][1], verbose=False)  # warm-up outside the timings
+    results, latencies = [], []
+    for _, image in images:
+        result, seconds = timed_predict(model, image, repeat)
+        results.append(result)
+        latencies.append(seconds)
+    return results, latencies
+
+
+def compare(task: str, ref_results: list, results: list) -> Dict[str, float]:
+    if task == "classify":
+        top1 = [int(r.probs.top1) == int(o.probs.top1) for r, o in zip(ref_results, results)]
+        drift = [float(np.max(np.abs(r.probs.data.cpu().numpy() - o.probs.data.cpu().numpy())))
+                 for r, o in zip(ref_results, results)]
+        return {"top1_agreement": sum(top1) / len(top1), "max_prob_drift_mean": float(np.mean(drift))}
+    return {"map50_proxy": average_precision([result_boxes(r) for r in ref_results], [result_boxes(o) for o in results])}
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def load_images(folder: Path = None) -> List[Tuple[Path, str, np.ndarray]]:
+    """
+    Returns:
+        List[Tuple[Path, str, np.ndarray]]: (source drawing, name, BGR image) for each drawing of
+        the folder (the synthetic corpus by default) and its OBJ_DET edge image.
+    """
+    paths = sorted(p for p in folder.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES) if folder else build_corpus()
+    images = []
+    for path in paths:
+        original = cv2.imread(str(path))
+        if original is None:
+            print(f"[WARN] Skipped unreadable image: {path}")
+            continue
+        images.append((path.resolve(), path.stem, original))
+        images.append((path.resolve(), f"{path.stem}/edges", preprocess_image(original)))
+    return images
+
+
+def held_out(stage: str, images: List[Tuple[Path, str, np.ndarray]]) -> List[Tuple[str, np.ndarray]]:
+    """
+    Returns:
+        List[Tuple[str, np.ndarray]]: The images the INT8 model of the stage was not calibrated on.
+    """
+    seen = {Path(p) for p in calibration_record(PROJECT_ROOT / YOLO_MODELS[stage][0])}
+    kept = [(name, image) for source, name, image in images if source not in seen]
+    if len(kept) < len(images):
+        print(f"[INFO] {stage}: {len(images) - len(kept)} calibration image(s) left out of the evaluation")
+    return kept
+
+
+def format_table(report: dict) -> str:
+    lines = [
+        "| stage | backend | accuracy vs FP32 torch | p50 latency (ms) | mean latency (ms) | speedup |",
+        "|-------|---------|------------------------|------------------|-------------------|---------|"
+    ]
+    for stage, rows in report["stages"].items():
+        ref_p50 = rows[REFERENCE_BACKEND]["latency_p50_ms"]
+        for backend, row in rows.items():
+            if "top1_agreement" in row:
+                accuracy = f"top-1 {row['top1_agreement'] * 100:.1f}% (drift {row['max_prob_drift_mean']:.3f})"
+            elif "map50_proxy" in row:
+                accuracy = f"mAP@0.5 {row['map50_proxy']:.3f}"
+            else:
+                accuracy = "reference"
+            lines.append(f"| {stage} | {backend} | {accuracy} | {row['latency_p50_ms']:.1f} | "
+                         f"{row['latency_mean_ms']:.1f} | {ref_p50 / row['latency_p50_ms']:.2f}x |")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare INT8 / ONNX inference with the FP32 models.")
+    parser.add_argument("--stages", nargs="*", choices=list(YOLO_MODELS), help="Models to report (all by default)")
+    parser.add_argument("--backends", nargs="*", choices=CANDIDATE_BACKENDS, default=CANDIDATE_BACKENDS,
+                        help="Backends compared with FP32 torch")
+    parser.add_argument("--images", type=Path, help="Folder of drawings (default: the synthetic corpus)")
+    parser.add_argument("--calibration-dir", type=Path,
+                        help="Calibration drawings of missing INT8 models (default: the calibration corpus)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per image (fastest is kept)")
+    args = parser.parse_args(argv)
+
+    all_images = load_images(args.images)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "images": {},
+        "reference": REFERENCE_BACKEND,
+        "stages": {}
+    }
+    for stage in args.stages or YOLO_MODELS:
+        rel_path, task, imgsz = YOLO_MODELS[stage]
+        if "onnx-int8" in args.backends:
+            calibration = calibration_images(args.calibration_dir) if args.calibration_dir else build_calibration_corpus()
+            quantize_onnx(PROJECT_ROOT / rel_path, task, imgsz, images=calibration)  # no-op if up to date
+        images = held_out(stage, all_images)
+        if not images:
+            print(f"[FAIL] {stage}: no held-out image to evaluate")
+            return 1
+        report["images"][stage] = len(images)
+        print(f"[INFO] {stage}: running {REFERENCE_BACKEND}, {', '.join(args.backends)} on {len(images)} image(s)...")
+        ref_results, ref_latencies = run_backend(stage, REFERENCE_BACKEND, images, args.repeat)
+        rows = {REFERENCE_BACKEND: {"latency_p50_ms": statistics.median(ref_latencies) * 1000,
+                                    "latency_mean_ms": statistics.mean(ref_latencies) * 1000}}
+        for backend in args.backends:
+            results, latencies = run_backend(stage, backend, images, args.repeat)
+            rows[backend] = {**compare(task, ref_results, results),
+                             "latency_p50_ms": statistics.median(latencies) * 1000,
+                             "latency_mean_ms": statistics.mean(latencies) * 1000}
+        report["stages"][stage] = rows
+
+    table = format_table(report)
+    print("==================================================")
+    print(table)
+    print("==================================================")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    result_path = RESULTS_DIR / f"quant_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    result_path.write_text(json.dumps(report, indent=2))
+    result_path.with_suffix(".md").write_text(table + "\n")
+    print(f"[INFO] Report saved to {result_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Project: SoulSketch
+File   : benchmarks/run_benchmarks.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+End-to-end and per-stage benchmark of the SoulSketch pipeline (CPU only).
+- Builds the synthetic corpus (benchmarks/synthetic_corpus.py)
+- Full flow: every drawing is analyzed --repeat times (result cache and incremental re-run
+  disabled); per-stage latencies inside the flow come from the flow's metrics records
+- Stage isolation: each stage is then re-run alone, --repeat times, on the outputs the
+  flow left in the drawing's workspace
+- Reports p50 / p95 / mean latency per metric and the flow throughput (drawings per minute)
+- Compares the p50 of every metric with the stored baseline (benchmarks/baseline.json) and
+  exits with 1 when one is slower by more than --threshold (and by more than --min-delta seconds)
+
+Usage:
+    python benchmarks/run_benchmarks.py                     # run and compare with the baseline
+    python benchmarks/run_benchmarks.py --update-baseline   # run and store the result as baseline
+    python benchmarks/run_benchmarks.py --repeat 5 --threshold 0.1 --drawings small_sparse medium_scene
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# CPU only: hide every GPU before torch is imported by the stages
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.synthetic_corpus import build_corpus, CORPUS_SPEC, CORPUS_VERSION
+from backend_app.pipeline_engine import get_engine
+from backend_app.full_flow_runner import run_analysis_flow, forget_job, FLOW_STEPS
+from backend_app.upload_image import upload_image_to_shared
+from backend_app.workspace import create_job_workspace, use_workspace
+from backend_app.metrics import percentile
+
+# === CONFIGURATION ===
+BENCH_DIR = PROJECT_ROOT / "benchmarks"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+RESULTS_DIR = BENCH_DIR / "results"
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = float(os.environ.get("SOULSKETCH_BENCH_THRESHOLD", "0.20"))  # +20% p50
+DEFAULT_MIN_DELTA = 0.05  # seconds; smaller slowdowns are treated as noise
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def _read_flow_records(metrics_path: str) -> List[dict]:
+    with open(metrics_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def bench_drawing(image: Path, repeat: int, isolate_stages: bool, samples: Dict[str, List[float]]) -> None:
+    """
+    Benchmarks one drawing and appends its latencies (seconds) to samples.
+
+    Keys: 'flow', 'flow/<stage>' (stage inside the flow) and 'stage/<stage>' (stage alone).
+    """
+    workspace = create_job_workspace()
+    try:
+        upload = upload_image_to_shared(str(image), shared_dir=workspace.input_image.parent, verbose=False)
+        if not upload["success"]:
+            raise RuntimeError(f"{image.name} rejected by the input validation: {upload['error']}")
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run_analysis_flow(verbose=False, workspace=workspace, use_cache=False, incremental=False)
+            samples.setdefault("flow", []).append(time.perf_counter() - start)
+            for record in _read_flow_records(result["metrics_path"]):
+                if record["stage"] != "flow" and record["status"] == "success":
+                    samples.setdefault(f"flow/{record['stage']}", []).append(record["wall_s"])
+
+        if isolate_stages:
+            engine = get_engine()
+            with use_workspace(workspace):
+                for stage in FLOW_STEPS:
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        engine.run_stage(stage, verbose=False, log_file=io.StringIO())
+                        samples.setdefault(f"stage/{stage}", []).append(time.perf_counter() - start)
+    finally:
+        forget_job(workspace.job_id)
+        workspace.remove()
+
+
+def summarize(samples: Dict[str, List[float]], drawings: int) -> dict:
+    """
+    Returns:
+        dict: metric -> {"count", "p50", "p95", "mean"} plus the flow throughput.
+    """
+    metrics = {}
+    for key, values in sorted(samples.items()):
+        values = sorted(values)
+        metrics[key] = {
+            "count": len(values),
+            "p50": round(percentile(values, 50), 4),
+            "p95": round(percentile(values, 95), 4),
+            "mean": round(sum(values) / len(values), 4)
+        }
+    flow_total = sum(samples.get("flow", []))
+    return {
+        "metrics": metrics,
+        "throughput_drawings_per_min": round(len(samples.get("flow", [])) / flow_total * 60, 2) if flow_total else 0.0,
+        "drawings": drawings
+    }
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "device": "cpu"
+    }
+
+
+# =============================================================================
+# BASELINE COMPARISON
+# =============================================================================
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta: float) -> List[str]:
+    """
+    Returns:
+        List[str]: One line per regressed metric (empty when within the threshold).
+    """
+    regressions = []
+    for key, base in baseline.get("metrics", {}).items():
+        now = current["metrics"].get(key)
+        if now is None:
+            continue
+        delta = now["p50"] - base["p50"]
+        if delta > min_delta and now["p50"] > base["p50"] * (1 + threshold):
+            regressions.append(f"{key}: p50 {base['p50']:.3f}s -> {now['p50']:.3f}s "
+                               f"(+{delta / base['p50'] * 100 if base['p50'] else float('inf'):.0f}%)")
+
+    base_tp = baseline.get("throughput_drawings_per_min")
+    now_tp = current["throughput_drawings_per_min"]
+    if base_tp and now_tp < base_tp / (1 + threshold):
+        regressions.append(f"throughput: {base_tp:.2f} -> {now_tp:.2f} drawings/min")
+    return regressions
+
+
+def print_report(summary: dict, baseline: dict = None) -> None:
+    base_metrics = (baseline or {}).get("metrics", {})
+    print("==================================================")
+    print(f"{'metric':<28}{'p50 (s)':>10}{'p95 (s)':>10}{'mean (s)':>10}{'base p50':>10}")
+    for key, m in summary["metrics"].items():
+        base = base_metrics.get(key, {}).get("p50")
+        base_text = f"{base:>10.3f}" if base is not None else f"{'-':>10}"
+        print(f"{key:<28}{m['p50']:>10.3f}{m['p95']:>10.3f}{m['mean']:>10.3f}{base_text}")
+    print(f"Throughput: {summary['throughput_drawings_per_min']:.2f} drawings/min (full flow, 1 drawing at a time)")
+    print("==================================================")
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the SoulSketch pipeline on the synthetic corpus (CPU).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per drawing and per stage")
+    parser.add_argument("--drawings", nargs="*", choices=list(CORPUS_SPEC), help="Subset of the corpus")
+    parser.add_argument("--no-stages", action="store_true", help="Skip the stage isolation runs")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed p50 slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA, help="Ignore slowdowns below (s)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    images = build_corpus(names=args.drawings)
+    print(f"[INFO] Corpus v{CORPUS_VERSION}: {len(images)} drawing(s), {args.repeat} run(s) each, CPU only")
+
+    warm_start = time.perf_counter()
+    get_engine().warm_up()
+    samples = {"warm_up": [time.perf_counter() - warm_start]}
+
+    for image in images:
+        print(f"[INFO] Benchmarking {image.name}")
+        bench_drawing(image, args.repeat, not args.no_stages, samples)
+
+    summary = summarize(samples, len(images))
+    result = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "corpus_version": CORPUS_VERSION,
+        "drawings": [image.stem for image in images],
+        "repeat": args.repeat,
+        "machine": machine_info(),
+        **summary
+    }
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    result_path = RESULTS_DIR / f"bench_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    result_path.write_text(json.dumps(result, indent=2))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(result, indent=2))
+        print_report(summary)
+        print(f"[INFO] Baseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print_report(summary)
+        print(f"[WARN] No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    print_report(summary, baseline)
+    if baseline.get("corpus_version") != CORPUS_VERSION or baseline.get("drawings") != result["drawings"]:
+        print("[WARN] Baseline was measured on a different corpus; comparison may be meaningless.")
+    if baseline.get("machine", {}).get("processor") != result["machine"]["processor"]:
+        print("[WARN] Baseline was measured on a different CPU.")
+
+    regressions = compare(summary, baseline, args.threshold, args.min_delta)
+    print(f"[INFO] Results: {result_path}")
+    if regressions:
+        print(f"[FAIL] {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"[PASS] No regression above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Project: SoulSketch
+File   : benchmarks/synthetic_corpus.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Deterministic corpus of synthetic children's drawings for the benchmarks.
+- Every drawing is generated from a fixed seed, so the corpus is identical on every machine
+  and does not need to be stored in the repository
+- CORPUS_SPEC varies resolution, number of objects (houses, trees, suns) and number of
+  faces (people with eyes and a mouth), which drive the cost of OBJ_DET, FED and CEX
+- Images are written once to benchmarks/corpus/ and reused while their spec is unchanged
+- CALIBRATION_SPEC is a separate set (other seeds) for INT8 calibration, written to
+  benchmarks/corpus/calibration/, so the corpus stays held out from the calibration data
+"""
+
+import sys
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from PIL import Image, ImageDraw
+
+# === Auto-injected project root resolver ===
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# === CONFIGURATION ===
+CORPUS_DIR = PROJECT_ROOT / "benchmarks" / "corpus"
+CORPUS_VERSION = 1  # bump when the drawing code changes
+
+# name -> (width, height, objects, faces, seed)
+CORPUS_SPEC = {
+    "small_sparse":    (320, 240, 1, 0, 11),
+    "small_faces":     (320, 240, 1, 2, 12),
+    "medium_scene":    (800, 600, 4, 1, 21),
+    "medium_crowd":    (800, 600, 2, 5, 22),
+    "large_scene":     (1600, 1200, 8, 3, 31),
+    "xlarge_busy":     (2400, 1800, 12, 6, 41)
+}
+
+# Calibration drawings: the same range of scenes, never the seeds of CORPUS_SPEC
+CALIBRATION_DIR = CORPUS_DIR / "calibration"
+CALIBRATION_SPEC = {
+    f"calib_{i:02d}": (size[0], size[1], 1 + i % 8, i % 5, 1000 + i)
+    for i, size in enumerate([(320, 240), (640, 480), (800, 600), (1024, 768), (1600, 1200), (2400, 1800)] * 4)
+}
+
+PALETTE = [
+    (220, 40, 40), (250, 140, 20), (250, 220, 30), (60, 170, 60),
+    (40, 90, 220), (140, 60, 180), (120, 70, 30), (240, 120, 170), (30, 30, 30)
+]
+
+
+# =============================================================================
+# DRAWING PRIMITIVES
+# =============================================================================
+
+def _line_width(width: int) -> int:
+    return max(2, width // 200)
+
+
+def _draw_house(draw: ImageDraw.ImageDraw, x: int, y: int, size: int, rng: random.Random, lw: int) -> None:
+    wall, roof = rng.choice(PALETTE), rng.choice(PALETTE)
+    draw.rectangle([x, y + size // 3, x + size, y + size], fill=wall, outline=(0, 0, 0), width=lw)
+    draw.polygon([(x - size // 8, y + size // 3), (x + size // 2, y), (x + size + size // 8, y + size // 3)],
+                 fill=roof, outline=(0, 0, 0))
+    door_w = size // 5
+    draw.rectangle([x + size // 2 - door_w // 2, y + 2 * size // 3, x + size // 2 + door_w // 2, y + size],
+                   fill=(120, 70, 30), outline=(0, 0, 0), width=lw)
+
+
+def _draw_tree(draw: ImageDraw.ImageDraw, x: int, y: int, size: int, rng: random.Random, lw: int) -> None:
+    trunk_w = size // 6
+    draw.rectangle([x + size // 2 - trunk_w // 2, y + size // 2, x + size // 2 + trunk_w // 2, y + size],
+                   fill=(120, 70, 30), outline=(0, 0, 0), width=lw)
+    draw.ellipse([x, y, x + size, y + 2 * size // 3], fill=rng.choice(PALETTE[2:4]), outline=(0, 0, 0), width=lw)
+
+
+def _draw_sun(draw: ImageDraw.ImageDraw, x: int, y: int, size: int, rng: random.Random, lw: int) -> None:
+    cx, cy, r = x + size // 2, y + size // 2, size // 4
+    for i in range(8):
+        dx, dy = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)][i]
+        draw.line([cx + dx * r, cy + dy * r, cx + dx * 2 * r, cy + dy * 2 * r], fill=(250, 200, 0), width=lw)
+    draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=(250, 220, 30), outline=(0, 0, 0), width=lw)
+
+
+def _draw_person(draw: ImageDraw.ImageDraw, x: int, y: int, size: int, rng: random.Random, lw: int) -> None:
+    """Stick figure with a round face (eyes + smiling or sad mouth)."""
+    cx, head_r = x + size // 2, size // 5
+    head_box = [cx - head_r, y, cx + head_r, y + 2 * head_r]
+    draw.ellipse(head_box, fill=(250, 220, 190), outline=(0, 0, 0), width=lw)
+    eye_r = max(1, head_r // 6)
+    for ex in (cx - head_r // 2, cx + head_r // 2):
+        draw.ellipse([ex - eye_r, y + head_r // 2 + eye_r, ex + eye_r, y + head_r // 2 + 3 * eye_r], fill=(0, 0, 0))
+    mouth = [cx - head_r // 2, y + head_r, cx + head_r // 2, y + 3 * head_r // 2 + head_r // 4]
+    if rng.random() < 0.5:
+        draw.arc(mouth, 20, 160, fill=(0, 0, 0), width=lw)
+    else:
+        draw.arc([mouth[0], mouth[1] + head_r // 3, mouth[2], mouth[3] + head_r // 3], 200, 340,
+                 fill=(0, 0, 0), width=lw)
+
+    neck, hip = y + 2 * head_r, y + 2 * head_r + size // 3
+    draw.line([cx, neck, cx, hip], fill=rng.choice(PALETTE), width=lw * 2)
+    draw.line([cx - size // 4, neck + size // 10, cx + size // 4, neck + size // 10], fill=(0, 0, 0), width=lw)
+    draw.line([cx, hip, cx - size // 5, y + size], fill=(0, 0, 0), width=lw)
+    draw.line([cx, hip, cx + size // 5, y + size], fill=(0, 0, 0), width=lw)
+
+
+OBJECT_PAINTERS = [_draw_house, _draw_tree, _draw_sun]
+
+
+# =============================================================================
+# CORPUS
+# =============================================================================
+
+def render_drawing(width: int, height: int, objects: int, faces: int, seed: int) -> Image.Image:
+    """
+    Returns:
+        Image.Image: A white canvas with ground, sky strokes, objects and people.
+    """
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    lw = _line_width(width)
+
+    # Ground and a few crayon strokes of sky
+    draw.rectangle([0, int(height * 0.85), width, height], fill=(90, 180, 70))
+    for _ in range(6):
+        sx, sy = rng.randrange(width), rng.randrange(int(height * 0.2))
+        draw.line([sx, sy, sx + width // 6, sy + rng.randrange(-10, 10)], fill=(80, 150, 240), width=lw * 2)
+
+    size = max(40, min(width, height) // 4)
+    for i in range(objects):
+        x = rng.randrange(0, max(1, width - size))
+        y = rng.randrange(int(height * 0.15), max(int(height * 0.15) + 1, int(height * 0.85) - size))
+        OBJECT_PAINTERS[i % len(OBJECT_PAINTERS)](draw, x, y, size, rng, lw)
+    for _ in range(faces):
+        x = rng.randrange(0, max(1, width - size))
+        y = rng.randrange(int(height * 0.1), max(int(height * 0.1) + 1, height - size))
+        _draw_person(draw, x, y, size, rng, lw)
+    return img
+
+
+def build_corpus(corpus_dir: Path = CORPUS_DIR, names: List[str] = None, spec: Dict[str, tuple] = None) -> List[Path]:
+    """
+    Writes the corpus images that are missing or outdated.
+
+    Args:
+        corpus_dir (Path): Output folder.
+        names (List[str] | None): Subset of the spec (all by default).
+        spec (Dict[str, tuple] | None): name -> drawing parameters (CORPUS_SPEC by default).
+
+    Returns:
+        List[Path]: Corpus images, in spec order.
+    """
+    spec = spec or CORPUS_SPEC
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = corpus_dir / "corpus.json"
+    manifest = {"version": CORPUS_VERSION, "spec": spec}
+    up_to_date = manifest_path.exists() and json.loads(manifest_path.read_text()) == json.loads(json.dumps(manifest))
+
+    for name, params in spec.items():
+        path = corpus_dir / f"{name}.png"
+        if not (up_to_date and path.exists()):
+            render_drawing(*params).save(path)
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    return [corpus_dir / f"{name}.png" for name in names or spec]
+
+
+def build_calibration_corpus() -> List[Path]:
+    """
+    Returns:
+        List[Path]: The INT8 calibration drawings (CALIBRATION_SPEC), written if missing.
+    """
+    return build_corpus(CALIBRATION_DIR, spec=CALIBRATION_SPEC)
+
+
+if __name__ == "__main__":
+    for image in build_corpus():
+        print(f"[INFO] {image}")
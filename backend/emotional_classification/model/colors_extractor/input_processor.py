@@ -6,7 +6,8 @@ Authors: Itay Vazana & Oriya Even Chen
 Description:
 Image preprocessing module for Color Extraction (CEX).
 Includes contrast boosting, LAB-based enhancement,
-and utility functions to load original drawing, object crops, and facial expression crops.
+and utility functions to load original drawing, object crops, and facial expression crops
+(through the job's artifact store, so crops produced in the same flow are not decoded again).
 """
 
 import sys
@@ -25,6 +26,9 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.artifact_store import get_artifact_store
+from backend_app.image_cache import get_image_variant, register_variant
+
 # ==== Preprocessing Functions ====
 def boost_contrast_saturation(image: np.ndarray, alpha: float = 1.5, beta: int = 20) -> np.ndarray:
     """
@@ -80,46 +84,65 @@ def preprocess_for_cex(image: np.ndarray, mode: str = "lab") -> np.ndarray:
     else:
         raise ValueError(f"Unsupported preprocessing mode: {mode}")
 
-# ==== Fixed Image Paths ====
-ORIGINAL_IMAGE_PATH = PROJECT_ROOT / "shared_memory" / "0_BE_input" / "original_input.png"
-COLORED_CROPS_DIR = PROJECT_ROOT / "shared_memory" / "2_OBJ_DET_out" / "objects" / "colored" / "crops"
-FACIAL_CROPS_DIR = PROJECT_ROOT / "shared_memory" / "3_FED_out" / "facial_expressions" / "crops"
+# Preprocessed drawing, one cached variant per mode
+for _mode in ("boost", "lab"):
+    register_variant(f"cex_{_mode}", "bgr", lambda image, _mode=_mode: preprocess_for_cex(image, mode=_mode))
+
+# ==== Image Paths (relative to the job workspace) ====
+ORIGINAL_IMAGE_SUBPATH = ("0_BE_input", "original_input.png")
+COLORED_CROPS_SUBDIR = ("2_OBJ_DET_out", "objects", "colored", "crops")
+FACIAL_CROPS_SUBDIR = ("3_FED_out", "facial_expressions", "crops")
 
 # ==== Loaders ====
-def load_original_image() -> np.ndarray:
+def load_original_image(mode: str = None) -> np.ndarray:
     """
-    Loads the original drawing image.
+    Loads the original drawing image from the job's image cache.
+
+    Args:
+        mode (str | None): Return it already preprocessed (see preprocess_for_cex);
+            the result is computed once per job.
 
     Returns:
-        np.ndarray: Loaded image.
+        np.ndarray: Loaded image (read-only).
     """
-    image = cv2.imread(str(ORIGINAL_IMAGE_PATH))
-    if image is None:
-        raise FileNotFoundError(f"Original input image not found at {ORIGINAL_IMAGE_PATH}")
-    return image
+    if mode is None:
+        return get_image_variant(ORIGINAL_IMAGE_SUBPATH)
+    return get_image_variant(ORIGINAL_IMAGE_SUBPATH, f"cex_{mode}")
 
-def load_colored_crops() -> List[Tuple[str, str, np.ndarray]]:
+def _load_crops(crops_subdir: tuple, kind: str) -> List[Tuple[str, str, np.ndarray]]:
     """
-    Loads all cropped object images.
+    Loads the crops of a folder from the job's artifact store (in memory when the
+    producing stage ran in the same flow, from disk otherwise).
 
     Returns:
-        List[Tuple[str, str, np.ndarray]]: List of (filename, object_type, image).
+        List[Tuple[str, str, np.ndarray]]: List of (filename, type, image), sorted by filename.
     """
     crops = []
-    if not COLORED_CROPS_DIR.exists():
-        print(f"[WARN] Object crops directory does not exist: {COLORED_CROPS_DIR}")
+    store = get_artifact_store()
+    names = store.list(crops_subdir, suffix=".png")
+    if not names:
+        print(f"[WARN] No {kind} crops found in: {store.workspace.path(*crops_subdir)}")
         return crops
 
-    for file in sorted(COLORED_CROPS_DIR.glob("*.png")):
-        filename = file.stem
+    for name in names:
+        filename = Path(name).stem
         if "_" not in filename:
             continue
-        crop_id, obj_type = filename.split("_", 1)
-        image = cv2.imread(str(file))
+        crop_id, crop_type = filename.split("_", 1)
+        image = store.get_image((*crops_subdir, name))
         if image is not None:
-            crops.append((filename, obj_type, image))
+            crops.append((filename, crop_type, image))
     return crops
 
+def load_colored_crops() -> List[Tuple[str, str, np.ndarray]]:
+    """
+    Loads all cropped object images.
+
+    Returns:
+        List[Tuple[str, str, np.ndarray]]: List of (filename, object_type, image).
+    """
+    return _load_crops(COLORED_CROPS_SUBDIR, "object")
+
 def load_facial_expression_crops() -> List[Tuple[str, str, np.ndarray]]:
     """
     Loads all cropped facial expression images.
@@ -127,17 +150,4 @@ def load_facial_expression_crops() -> List[Tuple[str, str, np.ndarray]]:
     Returns:
         List[Tuple[str, str, np.ndarray]]: List of (filename, expression_type, image).
     """
-    crops = []
-    if not FACIAL_CROPS_DIR.exists():
-        print(f"[WARN] Facial crops directory does not exist: {FACIAL_CROPS_DIR}")
-        return crops
-
-    for file in sorted(FACIAL_CROPS_DIR.glob("*.png")):
-        filename = file.stem
-        if "_" not in filename:
-            continue
-        crop_id, expr_type = filename.split("_", 1)
-        image = cv2.imread(str(file))
-        if image is not None:
-            crops.append((filename, expr_type, image))
-    return crops
+    return _load_crops(FACIAL_CROPS_SUBDIR, "facial expression")
@@ -0,0 +1,166 @@
+"""
+Project: SoulSketch
+File: colors_extractor/models/color_clustering.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Dominant-color clustering engine of CEX.
+- Pixel pre-filter in integer arithmetic, chunk by chunk: drops near-white pixels
+  (channel mean >= 240) and flat gray pixels (channel std <= 15), exactly as the former
+  float64 np.mean / np.std test
+- "histogram" (default): kept pixels are quantized into a 3-D color histogram
+  (HISTOGRAM_BITS per channel); KMeans clusters the occupied bins, each at the exact mean
+  color of its pixels and weighted by its pixel count. The cost no longer grows with the
+  image size beyond one pass over the pixels
+- "minibatch": MiniBatchKMeans on a stratified sample (one random pixel per equal slice of
+  the image), cluster sizes estimated from the sample
+- "kmeans": KMeans on every kept pixel (former behavior, kept as the reference)
+"""
+
+import sys
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+# ==== Project Root Resolution ====
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name != "model":
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from models.models_config import (
+    CLUSTERING_METHOD,
+    HISTOGRAM_BITS,
+    MINIBATCH_SAMPLE_SIZE,
+    CLUSTERING_SEED
+)
+
+# === CONFIGURATION ===
+CLUSTERING_METHODS = ("histogram", "minibatch", "kmeans")
+WHITE_MEAN = 240       # pixels whose channel mean is >= this are background
+FLAT_STD = 15          # pixels whose channel std is <= this are flat gray
+PIXEL_CHUNK = 1 << 20  # pixels per pre-filter chunk (bounds the int32 temporaries)
+
+# mean < 240  <=>  r + g + b < 720
+# std > 15    <=>  (3 * (r^2 + g^2 + b^2) - (r + g + b)^2) / 9 > 225  <=>  3 * sq - sum^2 > 2025
+_MAX_SUM = 3 * WHITE_MEAN
+_MIN_SPREAD = 9 * FLAT_STD * FLAT_STD
+
+
+def _chunks(pixels: np.ndarray):
+    for start in range(0, len(pixels), PIXEL_CHUNK):
+        yield pixels[start:start + PIXEL_CHUNK]
+
+
+def _keep_mask(chunk: np.ndarray) -> np.ndarray:
+    r, g, b = (chunk[:, k].astype(np.int32) for k in range(3))
+    total = r + g + b
+    spread = 3 * (r * r + g * g + b * b) - total * total
+    return (total < _MAX_SUM) & (spread > _MIN_SPREAD)
+
+
+# ==== Function: filter_pixels ====
+def filter_pixels(pixels: np.ndarray) -> np.ndarray:
+    """
+    Drops the near-white and flat pixels.
+
+    Args:
+        pixels (np.ndarray): N x 3 uint8 RGB pixels.
+
+    Returns:
+        np.ndarray: The kept pixels (uint8).
+    """
+    kept = [chunk[_keep_mask(chunk)] for chunk in _chunks(pixels)]
+    return np.concatenate(kept) if kept else pixels[:0]
+
+
+# ==== Function: color_histogram ====
+def color_histogram(pixels: np.ndarray, bits: int = HISTOGRAM_BITS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pre-filters the pixels and bins them into a 3-D color histogram.
+
+    Args:
+        pixels (np.ndarray): N x 3 uint8 RGB pixels (unfiltered).
+        bits (int): Bits kept per channel.
+
+    Returns:
+        tuple: (K x 3 float mean color of each occupied bin, K pixel counts)
+    """
+    shift = 8 - bits
+    n_bins = 1 << (3 * bits)
+    counts = np.zeros(n_bins, dtype=np.int64)
+    sums = np.zeros((3, n_bins), dtype=np.float64)
+    for chunk in _chunks(pixels):
+        kept = chunk[_keep_mask(chunk)]
+        if not len(kept):
+            continue
+        q = (kept >> shift).astype(np.int32)
+        bins = (q[:, 0] << (2 * bits)) | (q[:, 1] << bits) | q[:, 2]
+        counts += np.bincount(bins, minlength=n_bins)
+        for k in range(3):
+            sums[k] += np.bincount(bins, weights=kept[:, k], minlength=n_bins)
+
+    occupied = np.flatnonzero(counts)
+    return (sums[:, occupied] / counts[occupied]).T, counts[occupied]
+
+
+def _stratified_sample(pixels: np.ndarray, size: int, seed: int) -> np.ndarray:
+    """One random pixel from each of `size` equal, consecutive slices of the image."""
+    if len(pixels) <= size:
+        return pixels
+    edges = (np.arange(size + 1, dtype=np.int64) * len(pixels)) // size
+    rng = np.random.default_rng(seed)
+    return pixels[edges[:-1] + rng.integers(0, np.diff(edges))]
+
+
+# ==== Function: cluster_colors ====
+def cluster_colors(pixels: np.ndarray, n_clusters: int, method: str = CLUSTERING_METHOD,
+                   seed: int = CLUSTERING_SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the dominant colors of an image.
+
+    Args:
+        pixels (np.ndarray): N x 3 uint8 RGB pixels (unfiltered).
+        n_clusters (int): Number of dominant colors.
+        method (str): One of CLUSTERING_METHODS.
+        seed (int): Random state of the clustering (and of the sample).
+
+    Returns:
+        tuple: (k x 3 int dominant colors, k pixel counts), empty if no pixel survives the
+        pre-filter. k < n_clusters when the image has fewer distinct colors.
+    """
+    if method not in CLUSTERING_METHODS:
+        raise ValueError(f"Unknown clustering method '{method}' (expected one of {', '.join(CLUSTERING_METHODS)})")
+
+    if method == "histogram":
+        colors, weights = color_histogram(pixels)
+        if len(colors) <= n_clusters:
+            return colors.astype(int), weights
+        kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=seed)
+        kmeans.fit(colors, sample_weight=weights)
+        counts = np.bincount(kmeans.labels_, weights=weights, minlength=n_clusters).astype(np.int64)
+        return kmeans.cluster_centers_.astype(int), counts
+
+    kept = filter_pixels(pixels)
+    if len(kept) == 0:
+        return np.empty((0, 3), dtype=int), np.empty(0, dtype=np.int64)
+
+    if method == "minibatch":
+        sample = _stratified_sample(kept, MINIBATCH_SAMPLE_SIZE, seed)
+        if len(np.unique(sample, axis=0)) <= n_clusters:
+            return cluster_colors(pixels, n_clusters, "histogram", seed)
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, n_init=3, batch_size=4096, random_state=seed)
+        kmeans.fit(sample)
+        # cluster sizes scaled from the sample to the kept pixels
+        counts = np.bincount(kmeans.labels_, minlength=n_clusters) * (len(kept) / len(sample))
+        return kmeans.cluster_centers_.astype(int), np.rint(counts).astype(np.int64)
+
+    kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=seed)
+    kmeans.fit(kept)
+    return kmeans.cluster_centers_.astype(int), np.bincount(kmeans.labels_, minlength=n_clusters)
@@ -0,0 +1,157 @@
+"""
+Project: SoulSketch
+File: colors_extractor/models/color_lut.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Lookup tables mapping any RGB value to its named color and emotion, built once at import
+from models_config (COLOR_RANGES, EMOTIONS, EMOTION_COLOR_MAP).
+- One 256-entry table per channel holds, for each channel value, the bitmask of the named
+  colors whose range accepts it; AND-ing the three masks gives every matching color, and a
+  first-match table turns the mask into the color id (COLOR_RANGES order, as the former
+  dict walk). Exact at every range boundary, no quantization, a few KB in total
+- Color id -> emotion id follows EMOTION_COLOR_MAP order (first emotion listing the color)
+- Works on a single color, on cluster centers or on every pixel of an image / mask in one
+  vectorized pass (pixel_color_proportions)
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# ==== Project Root Resolution ====
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name != "model":
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from models.models_config import COLOR_RANGES, EMOTIONS, EMOTION_COLOR_MAP
+from models.color_clustering import filter_pixels
+
+# === CONFIGURATION ===
+COLOR_NAMES = tuple(COLOR_RANGES)
+UNKNOWN_COLOR = len(COLOR_NAMES)  # color id of an RGB value outside every range
+NO_EMOTION = len(EMOTIONS)        # emotion id of a color no emotion lists
+
+
+def _build_channel_masks() -> np.ndarray:
+    masks = np.zeros((3, 256), dtype=np.uint32)
+    values = np.arange(256)
+    for bit, ranges in enumerate(COLOR_RANGES.values()):
+        for k, channel in enumerate("rgb"):
+            low, high = ranges[channel]
+            masks[k, (values >= low) & (values <= high)] |= np.uint32(1 << bit)
+    return masks
+
+
+def _build_first_match() -> np.ndarray:
+    table = np.full(1 << len(COLOR_NAMES), UNKNOWN_COLOR, dtype=np.uint8)
+    for mask in range(1, len(table)):
+        table[mask] = (mask & -mask).bit_length() - 1  # lowest set bit = first color in COLOR_RANGES
+    return table
+
+
+def _build_color_emotions() -> np.ndarray:
+    emotion_ids = np.full(len(COLOR_NAMES) + 1, NO_EMOTION, dtype=np.uint8)
+    for color_id, name in enumerate(COLOR_NAMES):
+        for emotion, colors in EMOTION_COLOR_MAP.items():
+            if name in colors:
+                emotion_ids[color_id] = EMOTIONS.index(emotion)
+                break
+    return emotion_ids
+
+
+CHANNEL_MASKS = _build_channel_masks()     # 3 x 256: channel value -> bitmask of accepting colors
+FIRST_MATCH = _build_first_match()         # bitmask -> color id (UNKNOWN_COLOR for 0)
+COLOR_EMOTION_IDS = _build_color_emotions()  # color id -> emotion id (NO_EMOTION if none)
+
+# plain-list copies for single colors (indexing a list is cheaper than a NumPy call)
+_MASK_LISTS = CHANNEL_MASKS.tolist()
+_FIRST_MATCH_LIST = FIRST_MATCH.tolist()
+_EMOTION_BY_NAME = {name: EMOTIONS[e] for name, e in zip(COLOR_NAMES, COLOR_EMOTION_IDS.tolist()) if e != NO_EMOTION}
+
+
+# ==== Function: color_ids ====
+def color_ids(pixels: np.ndarray) -> np.ndarray:
+    """
+    Maps RGB values to named color ids.
+
+    Args:
+        pixels (np.ndarray): ... x 3 integer RGB values in 0-255 (one color, N colors or an image).
+
+    Returns:
+        np.ndarray: uint8 ids into COLOR_NAMES (UNKNOWN_COLOR where no range matches), shape pixels.shape[:-1].
+    """
+    pixels = np.asarray(pixels)
+    mask = CHANNEL_MASKS[0, pixels[..., 0]] & CHANNEL_MASKS[1, pixels[..., 1]] & CHANNEL_MASKS[2, pixels[..., 2]]
+    return FIRST_MATCH[mask]
+
+
+# ==== Function: emotion_ids ====
+def emotion_ids(pixels: np.ndarray) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: uint8 ids into EMOTIONS (NO_EMOTION where the color maps to none), shape pixels.shape[:-1].
+    """
+    return COLOR_EMOTION_IDS[color_ids(pixels)]
+
+
+# ==== Function: color_name ====
+def color_name(rgb: Sequence[int]) -> Optional[str]:
+    """
+    Returns:
+        Optional[str]: Name of the named color of an RGB value, or None if no range matches.
+    """
+    r, g, b = (int(v) for v in rgb)
+    color_id = _FIRST_MATCH_LIST[_MASK_LISTS[0][r] & _MASK_LISTS[1][g] & _MASK_LISTS[2][b]]
+    return COLOR_NAMES[color_id] if color_id != UNKNOWN_COLOR else None
+
+
+# ==== Function: color_emotion ====
+def color_emotion(name: Optional[str]) -> Optional[str]:
+    """
+    Returns:
+        Optional[str]: Emotion associated with a named color, or None.
+    """
+    return _EMOTION_BY_NAME.get(name)
+
+
+# ==== Function: pixel_color_proportions ====
+def pixel_color_proportions(image_rgb: np.ndarray, mask: Optional[np.ndarray] = None,
+                            drop_background: bool = True) -> Dict:
+    """
+    Per-pixel color and emotion proportions of an image or of a region of it.
+
+    Args:
+        image_rgb (np.ndarray): H x W x 3 uint8 RGB image.
+        mask (Optional[np.ndarray]): H x W boolean mask of the region (whole image if None).
+        drop_background (bool): Leave out the near-white and flat pixels, as the clustering does.
+
+    Returns:
+        Dict: {"pixels": counted pixels,
+               "colors": {color name or "unknown": share},
+               "emotions": {emotion: share}} - emotion shares sum to the share of the colors
+               some emotion lists. Shares are empty when no pixel is counted.
+    """
+    pixels = image_rgb[mask] if mask is not None else image_rgb.reshape((-1, 3))
+    if drop_background:
+        pixels = filter_pixels(pixels)
+    total = len(pixels)
+    if total == 0:
+        return {"pixels": 0, "colors": {}, "emotions": {}}
+
+    color_counts = np.bincount(color_ids(pixels), minlength=UNKNOWN_COLOR + 1)
+    emotion_counts = np.bincount(COLOR_EMOTION_IDS[:UNKNOWN_COLOR + 1], weights=color_counts,
+                                 minlength=NO_EMOTION + 1)
+    names = COLOR_NAMES + ("unknown",)
+    return {
+        "pixels": int(total),
+        "colors": {names[i]: float(c) / total for i, c in enumerate(color_counts) if c},
+        "emotions": {EMOTIONS[i]: float(c) / total for i, c in enumerate(emotion_counts[:NO_EMOTION]) if c}
+    }
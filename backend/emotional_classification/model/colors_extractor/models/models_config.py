@@ -22,6 +22,12 @@ if str(PROJECT_ROOT) not in sys.path:
 NUM_DOMINANT_COLORS = 5
 COLOR_DISTANCE_METRIC = "euclidean"
 
+# ==== Dominant Color Clustering (see models/color_clustering.py) ====
+CLUSTERING_METHOD = "histogram"  # "histogram", "minibatch" or "kmeans" (every pixel, former behavior)
+HISTOGRAM_BITS = 5               # levels kept per channel: 2 ** 5 = 32 -> 32768 color bins
+MINIBATCH_SAMPLE_SIZE = 20000    # pixels of the stratified sample clustered by "minibatch"
+CLUSTERING_SEED = 0              # fixed seed: the same image always gives the same palette
+
 # ==== Emotion Definitions ====
 EMOTIONS = [
     "Happiness", "Sadness", "Fear",
@@ -34,6 +40,20 @@ ALLOWED_COLORS = [
     "yellow", "orange", "pink", "purple", "brown"
 ]
 
+# ==== Named Color RGB Ranges (first match wins, see models/color_lut.py) ====
+COLOR_RANGES = {
+    "red":    {"r": (200, 255), "g": (0, 80),   "b": (0, 80)},
+    "blue":   {"r": (0, 80),    "g": (0, 80),   "b": (180, 255)},
+    "green":  {"r": (0, 100),   "g": (100, 200),"b": (0, 100)},
+    "yellow": {"r": (200, 255), "g": (200, 255),"b": (0, 80)},
+    "orange": {"r": (200, 255), "g": (100, 200),"b": (0, 80)},
+    "pink":   {"r": (180, 255), "g": (70, 200), "b": (140, 255)},
+    "purple": {"r": (80, 180),  "g": (0, 80),   "b": (80, 180)},
+    "gray":   {"r": (90, 180),  "g": (90, 180), "b": (90, 180)},
+    "black":  {"r": (0, 50),    "g": (0, 50),   "b": (0, 50)},
+    "brown":  {"r": (110, 190), "g": (50, 120), "b": (30, 100)}
+}
+
 # ==== Object Types ====
 OBJECT_TYPES = {
     "person": {},
@@ -27,6 +27,8 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from models.color_lut import color_name
+
 # ==== Predefined Colors ====
 COLOR_RGB_REFERENCE = {
     "red": (255, 0, 0), "blue": (0, 0, 255), "green": (0, 128, 0),
@@ -34,28 +36,9 @@ COLOR_RGB_REFERENCE = {
     "purple": (128, 0, 128), "gray": (128, 128, 128), "black": (0, 0, 0), "brown": (139, 69, 19)
 }
 
-COLOR_RANGES = {
-    "red":    {"r": (200, 255), "g": (0, 80),   "b": (0, 80)},
-    "blue":   {"r": (0, 80),    "g": (0, 80),   "b": (180, 255)},
-    "green":  {"r": (0, 100),   "g": (100, 200),"b": (0, 100)},
-    "yellow": {"r": (200, 255), "g": (200, 255),"b": (0, 80)},
-    "orange": {"r": (200, 255), "g": (100, 200),"b": (0, 80)},
-    "pink":   {"r": (180, 255), "g": (70, 200), "b": (140, 255)},
-    "purple": {"r": (80, 180),  "g": (0, 80),   "b": (80, 180)},
-    "gray":   {"r": (90, 180),  "g": (90, 180), "b": (90, 180)},
-    "black":  {"r": (0, 50),    "g": (0, 50),   "b": (0, 50)},
-    "brown":  {"r": (110, 190), "g": (50, 120), "b": (30, 100)}
-}
-
 # ==== Color Matching Helper ====
 def match_color_by_range(rgb: tuple) -> str:
-    for color, ranges in COLOR_RANGES.items():
-        r, g, b = rgb
-        if (ranges["r"][0] <= r <= ranges["r"][1] and
-            ranges["g"][0] <= g <= ranges["g"][1] and
-            ranges["b"][0] <= b <= ranges["b"][1]):
-            return color
-    return "unknown"
+    return color_name(rgb) or "unknown"
 
 # ==== Function: draw_color_map ====
 def draw_color_map(colors: List[Dict], title: str, highlight_unusual: bool = False):
@@ -0,0 +1,163 @@
+"""
+Project: SoulSketch
+File: colors_extractor/models/plot_renderer.py
+Authors: Itay Vazana & Oriya Even Chen
+
+Description:
+Pooled renderer of the color-emotion figure of an entity (drawing/object/expression):
+RGB -> mapped color -> emotion chart next to the pie chart of color proportions.
+- Each renderer owns one Agg figure template (size, DPI, the two panels, the title) built once;
+  a render clears the panels, draws the entity and writes the PNG bytes
+- No pyplot: figures are never registered in pyplot's figure manager, so nothing has to be
+  closed and memory stays flat however many entities a long-lived process renders
+- The two panels are drawn directly in the final figure (the former plot_color_emotions
+  functions rasterized two intermediate figures and pasted them with imshow)
+- A small pool of renderers (SOULSKETCH_PLOT_RENDERERS) lets concurrent stages / jobs render
+  side by side: each figure is used by one thread at a time
+"""
+
+import io
+import os
+import sys
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# ==== Project Root Resolution ====
+PROJECT_ROOT = Path(__file__).resolve().parent
+while PROJECT_ROOT.name != "model":
+    if PROJECT_ROOT.parent == PROJECT_ROOT:
+        break
+    PROJECT_ROOT = PROJECT_ROOT.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# === CONFIGURATION ===
+FIGURE_SIZE = (14, 6)  # inches, as the former combined figure
+FIGURE_DPI = 150
+POOL_SIZE = max(1, int(os.environ.get("SOULSKETCH_PLOT_RENDERERS", "2")))
+MAP_ROW_POINTS = 0.55  # circle diameter, as a fraction of a row of the mapping chart
+
+COLOR_RGB_REFERENCE = {
+    "red": (255, 0, 0), "blue": (0, 0, 255), "green": (0, 128, 0),
+    "yellow": (255, 255, 0), "orange": (255, 165, 0), "pink": (255, 105, 180),
+    "purple": (128, 0, 128), "gray": (128, 128, 128), "black": (0, 0, 0), "brown": (139, 69, 19)
+}
+
+
+def _unit_rgb(rgb) -> Tuple[float, float, float]:
+    return tuple(v / 255 for v in rgb)
+
+
+class ColorPlotRenderer:
+    """
+    One reusable figure template for the color-emotion plots.
+    Not thread-safe: take renderers from the pool (render_color_plot) to share them.
+    """
+
+    def __init__(self, figsize: Tuple[float, float] = FIGURE_SIZE, dpi: int = FIGURE_DPI):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.map_ax, self.pie_ax = self.figure.subplots(1, 2)
+        self.title = self.figure.suptitle("", fontsize=20)
+        self.figure.tight_layout(pad=1.0, rect=(0, 0, 1, 0.92))  # layout fixed once, kept for every render
+        self.renders = 0
+
+    def _draw_map(self, colors: List[Dict], highlight_unusual: bool) -> None:
+        ax = self.map_ax
+        ax.set_xlim(0, 3)
+        ax.set_ylim(0, max(len(colors), 1))
+        ax.axis("off")
+        if not colors:
+            ax.text(1.5, 0.5, "No emotional color found", fontsize=12, ha="center", va="center")
+            return
+
+        # circles as scatter markers: sized in points, so they stay round in any panel shape
+        row_points = ax.get_window_extent().height * 72 / self.figure.dpi / max(len(colors), 4)
+        size = (row_points * MAP_ROW_POINTS) ** 2
+        for i, color_data in enumerate(colors):
+            rgb = tuple(color_data["rgb"])
+            mapped_name = color_data.get("color_name") or "unknown"
+            is_unusual = highlight_unusual and color_data.get("is_unusual", False)
+            y = len(colors) - i - 0.5
+
+            ax.scatter([0.4], [y], s=size, color=[_unit_rgb(rgb)], edgecolors="red" if is_unusual else "black")
+            ax.annotate("", xy=(1.0, y), xytext=(0.7, y), arrowprops=dict(arrowstyle="->", color="black"))
+            ax.scatter([1.3], [y], s=size, color=[_unit_rgb(COLOR_RGB_REFERENCE.get(mapped_name, (255, 255, 255)))])
+            label = f"{color_data['emotion']} ({mapped_name})"
+            if is_unusual:
+                label += " *Unusual*"
+            ax.text(1.8, y, label, fontsize=12, verticalalignment="center")
+
+    def _draw_pie(self, colors: List[Dict], title: str) -> None:
+        ax = self.pie_ax
+        ax.set_title(title, fontsize=14)
+        if not colors:
+            ax.axis("off")
+            return
+        labels = [f"{c.get('color_name') or 'unknown'} ({c['emotion']})" for c in colors]
+        ax.pie([c.get("proportion", 1) for c in colors], labels=labels, startangle=90, autopct="%1.1f%%",
+               colors=[_unit_rgb(c["rgb"]) for c in colors], textprops={"fontsize": 10})
+
+    def render_png(self, colors: List[Dict], title: str, pie_title: str, highlight_unusual: bool = False) -> bytes:
+        """
+        Draws one entity on the template and returns the PNG.
+
+        Args:
+            colors (List[Dict]): Color-emotion mappings (color_name, rgb, emotion, proportion, is_unusual).
+            title (str): Figure title.
+            pie_title (str): Title of the proportion pie.
+            highlight_unusual (bool): Outline colors unusual for the object in red.
+
+        Returns:
+            bytes: PNG image.
+        """
+        try:
+            self.title.set_text(title)
+            self._draw_map(colors, highlight_unusual)
+            self._draw_pie(colors, pie_title)
+            buffer = io.BytesIO()
+            self.canvas.print_png(buffer)
+            self.renders += 1
+            return buffer.getvalue()
+        finally:
+            # the artists of this entity are released here, even when drawing failed
+            self.map_ax.cla()
+            self.pie_ax.cla()
+
+
+_POOL: "queue.LifoQueue[ColorPlotRenderer]" = queue.LifoQueue()
+_CREATED = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _acquire() -> ColorPlotRenderer:
+    global _CREATED
+    try:
+        return _POOL.get_nowait()
+    except queue.Empty:
+        pass
+    with _POOL_LOCK:
+        if _CREATED < POOL_SIZE:
+            _CREATED += 1
+            return ColorPlotRenderer()
+    return _POOL.get()  # every renderer is busy: wait for one
+
+
+def render_color_plot(colors: List[Dict], title: str, pie_title: str, highlight_unusual: bool = False) -> bytes:
+    """
+    Renders a color-emotion figure with a pooled renderer.
+
+    Returns:
+        bytes: PNG image.
+    """
+    renderer = _acquire()
+    try:
+        return renderer.render_png(colors, title, pie_title, highlight_unusual)
+    finally:
+        _POOL.put(renderer)
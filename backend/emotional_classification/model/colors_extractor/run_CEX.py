@@ -33,29 +33,38 @@ from input_processor import (
 )
 from models.KNN_model import extract_emotional_colors
 from save_to_shared import save_to_shared_memory
+from backend_app.workspace import get_workspace
+from backend_app.metrics import measure
+from backend_app.progress_events import report_progress
 
 # ==== Constants and Paths ====
-TEMP_DIR = Path("temp")
-JSON_DIR = TEMP_DIR / "JSON"
-PLOTS_DIR = TEMP_DIR / "plots"
-
-DRAWING_JSON = JSON_DIR / "drawing_results.json"
-OBJECTS_JSON = JSON_DIR / "object_results.json"
-EXPRESSIONS_JSON = JSON_DIR / "facial_expression_results.json"
+DRAWING_JSON = "drawing_results.json"
+OBJECTS_JSON = "object_results.json"
+EXPRESSIONS_JSON = "facial_expression_results.json"
 
 SHARED_SUBDIR = "4_CEX_out/colors"
+PLOTS_KEY = f"{SHARED_SUBDIR}/plots"  # where plots_dir is published (for on-demand plots)
 PREPROCESS_MODE = "lab"  # Options: 'lab' or 'boost'
 
 
 # ==== Setup Directories ====
-def setup_directories():
+def setup_directories(temp_dir: Path) -> tuple[Path, Path]:
     """
     Ensures the temporary working directory is clean and prepared.
+
+    Args:
+        temp_dir (Path): Scratch folder of this stage in the job workspace.
+
+    Returns:
+        tuple[Path, Path]: The JSON and plots subfolders.
     """
-    if TEMP_DIR.exists():
-        shutil.rmtree(TEMP_DIR)
-    JSON_DIR.mkdir(parents=True, exist_ok=True)
-    PLOTS_DIR.mkdir(parents=True, exist_ok=True)
+    if temp_dir.exists():
+        shutil.rmtree(temp_dir)
+    json_dir = temp_dir / "JSON"
+    plots_dir = temp_dir / "plots"
+    json_dir.mkdir(parents=True, exist_ok=True)
+    plots_dir.mkdir(parents=True, exist_ok=True)
+    return json_dir, plots_dir
 
 
 # ==== Save JSON Utility ====
@@ -72,66 +81,74 @@ def save_json(data, path):
 
 
 # ==== Cleanup Temporary Directory ====
-def clean_temp():
+def clean_temp(temp_dir: Path):
     """
     Deletes the temporary working directory.
     """
-    if TEMP_DIR.exists():
-        shutil.rmtree(TEMP_DIR)
+    if temp_dir.exists():
+        shutil.rmtree(temp_dir)
 
 
 # ==== Main Pipeline ====
 def main():
     print("[INFO] Starting color extraction pipeline (CEX)...")
-    setup_directories()
+    temp_dir = get_workspace().temp_dir("CEX")
+    json_dir, plots_dir = setup_directories(temp_dir)
 
     # === Full Drawing ===
     print("[INFO] Processing original drawing...")
-    full_image = load_original_image()
-    processed_full = preprocess_for_cex(full_image, mode=PREPROCESS_MODE)
+    processed_full = load_original_image(mode=PREPROCESS_MODE)
     drawing_colors = extract_emotional_colors(
         image=processed_full,
-        output_dir=PLOTS_DIR,
-        entity_type="drawing"
+        output_dir=plots_dir,
+        entity_type="drawing",
+        plots_key=PLOTS_KEY
     )
-    save_json(drawing_colors, DRAWING_JSON)
+    save_json(drawing_colors, json_dir / DRAWING_JSON)
 
     # === Object Crops ===
     print("[INFO] Processing object crops...")
     object_results = {}
-    for crop_name, obj_type, image in load_colored_crops():
+    object_crops = load_colored_crops()
+    for index, (crop_name, obj_type, image) in enumerate(object_crops, start=1):
         processed_crop = preprocess_for_cex(image, mode=PREPROCESS_MODE)
         result = extract_emotional_colors(
             image=processed_crop,
-            output_dir=PLOTS_DIR,
+            output_dir=plots_dir,
             entity_type="object",
             entity_id=crop_name,
-            object_type=obj_type
+            object_type=obj_type,
+            plots_key=PLOTS_KEY
         )
         object_results[crop_name] = result
-    save_json(object_results, OBJECTS_JSON)
+        report_progress("CEX", index, len(object_crops), "object crops")
+    save_json(object_results, json_dir / OBJECTS_JSON)
 
     # === Facial Expression Crops ===
     print("[INFO] Processing facial expression crops...")
     expression_results = {}
-    for crop_name, expr_type, image in load_facial_expression_crops():
+    expression_crops = load_facial_expression_crops()
+    for index, (crop_name, expr_type, image) in enumerate(expression_crops, start=1):
         processed_expr = preprocess_for_cex(image, mode=PREPROCESS_MODE)
         result = extract_emotional_colors(
             image=processed_expr,
-            output_dir=PLOTS_DIR,
+            output_dir=plots_dir,
             entity_type="expression",
-            entity_id=crop_name
+            entity_id=crop_name,
+            plots_key=PLOTS_KEY
         )
         expression_results[crop_name] = result
-    save_json(expression_results, EXPRESSIONS_JSON)
+        report_progress("CEX", index, len(expression_crops), "expression crops")
+    save_json(expression_results, json_dir / EXPRESSIONS_JSON)
 
     # === Save to Shared Memory ===
     print("[INFO] Saving results to shared memory...")
-    save_to_shared_memory(TEMP_DIR, SHARED_SUBDIR)
+    with measure("disk_write"):
+        save_to_shared_memory(temp_dir, SHARED_SUBDIR)
 
     # === Cleanup ===
     print("[INFO] Cleaning up temp directory...")
-    clean_temp()
+    clean_temp(temp_dir)
 
     print("[INFO] Color extraction pipeline completed successfully.")
 
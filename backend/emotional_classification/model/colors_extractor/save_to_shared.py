@@ -22,22 +22,23 @@ while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.workspace import shared_path
+
 
 # ==== Function: save_to_shared_memory ====
 def save_to_shared_memory(src_dir, target_subdir_name):
     """
     Copies all contents from the given source directory into a target subdirectory
-    within the shared_memory folder of the project.
+    within the shared memory folder of the current job workspace.
 
     Args:
         src_dir (str or Path): The directory containing the final color extraction outputs.
-        target_subdir_name (str): The name of the subdirectory to create under shared_memory.
+        target_subdir_name (str): The name of the subdirectory to create under the job's shared memory.
     """
     src_dir = Path(src_dir)
 
     # Resolve target path under shared memory
-    project_root = Path(__file__).resolve().parents[1]
-    shared_base = project_root / "shared_memory" / target_subdir_name
+    shared_base = shared_path(target_subdir_name)
 
     # Clear existing contents if present
     if shared_base.exists():
@@ -5,7 +5,7 @@ Authors: Itay Vazana & Oriya Even Chen
 
 Description:
 Provides configuration settings and constants for the emotional classification model.
-Includes model path and emotion label definitions.
+Includes model path, inference backend and emotion label definitions.
 """
 
 import sys
@@ -24,6 +24,13 @@ if str(PROJECT_ROOT) not in sys.path:
 # Define the path to the trained emotional classification model file
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "ResNet18_trained.pt")
 
+# ==== Inference Backend ====
+# "torch" (eager .pt), "onnx" (exported once, served by ONNX Runtime on CPU) or "onnx-int8"
+# (the ONNX export quantized to INT8, calibrated on SOULSKETCH_CALIBRATION_DIR);
+# set with SOULSKETCH_EMCLS_BACKEND or SOULSKETCH_INFERENCE_BACKEND
+from backend_app.inference_backend import stage_backend
+INFERENCE_BACKEND = stage_backend("EMCLS")
+
 # ==== Emotion Labels ====
 # Ordered list of emotion labels corresponding to the model's output indices
 EMOTION_LABELS = [
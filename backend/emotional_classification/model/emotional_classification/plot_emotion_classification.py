@@ -24,7 +24,10 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.plot_lock import pyplot_section
+
 # ==== Function: plot_emotion_bar ====
+@pyplot_section
 def plot_emotion_bar(emotion_probs: List[float], labels: List[str], predicted_index: int, save_path: Path):
     """
     Generates a bar plot to visualize emotion probabilities.
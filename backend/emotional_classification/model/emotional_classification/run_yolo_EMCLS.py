@@ -7,6 +7,8 @@ Description:
 Loads a YOLO-based emotion classification model, applies it to a predefined input image,
 generates a probability plot for the predicted emotion, and saves the result and visualization
 to the shared memory directory for further use.
+The boosted input is served by the job's decoded-image cache (decoded once for all stages).
+The plot follows the job's plot mode (rendered now, skipped or rendered on demand).
 """
 
 import sys
@@ -15,13 +17,18 @@ import os
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
-from ultralytics import YOLO
-from PIL import Image
 import numpy as np
 import cv2
 import matplotlib.pyplot as plt
 from emotional_classification.model import model_config
 from emotional_classification.save_to_shared import save_emotion_result
+from backend_app.workspace import shared_path
+from backend_app.plot_lock import pyplot_section
+from backend_app.metrics import measure
+from backend_app.plot_policy import render_plot
+from backend_app.image_cache import get_input_image, register_variant
+from backend_app.inference_backend import load_yolo, yolo_warm_up
+from backend_app.model_registry import register_model, use_model, get_model_registry
 
 # ==== Project Root Resolution ====
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -36,42 +43,49 @@ if str(PROJECT_ROOT) not in sys.path:
 # ==== Configuration and Paths ====
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(CURRENT_DIR, "model", "Yolo_Classifier.pt")
-INPUT_IMAGE_PATH = os.path.abspath(os.path.join(CURRENT_DIR, "..", "shared_memory", "0_BE_input", "original_input.png"))
-PLOT_OUTPUT_DIR = os.path.abspath(os.path.join(CURRENT_DIR, "..", "shared_memory", "1_EC_out", "plots"))
-PLOT_OUTPUT_PATH = os.path.join(PLOT_OUTPUT_DIR, "emotion_probs_plot.png")
 EMOTION_LABELS = model_config.EMOTION_LABELS
 
+# ==== Workspace Paths (resolved per job) ====
+def input_image_path() -> str:
+    return str(shared_path("0_BE_input", "original_input.png"))
+
+PLOT_KEY = "1_EC_out/plots/emotion_probs_plot.png"
+
+def plot_output_path() -> str:
+    return str(shared_path(*PLOT_KEY.split("/")))
+
 # ==== Function: boost_colors ====
-def boost_colors(pil_img, alpha=1.3, beta=15):
+def boost_colors(image: np.ndarray, alpha=1.3, beta=15) -> np.ndarray:
     """
     Enhances contrast and brightness of an image to improve model performance.
+    The same scale is applied to every channel, so BGR and RGB inputs give the same result.
 
     Args:
-        pil_img (PIL.Image): Input image.
+        image (np.ndarray): Input image.
         alpha (float): Contrast control factor.
         beta (int): Brightness control factor.
 
     Returns:
-        PIL.Image: Enhanced image.
+        np.ndarray: Enhanced image (same channel order).
     """
-    img = np.array(pil_img.convert("RGB"))
-    img = cv2.convertScaleAbs(img, alpha=alpha, beta=beta)
-    return Image.fromarray(img)
+    return cv2.convertScaleAbs(image, alpha=alpha, beta=beta)
+
+# Boosted input, computed once per job by the decoded-image cache
+BOOSTED_VARIANT = "emcls_boosted"
+register_variant(BOOSTED_VARIANT, "bgr", boost_colors)
 
 # ==== Function: classify_with_yolo ====
-def classify_with_yolo(model, image_path: str):
+def classify_with_yolo(model, boosted: np.ndarray):
     """
     Applies YOLO classifier on the input image and returns probabilities and top prediction.
 
     Args:
-        model (YOLO): Preloaded YOLO model.
-        image_path (str): Path to the input image.
+        model (YOLO): Preloaded YOLO model (held through use_model()).
+        boosted (np.ndarray): Boosted input image (BGR, as ultralytics expects arrays).
 
     Returns:
         Tuple[List[float], dict]: List of class probabilities and prediction result with label and confidence.
     """
-    image = Image.open(image_path).convert("RGB")
-    boosted = boost_colors(image)
     results = model(boosted, verbose=False)
     probs = results[0].probs
     top_idx = int(probs.top1)
@@ -82,6 +96,7 @@ def classify_with_yolo(model, image_path: str):
     }
 
 # ==== Function: plot_emotion_distribution ====
+@pyplot_section
 def plot_emotion_distribution(probabilities, labels, save_path):
     """
     Plots a bar chart representing the model's output probabilities for each emotion.
@@ -104,29 +119,52 @@ def plot_emotion_distribution(probabilities, labels, save_path):
     plt.savefig(save_path, dpi=150)
     plt.close()
 
-# ==== Main Execution Block ====
-if __name__ == "__main__":
+# ==== Model (loaded on first use by the model registry) ====
+def load_model():
+    """
+    Returns:
+        YOLO: The YOLO classifier, with the backend of model_config.
+    """
+    return load_yolo("EMCLS", MODEL_PATH, model_config.INFERENCE_BACKEND)
+
+register_model("EMCLS", load_model, warm_up=yolo_warm_up("EMCLS"))
+
+# ==== Function: main ====
+def main():
+    """
+    Runs emotion classification on the shared input image and stores the result and plot.
+    """
     try:
-        print("[INFO] Loading YOLO model...")
-        model = YOLO(MODEL_PATH)
+        with measure("model_load"):
+            get_model_registry().load("EMCLS")
+        image_path = input_image_path()
 
         print("[INFO] Checking for input image...")
-        if not os.path.isfile(INPUT_IMAGE_PATH):
-            raise FileNotFoundError(f"Expected input image not found at: {INPUT_IMAGE_PATH}")
+        if not os.path.isfile(image_path):
+            raise FileNotFoundError(f"Expected input image not found at: {image_path}")
 
-        print(f"[INFO] Input image found: {INPUT_IMAGE_PATH}")
+        print(f"[INFO] Input image found: {image_path}")
         print("[INFO] Running classification...")
-        probs, result = classify_with_yolo(model, INPUT_IMAGE_PATH)
+        boosted = get_input_image(BOOSTED_VARIANT)
+        with measure("inference"), use_model("EMCLS") as model:
+            probs, result = classify_with_yolo(model, boosted)
 
-        print("[INFO] Creating probability plot...")
-        plot_emotion_distribution(probs, EMOTION_LABELS, PLOT_OUTPUT_PATH)
+        with measure("plotting"):
+            if render_plot(lambda path: plot_emotion_distribution(probs, EMOTION_LABELS, str(path)),
+                           plot_output_path(), PLOT_KEY):
+                print("[INFO] Probability plot created.")
 
         print("[INFO] Saving results to shared memory...")
-        save_emotion_result(result)
+        with measure("disk_write"):
+            save_emotion_result(result)
 
         print("[SUCCESS] Emotion classification process completed.")
 
     except Exception as e:
         print(f"[ERROR] Unexpected failure: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+
+# ==== Main Execution Block ====
+if __name__ == "__main__":
+    main()
@@ -23,11 +23,12 @@ while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.workspace import shared_path
+
 # ==== Output Paths Setup ====
-# Define the output directory and JSON path for storing emotional classification results
-EC_OUT_DIR = PROJECT_ROOT / "shared_memory" / "1_EC_out"
-EC_OUT_DIR.mkdir(parents=True, exist_ok=True)
-EC_JSON_PATH = EC_OUT_DIR / "EC_result.json"
+# Output folder and JSON name for emotional classification results (inside the job workspace)
+EC_OUT_SUBDIR = "1_EC_out"
+EC_JSON_NAME = "EC_result.json"
 
 # ==== Function: save_emotion_result ====
 def save_emotion_result(result_dict: dict) -> None:
@@ -40,9 +41,11 @@ def save_emotion_result(result_dict: dict) -> None:
     Returns:
         None
     """
-    # Write the result to the defined JSON file path
-    with EC_JSON_PATH.open("w", encoding="utf-8") as f:
+    # Write the result to the JSON file of the current workspace
+    ec_json_path = shared_path(EC_OUT_SUBDIR, EC_JSON_NAME)
+    ec_json_path.parent.mkdir(parents=True, exist_ok=True)
+    with ec_json_path.open("w", encoding="utf-8") as f:
         json.dump(result_dict, f, indent=4)
 
     # Confirmation log for debugging or tracking
-    print(f"[INFO] Emotion JSON saved → {EC_JSON_PATH}")
+    print(f"[INFO] Emotion JSON saved → {ec_json_path}")
@@ -5,13 +5,12 @@ Authors: Itay Vazana & Oriya Even Chen
 
 Description:
 Utility for cropping facial expression regions from the original image
-based on bounding boxes and saving them into individual PNG files.
+based on bounding boxes and publishing them as PNG artifacts of the job
+(kept in memory for CEX, written to disk when the PDF stage needs them).
 """
 
 import sys
 from pathlib import Path
-import cv2
-import os
 
 # ==== Project Root Resolution ====
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -23,26 +22,27 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.artifact_store import get_artifact_store
+from backend_app.image_cache import get_image_variant
+
 # ==== Function: crop_and_save_faces ====
-def crop_and_save_faces(image_path, detections, output_dir):
+def crop_and_save_faces(image_parts, detections, crops_subdir):
     """
-    Crops facial expression regions from an image and saves them as PNG files.
+    Crops facial expression regions from an image and stores them as PNG artifacts.
 
     Args:
-        image_path (str or Path): Path to the input image.
+        image_parts (str or tuple): Workspace-relative path of the input image.
         detections (List[Dict]): List of detection results with 'label' and 'bbox'.
-        output_dir (str or Path): Directory where cropped images will be saved.
+        crops_subdir (str or tuple): Workspace-relative folder receiving the crops.
 
     Returns:
         None
     """
-    image_path = Path(image_path)
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    store = get_artifact_store()
+    image = get_image_variant(image_parts)  # decoded once per job, shared with the other stages
 
-    image = cv2.imread(str(image_path))
-    if image is None:
-        raise FileNotFoundError(f"Image not found at: {image_path}")
+    crops_subdir = (crops_subdir,) if isinstance(crops_subdir, str) else tuple(crops_subdir)
+    store.discard(crops_subdir)  # crops of a previous run of this stage
 
     counter = {}
     for det in detections:
@@ -52,6 +52,6 @@ def crop_and_save_faces(image_path, detections, output_dir):
 
         counter[label] = counter.get(label, 0) + 1
         filename = f"{label}_{counter[label]}.png"
-        cv2.imwrite(str(output_dir / filename), crop)
+        store.put_image((*crops_subdir, filename), crop)
 
-    print(f"[INFO] Saved {sum(counter.values())} facial crops to {output_dir}")
+    print(f"[INFO] Saved {sum(counter.values())} facial crops to {store.workspace.path(*crops_subdir)}")
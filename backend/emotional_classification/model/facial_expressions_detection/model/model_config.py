@@ -5,7 +5,7 @@ Authors: Itay Vazana & Oriya Even Chen
 
 Description:
 Configuration file for the facial expression detection module.
-Defines model path, detection thresholds, and valid expression labels.
+Defines model path, inference backend, detection thresholds, and valid expression labels.
 """
 
 import sys
@@ -22,6 +22,13 @@ if str(PROJECT_ROOT) not in sys.path:
 # Path to the trained YOLOv8 model for facial expression detection
 MODEL_PATH = "model/Yolo11s_FED_trained.pt"
 
+# ==== Inference Backend ====
+# "torch" (eager .pt), "onnx" (exported once, served by ONNX Runtime on CPU) or "onnx-int8"
+# (the ONNX export quantized to INT8, calibrated on SOULSKETCH_CALIBRATION_DIR);
+# set with SOULSKETCH_FED_BACKEND or SOULSKETCH_INFERENCE_BACKEND
+from backend_app.inference_backend import stage_backend
+INFERENCE_BACKEND = stage_backend("FED")
+
 # ==== Detection Thresholds ====
 # Confidence and IoU settings used during inference
 CONFIDENCE_THRESHOLD = 0.25
@@ -13,11 +13,11 @@ Includes:
 
 import sys
 from pathlib import Path
-import cv2
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import patches
 from collections import Counter
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -29,6 +29,9 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.plot_lock import pyplot_section
+from backend_app.plot_policy import render_plot
+
 # ==== Expression Color Map ====
 EXPRESSION_COLORS = {
     "happy": "green",
@@ -41,21 +44,19 @@ EXPRESSION_COLORS = {
 }
 
 # ==== Function: draw_annotated_image ====
-def draw_annotated_image(image_path: Path, detections: List[Dict], save_path: Path):
+@pyplot_section
+def draw_annotated_image(image_rgb: np.ndarray, detections: List[Dict], save_path: Path):
     """
     Draws bounding boxes with expression labels over an image and saves the output.
 
     Args:
-        image_path (Path): Path to the input image.
+        image_rgb (np.ndarray): Input image (RGB).
         detections (List[Dict]): List of detections with 'label', 'bbox', and 'confidence'.
         save_path (Path): Path to save the annotated image.
 
     Returns:
         None
     """
-    image = cv2.imread(str(image_path))
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
     fig, ax = plt.subplots(figsize=(10, 10))
     ax.imshow(image_rgb)
     for det in detections:
@@ -76,6 +77,7 @@ def draw_annotated_image(image_path: Path, detections: List[Dict], save_path: Pa
     plt.close()
 
 # ==== Function: plot_expression_distribution ====
+@pyplot_section
 def plot_expression_distribution(detections: List[Dict], save_path: Path):
     """
     Plots a bar chart showing the number of detected expressions per type.
@@ -104,6 +106,7 @@ def plot_expression_distribution(detections: List[Dict], save_path: Path):
     plt.close()
 
 # ==== Function: plot_expression_confidence ====
+@pyplot_section
 def plot_expression_confidence(detections: List[Dict], save_path: Path):
     """
     Plots a histogram of confidence values for detected expressions.
@@ -127,18 +130,26 @@ def plot_expression_confidence(detections: List[Dict], save_path: Path):
     plt.close()
 
 # ==== Function: generate_expression_plots ====
-def generate_expression_plots(image_path: Path, detections: List[Dict], output_dir: Path):
+def generate_expression_plots(image_rgb: np.ndarray, detections: List[Dict], output_dir: Path,
+                              plots_key: Optional[str] = None):
     """
-    Generates all visualizations for facial expression analysis.
+    Generates all visualizations for facial expression analysis
+    (rendered now, skipped or deferred following the job's plot mode).
 
     Args:
-        image_path (Path): Path to the input image.
+        image_rgb (np.ndarray): Input image (RGB).
         detections (List[Dict]): List of expression detections.
         output_dir (Path): Directory where plots will be saved.
+        plots_key (Optional[str]): Workspace-relative folder the plots are published in
+            (lets the "on_demand" mode render them there later).
 
     Returns:
         None
     """
-    draw_annotated_image(image_path, detections, output_dir / "annotated_expressions.png")
-    plot_expression_distribution(detections, output_dir / "expression_distribution.png")
-    plot_expression_confidence(detections, output_dir / "expression_confidence.png")
+    plots = {
+        "annotated_expressions.png": lambda path: draw_annotated_image(image_rgb, detections, path),
+        "expression_distribution.png": lambda path: plot_expression_distribution(detections, path),
+        "expression_confidence.png": lambda path: plot_expression_confidence(detections, path)
+    }
+    for name, render in plots.items():
+        render_plot(render, output_dir / name, f"{plots_key}/{name}" if plots_key else None)
@@ -7,6 +7,8 @@ Description:
 Main runner for facial expression detection from a drawing.
 Performs model inference, filters results, saves expression crops,
 generates plots, and copies all outputs to the shared memory.
+Expression crops are published through the job's artifact store; the input drawing
+comes decoded from the job's image cache.
 """
 
 import sys
@@ -14,7 +16,7 @@ from pathlib import Path
 import json
 import shutil
 
-from model.model_config import CONFIDENCE_THRESHOLD, IOU_THRESHOLD, FACIAL_EXPRESSIONS
+from model.model_config import CONFIDENCE_THRESHOLD, IOU_THRESHOLD, FACIAL_EXPRESSIONS, INFERENCE_BACKEND
 from utils.detection_utils import load_model, filter_facial_expressions
 from facial_cropper import crop_and_save_faces
 from save_to_shared import save_to_shared_memory
@@ -30,85 +32,105 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.workspace import get_workspace
+from backend_app.metrics import measure
+from backend_app.image_cache import get_image_variant
+from backend_app.inference_backend import yolo_warm_up
+from backend_app.model_registry import register_model, use_model, get_model_registry
+
 # ==== Paths ====
 BASE_PATH = Path(__file__).parent.resolve()
-INPUT_IMAGE_PATH = BASE_PATH / "../shared_memory/0_BE_input/original_input.png"
-OUTPUT_BASE = BASE_PATH / "temp"
-OUTPUT_JSON = OUTPUT_BASE / "expressions.json"
-OUTPUT_CROPS = OUTPUT_BASE / "crops"
-OUTPUT_PLOTS = OUTPUT_BASE / "plots"
-TEMP_DIR = BASE_PATH / "temp"
 MODEL_PATH = BASE_PATH / "model" / "Yolo11s_FED_trained.pt"
+SHARED_SUBDIR = "3_FED_out/facial_expressions"
+INPUT_IMAGE_PARTS = ("0_BE_input", "original_input.png")
 
 # ==== Setup: Create/clean working directories ====
-def setup_directories():
+def setup_directories(output_base: Path):
     """
     Creates and cleans the temp output directory.
     """
-    OUTPUT_BASE.mkdir(parents=True, exist_ok=True)
-    for item in OUTPUT_BASE.iterdir():
+    output_base.mkdir(parents=True, exist_ok=True)
+    for item in output_base.iterdir():
         if item.is_file():
             item.unlink()
         elif item.is_dir():
             shutil.rmtree(item)
 
 # ==== Cleanup: Remove temp directory after use ====
-def clean_temp_directory():
+def clean_temp_directory(temp_dir: Path):
     """
     Deletes the temp directory and its contents.
     """
-    if TEMP_DIR.exists():
-        for item in TEMP_DIR.iterdir():
+    if temp_dir.exists():
+        for item in temp_dir.iterdir():
             if item.is_file():
                 item.unlink()
             elif item.is_dir():
                 shutil.rmtree(item)
-        TEMP_DIR.rmdir()
+        temp_dir.rmdir()
 
 # ==== Save Results to JSON ====
-def save_results_to_json(detections):
+def save_results_to_json(detections, output_json: Path):
     """
     Saves detection results to a JSON file for recordkeeping.
 
     Args:
         detections (list): List of expression detection dictionaries.
+        output_json (Path): Target JSON file path.
 
     Returns:
         None
     """
-    with open(OUTPUT_JSON, 'w') as f:
+    with open(output_json, 'w') as f:
         json.dump(detections, f, indent=4)
 
+# ==== Model (loaded on first use by the model registry) ====
+register_model(
+    "FED",
+    lambda: load_model(MODEL_PATH, CONFIDENCE_THRESHOLD, IOU_THRESHOLD, INFERENCE_BACKEND),
+    warm_up=yolo_warm_up("FED")
+)
+
 # ==== Main Pipeline Entry Point ====
 def main():
     print("[INFO] Starting facial expression detection pipeline...")
-    setup_directories()
+    workspace = get_workspace()
+    image = get_image_variant(INPUT_IMAGE_PARTS)
+    output_base = workspace.temp_dir("FED")
+    setup_directories(output_base)
 
-    print("[INFO] Loading model...")
-    model = load_model(MODEL_PATH, CONFIDENCE_THRESHOLD, IOU_THRESHOLD)
+    with measure("model_load"):
+        get_model_registry().load("FED")
 
     print("[INFO] Running detection...")
-    results = model(str(INPUT_IMAGE_PATH))[0]
+    with measure("inference"), use_model("FED") as model:
+        results = model(image)[0]
 
     print("[INFO] Filtering results...")
     detections = filter_facial_expressions(results, FACIAL_EXPRESSIONS)
     print(f"[INFO] {len(detections)} facial expressions detected.")
 
     print("[INFO] Saving detections to JSON...")
-    save_results_to_json(detections)
+    with measure("disk_write"):
+        save_results_to_json(detections, output_base / "expressions.json")
 
     print("[INFO] Generating diagnostic plots...")
-    generate_expression_plots(INPUT_IMAGE_PATH, detections, OUTPUT_PLOTS)
-
-    print("[INFO] Cropping expression regions...")
-    crop_and_save_faces(INPUT_IMAGE_PATH, detections, OUTPUT_CROPS)
+    with measure("plotting"):
+        generate_expression_plots(get_image_variant(INPUT_IMAGE_PARTS, "rgb"), detections, output_base / "plots",
+                                  plots_key=f"{SHARED_SUBDIR}/plots")
 
     print("[INFO] Saving all outputs to shared memory...")
-    save_to_shared_memory(OUTPUT_BASE, "3_FED_out/facial_expressions")
+    with measure("disk_write"):
+        save_to_shared_memory(output_base, SHARED_SUBDIR)
+
+    # Crops go straight to the artifact store (after the shared folder was reset)
+    print("[INFO] Cropping expression regions...")
+    with measure("crop"):
+        crop_and_save_faces(INPUT_IMAGE_PARTS, detections, (SHARED_SUBDIR, "crops"))
 
     print("[INFO] Facial expression detection pipeline completed successfully.")
     print("[INFO] Cleaning temp directory...")
-    clean_temp_directory()
+    clean_temp_directory(output_base)
 
 if __name__ == "__main__":
     main()
@@ -22,6 +22,8 @@ while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.workspace import shared_path
+
 # ==== Function: save_to_shared_memory ====
 def save_to_shared_memory(src_dir, target_subdir_name):
     """
@@ -29,14 +31,13 @@ def save_to_shared_memory(src_dir, target_subdir_name):
 
     Args:
         src_dir (str or Path): Path to the directory containing final outputs.
-        target_subdir_name (str): Name of the subfolder to be created in shared_memory.
+        target_subdir_name (str): Name of the subfolder to be created in the job's shared memory.
 
     Returns:
         None
     """
     src_dir = Path(src_dir)
-    project_root = Path(__file__).resolve().parents[1]
-    shared_base = project_root / "shared_memory" / target_subdir_name
+    shared_base = shared_path(target_subdir_name)
 
     if shared_base.exists():
         shutil.rmtree(shared_base)
@@ -10,7 +10,6 @@ and filtering its output to include only relevant facial expression labels.
 
 import sys
 from pathlib import Path
-from ultralytics import YOLO
 
 # ==== Project Root Resolution ====
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -22,8 +21,10 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.inference_backend import load_yolo
+
 # ==== Function: load_model ====
-def load_model(model_path, conf_thresh, iou_thresh):
+def load_model(model_path, conf_thresh, iou_thresh, backend: str = None):
     """
     Loads a YOLOv8 model with specific confidence and IoU thresholds.
 
@@ -31,11 +32,12 @@ def load_model(model_path, conf_thresh, iou_thresh):
         model_path (str): Path to the YOLO model file.
         conf_thresh (float): Confidence threshold for filtering predictions.
         iou_thresh (float): IoU threshold for non-maximum suppression.
+        backend (str | None): "torch", "onnx" or "onnx-int8" (see backend_app/inference_backend.py).
 
     Returns:
         YOLO: Loaded YOLO model instance with configured parameters.
     """
-    model = YOLO(model_path)
+    model = load_yolo("FED", model_path, backend)
     model.conf = conf_thresh
     model.iou = iou_thresh
     return model
@@ -11,6 +11,7 @@ Creates the final post-analysis JSON file by combining:
 Output is saved to: shared_memory/5_JSON_out/post_analysis.json
 """
 
+import sys
 from pathlib import Path
 import json
 
@@ -21,10 +22,15 @@ while PROJECT_ROOT.name != "model":
         break
     PROJECT_ROOT = PROJECT_ROOT.parent
 
-# ==== Path Definitions ====
-PRE_PATH = PROJECT_ROOT / "shared_memory" / "5_JSON_out" / "pre_analysis.json"
-ANALYSIS_PATH = PROJECT_ROOT / "shared_memory" / "6_AG_out" / "analysis_text.json"
-OUTPUT_PATH = PROJECT_ROOT / "shared_memory" / "5_JSON_out" / "post_analysis.json"
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend_app.workspace import shared_path
+
+# ==== Path Definitions (relative to the job workspace) ====
+PRE_PATH = "5_JSON_out/pre_analysis.json"
+ANALYSIS_PATH = "6_AG_out/analysis_text.json"
+OUTPUT_PATH = "5_JSON_out/post_analysis.json"
 
 # ==== Utility Function: load_json ====
 def load_json(path: Path):
@@ -45,11 +51,12 @@ def load_json(path: Path):
 def main():
     print("[INFO] Building post-analysis format...")
 
-    pre = load_json(PRE_PATH)
-    text = load_json(ANALYSIS_PATH)
+    pre = load_json(shared_path(PRE_PATH))
+    text = load_json(shared_path(ANALYSIS_PATH))
 
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    OUTPUT_PATH.write_text(
+    output_path = shared_path(OUTPUT_PATH)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(
         json.dumps(
             {
                 "pre_analysis": pre,
@@ -61,7 +68,7 @@ def main():
         encoding="utf-8"
     )
 
-    print(f"[INFO] Post-analysis JSON saved to: {OUTPUT_PATH}")
+    print(f"[INFO] Post-analysis JSON saved to: {output_path}")
 
 # ==== Entry Point ====
 if __name__ == "__main__":
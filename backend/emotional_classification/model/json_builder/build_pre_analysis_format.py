@@ -28,14 +28,28 @@ if str(PROJECT_ROOT) not in sys.path:
 from get_data_from_shared import collect_all_shared_data
 from maps.color_emotion_mapping import EXPRESSION_EMOTION_MAP
 from validate_input_using_scheme import validate_json_file
+from backend_app.workspace import shared_path
 
 # ==== Paths ====
-OUTPUT_PATH = PROJECT_ROOT / "shared_memory" / "5_JSON_out" / "pre_analysis.json"
+OUTPUT_PATH = "5_JSON_out/pre_analysis.json"
 SCRIPT_DIR = Path(__file__).resolve().parent
 SCHEMA_PATH = SCRIPT_DIR / "Schemes" / "pre_analysis_scheme.json"
 
-OBJECT_CROP_PATH = "shared_memory/2_OBJ_DET_out/objects/colored/crops"
-EXPRESSION_CROP_PATH = "shared_memory/3_FED_out/facial_expressions/crops"
+OBJECT_CROP_PATH = "2_OBJ_DET_out/objects/colored/crops"
+EXPRESSION_CROP_PATH = "3_FED_out/facial_expressions/crops"
+
+
+def project_relative(rel_path: str) -> str:
+    """
+    Returns:
+        str: Workspace path expressed relative to the project root
+             (e.g. 'shared_memory/2_OBJ_DET_out/...' for the default workspace).
+    """
+    path = shared_path(rel_path)
+    try:
+        return path.relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
 
 # ==== Object Entry Builder ====
 def build_object_entry(obj_id, obj_data, color_data):
@@ -64,7 +78,7 @@ def build_object_entry(obj_id, obj_data, color_data):
         "dominant_emotion_color": dom_color.get("emotion") if dom_color else None,
         "is_color_unusual": dom_color.get("is_unusual") if dom_color else False,
         "colors": colors,
-        "crop_path": f"{OBJECT_CROP_PATH}/{obj_id}.png",
+        "crop_path": f"{project_relative(OBJECT_CROP_PATH)}/{obj_id}.png",
         "confidence": confidence
     }
 
@@ -93,7 +107,7 @@ def build_expression_entry(expr, expr_colors):
         "mapped_emotion": emotion,
         "dominant_emotion_color": None,
         "colors": colors,
-        "crop_path": f"{EXPRESSION_CROP_PATH}/{expr_id}.png",
+        "crop_path": f"{project_relative(EXPRESSION_CROP_PATH)}/{expr_id}.png",
         "confidence": confidence
     }
 
@@ -130,13 +144,14 @@ def main():
         "dominant_drawing_colors": data["color_extraction"].get("drawing", [])
     }
 
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, 'w') as f:
+    output_path = shared_path(OUTPUT_PATH)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
         json.dump(pre_analysis, f, indent=4)
 
-    print(f"[INFO] Pre-analysis JSON saved to: {OUTPUT_PATH}")
+    print(f"[INFO] Pre-analysis JSON saved to: {output_path}")
     print("[INFO] Validating pre-analysis JSON against schema...")
-    validate_json_file(OUTPUT_PATH, SCHEMA_PATH)
+    validate_json_file(output_path, SCHEMA_PATH)
 
 # ==== Entry Point ====
 if __name__ == "__main__":
@@ -25,18 +25,18 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 
-# ==== Paths to Shared Memory Files ====
-SHARED_BASE = PROJECT_ROOT / "shared_memory"
+from backend_app.workspace import shared_path
 
-EC_PATH = SHARED_BASE / "1_EC_out/EC_result.json"
-FED_PATH = SHARED_BASE / "3_FED_out/facial_expressions/expressions.json"
-CEX_DRAWING_PATH = SHARED_BASE / "4_CEX_out/colors/JSON/drawing_results.json"
-CEX_OBJECTS_PATH = SHARED_BASE / "4_CEX_out/colors/JSON/object_results.json"
-CEX_EXPRESSIONS_PATH = SHARED_BASE / "4_CEX_out/colors/JSON/facial_expression_results.json"
-OBJ_DET_DIR = SHARED_BASE / "2_OBJ_DET_out/objects/colored/jsons"
+# ==== Paths to Shared Memory Files (relative to the job workspace) ====
+EC_PATH = "1_EC_out/EC_result.json"
+FED_PATH = "3_FED_out/facial_expressions/expressions.json"
+CEX_DRAWING_PATH = "4_CEX_out/colors/JSON/drawing_results.json"
+CEX_OBJECTS_PATH = "4_CEX_out/colors/JSON/object_results.json"
+CEX_EXPRESSIONS_PATH = "4_CEX_out/colors/JSON/facial_expression_results.json"
+OBJ_DET_PATH = "2_OBJ_DET_out/objects/colored/objects.json"
 
-DRAWING_IMAGE_PATH = SHARED_BASE / "0_BE_input/original_input.png"
-DRAWING_BW_IMAGE_PATH = SHARED_BASE / "0_BE_input/original_input_BW.png"
+DRAWING_IMAGE_PATH = "0_BE_input/original_input.png"
+DRAWING_BW_IMAGE_PATH = "0_BE_input/original_input_BW.png"
 
 # ==== Schema Paths ====
 SCHEMA_BASE = PROJECT_ROOT / "json_builder" / "Schemes" / "Moduls_Schemes"
@@ -45,17 +45,19 @@ SCHEMAS = {
     FED_PATH: SCHEMA_BASE / "FED_json_scheme.json",
     CEX_DRAWING_PATH: SCHEMA_BASE / "CEX_list_scheme.json",
     CEX_OBJECTS_PATH: SCHEMA_BASE / "CEX_dict_scheme.json",
-    CEX_EXPRESSIONS_PATH: SCHEMA_BASE / "CEX_dict_scheme.json"
+    CEX_EXPRESSIONS_PATH: SCHEMA_BASE / "CEX_dict_scheme.json",
+    OBJ_DET_PATH: SCHEMA_BASE / "OBJ_DET_list_scheme.json"
 }
 
 
 # ==== Load JSON with Optional Schema Validation ====
-def load_json(path):
+def load_json(path, schema=None):
     """
     Loads a JSON file and optionally validates it against a known schema.
 
     Args:
         path (Path): Path to the JSON file.
+        schema (Path | None): Schema to validate against, if any.
 
     Returns:
         dict: Loaded JSON content or empty dict if missing.
@@ -65,36 +67,37 @@ def load_json(path):
         return {}
     with open(path, 'r', encoding="utf-8") as f:
         data = json.load(f)
-    schema = SCHEMAS.get(path)
     if schema:
         validate_json_file(path, schema)
     return data
 
 
-# ==== Load Object Detection Results ====
-def load_object_detection_data(obj_json_dir):
+def load_shared_json(rel_path: str):
     """
-    Loads all individual object JSON files from the given directory.
+    Loads a module output from the current job workspace, validating it when a schema is registered.
 
     Args:
-        obj_json_dir (Path): Path to the folder with per-object metadata.
+        rel_path (str): Path relative to the workspace root (one of the *_PATH constants).
 
     Returns:
-        dict: Mapping of object_id → object data.
+        dict: Loaded JSON content or empty dict if missing.
     """
-    data = {}
-    if not obj_json_dir.exists():
-        print(f"[WARN] Missing object detection JSONs: {obj_json_dir}")
-        return data
+    return load_json(shared_path(rel_path), SCHEMAS.get(rel_path))
 
-    obj_schema = SCHEMA_BASE / "OBJ_DET_json_scheme.json"
 
-    for json_file in sorted(obj_json_dir.glob("*.json")):
-        object_id = json_file.stem
-        validate_json_file(json_file, obj_schema)
-        data[object_id] = load_json(json_file)
+# ==== Load Object Detection Results ====
+def load_object_detection_data(rel_path: str = OBJ_DET_PATH):
+    """
+    Loads the object metadata file of the detection run (one list for all objects).
 
-    return data
+    Args:
+        rel_path (str): Path of the metadata file relative to the workspace root.
+
+    Returns:
+        dict: Mapping of object_id → object data, sorted by ID.
+    """
+    objects = load_shared_json(rel_path) or []
+    return {obj["id"]: obj for obj in sorted(objects, key=lambda obj: obj["id"])}
 
 
 # ==== Aggregate Shared Data ====
@@ -106,15 +109,15 @@ def collect_all_shared_data():
         dict: Aggregated data from emotional classification, objects, expressions, and colors.
     """
     return {
-        "drawing_image_path": str(DRAWING_IMAGE_PATH),
-        "drawing_bw_image_path": str(DRAWING_BW_IMAGE_PATH),
-        "emotional_classification": load_json(EC_PATH),
-        "object_detection": load_object_detection_data(OBJ_DET_DIR),
-        "facial_expressions": load_json(FED_PATH),
+        "drawing_image_path": str(shared_path(DRAWING_IMAGE_PATH)),
+        "drawing_bw_image_path": str(shared_path(DRAWING_BW_IMAGE_PATH)),
+        "emotional_classification": load_shared_json(EC_PATH),
+        "object_detection": load_object_detection_data(),
+        "facial_expressions": load_shared_json(FED_PATH),
         "color_extraction": {
-            "drawing": load_json(CEX_DRAWING_PATH),
-            "objects": load_json(CEX_OBJECTS_PATH),
-            "expressions": load_json(CEX_EXPRESSIONS_PATH)
+            "drawing": load_shared_json(CEX_DRAWING_PATH),
+            "objects": load_shared_json(CEX_OBJECTS_PATH),
+            "expressions": load_shared_json(CEX_EXPRESSIONS_PATH)
         }
     }
 
@@ -5,7 +5,7 @@ Authors: Itay Vazana & Oriya Even Chen
 
 Description:
 Runs the first part of the JSON Builder segment.
-Executes:
+Executes (in-process, no child interpreters):
 1. Data collection from shared_memory
 2. Building the pre-analysis format JSON
 Used in the analysis pipeline before generating final textual analysis.
@@ -13,7 +13,7 @@ Used in the analysis pipeline before generating final textual analysis.
 
 import sys
 from pathlib import Path
-import subprocess
+import json
 
 # ==== Resolve Project Root ====
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -25,41 +25,47 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from get_data_from_shared import collect_all_shared_data
+from build_pre_analysis_format import main as build_pre_analysis
+from backend_app.metrics import measure
+
 
 # ==== Configuration ====
 DEBUG_MODE = True
+
+
+def dump_shared_data():
+    """
+    Prints the aggregated shared memory data (debug view of the collected inputs).
+    """
+    if not DEBUG_MODE:
+        return
+    result = collect_all_shared_data()
+    print(json.dumps(result, indent=4, ensure_ascii=False))
+
+
 JB_STEPS = [
-    "json_builder/get_data_from_shared.py",
-    "json_builder/build_pre_analysis_format.py"
+    ("json_builder/get_data_from_shared.py", dump_shared_data),
+    ("json_builder/build_pre_analysis_format.py", build_pre_analysis)
 ]
 
-# ==== Script Runner ====
-def run_script(script_path: str):
+# ==== Step Runner ====
+def run_step(step_name: str, step_func):
     """
-    Runs a Python script and prints its output.
+    Runs a single JSON Builder step in the current interpreter.
 
     Args:
-        script_path (str): Relative path to script inside the repo.
+        step_name (str): Human-readable step label (script path inside the repo).
+        step_func (Callable): Function implementing the step.
     """
-    print(f"\nRunning: {script_path}")
-    script = Path(script_path)
-    result = subprocess.run(
-        [sys.executable, script.name],
-        cwd=script.parent.resolve(),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        encoding="utf-8"
-    )
-
-    if DEBUG_MODE:
-        print(result.stdout)
-
-    if result.returncode != 0:
-        print(f"[ERROR] in {script_path}")
-        raise RuntimeError(f"Script failed: {script_path}")
-    else:
-        print(f"[DONE] {script_path}")
+    print(f"\nRunning: {step_name}")
+    try:
+        with measure(Path(step_name).stem):
+            step_func()
+    except Exception as e:
+        print(f"[ERROR] in {step_name}")
+        raise RuntimeError(f"Script failed: {step_name}") from e
+    print(f"[DONE] {step_name}")
 
 
 # ==== Main Flow ====
@@ -67,8 +73,8 @@ def run_json_builder_part_a():
     print("==================================================")
     print("Running JSON Builder - Part A")
     print("==================================================")
-    for step in JB_STEPS:
-        run_script(step)
+    for step_name, step_func in JB_STEPS:
+        run_step(step_name, step_func)
 
 
 # ==== Entry Point ====
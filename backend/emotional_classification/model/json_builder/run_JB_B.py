@@ -14,7 +14,6 @@ Useful for debugging and testing the final data export format.
 
 import sys
 from pathlib import Path
-import subprocess
 
 # ==== Resolve Project Root ====
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -26,41 +25,33 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from build_post_analysis_format import main as build_post_analysis
+from backend_app.metrics import measure
+
 
 # ==== Configuration ====
-DEBUG_MODE = True
 JB_STEPS = [
-    "json_builder/build_post_analysis_format.py"
+    ("json_builder/build_post_analysis_format.py", build_post_analysis)
 ]
 
 
-# ==== Script Runner ====
-def run_script(script_path: str):
+# ==== Step Runner ====
+def run_step(step_name: str, step_func):
     """
-    Runs a single Python script and prints its output.
+    Runs a single JSON Builder step in the current interpreter.
 
     Args:
-        script_path (str): Path to script relative to project root.
+        step_name (str): Human-readable step label (script path inside the repo).
+        step_func (Callable): Function implementing the step.
     """
-    print(f"\nRunning: {script_path}")
-    script = PROJECT_ROOT / script_path
-    result = subprocess.run(
-        [sys.executable, script.name],
-        cwd=script.parent.resolve(),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        encoding="utf-8"
-    )
-
-    if DEBUG_MODE:
-        print(result.stdout)
-
-    if result.returncode != 0:
-        print(f"[ERROR] Script failed: {script_path}")
-        raise RuntimeError(f"Script failed: {script_path}")
-    else:
-        print(f"[DONE] Script completed: {script_path}")
+    print(f"\nRunning: {step_name}")
+    try:
+        with measure(Path(step_name).stem):
+            step_func()
+    except Exception as e:
+        print(f"[ERROR] Script failed: {step_name}")
+        raise RuntimeError(f"Script failed: {step_name}") from e
+    print(f"[DONE] Script completed: {step_name}")
 
 
 # ==== Main Flow ====
@@ -68,8 +59,8 @@ def run_json_builder_part_b():
     print("==================================================")
     print("Running JSON Builder - Part B")
     print("==================================================")
-    for step in JB_STEPS:
-        run_script(step)
+    for step_name, step_func in JB_STEPS:
+        run_step(step_name, step_func)
 
 
 # ==== Entry Point ====
@@ -5,13 +5,14 @@ Authors: Itay Vazana & Oriya Even Chen
 
 Description:
 Handles cropping and saving detected objects from a full image.
-Performs IoU-based filtering to avoid duplicates, enriches metadata, and saves crops and JSONs
-into a structured shared memory output directory.
+Performs IoU-based filtering to avoid duplicates, enriches metadata, and saves crops and
+the metadata of the run into a structured shared memory output directory.
+Crops are zero-copy views of the image and go through the job's artifact store: CEX reads
+them as arrays and the PNG files are encoded on a thread pool when the PDF stage (or the
+end of the flow) needs them. All objects of a run share one metadata file (objects.json).
 """
 
-import json
-import cv2
-import random
+import sys
 from pathlib import Path
 from object_positioner import enrich_with_position_and_size
 from filter_duplicate_objects import filter_detections_by_iou
@@ -23,31 +24,33 @@ while PROJECT_ROOT.name != "model":
         break
     PROJECT_ROOT = PROJECT_ROOT.parent
 
-# ==== Output Base Directory ====
-BASE_OUTPUT_DIR = PROJECT_ROOT / "shared_memory" / "2_OBJ_DET_out" / "objects"
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-# ==== Function: generate_unique_id ====
-def generate_unique_id(existing_ids: set, label: str) -> str:
+from backend_app.artifact_store import get_artifact_store
+
+# ==== Output Base Directory (inside the job workspace) ====
+BASE_OUTPUT_SUBDIR = ("2_OBJ_DET_out", "objects")
+METADATA_FILE = "objects.json"
+
+# ==== Function: object_id_for ====
+def object_id_for(index: int, label: str) -> str:
     """
-    Generates a unique ID for an object based on its label and random digits.
+    Builds the ID of an object from its rank in the run and its label (deterministic and unique).
 
     Args:
-        existing_ids (set): Set of already used IDs.
+        index (int): Position of the object among the saved objects.
         label (str): The object class label.
 
     Returns:
-        str: A new unique ID string.
+        str: ID such as '0003_house'.
     """
-    while True:
-        rand_digits = f"{random.randint(0, 9999):04d}"
-        new_id = f"{rand_digits}_{label}"
-        if new_id not in existing_ids:
-            return new_id
+    return f"{index:04d}_{label}"
 
 # ==== Function: crop_and_save_objects ====
 def crop_and_save_objects(image, detections, mode: str, iou_threshold: float = 0.6) -> list[str]:
     """
-    Crops detected objects from an image and saves both images and JSON metadata.
+    Crops detected objects from an image and saves the crops and one JSON metadata file.
     Applies IoU filtering to remove duplicate detections.
 
     Args:
@@ -63,24 +66,21 @@ def crop_and_save_objects(image, detections, mode: str, iou_threshold: float = 0
         raise ValueError(f"Invalid mode '{mode}'. Must be 'colored' or 'black_white'.")
 
     # Setup output paths
-    crops_dir = BASE_OUTPUT_DIR / mode / "crops"
-    jsons_dir = BASE_OUTPUT_DIR / mode / "jsons"
-    crops_dir.mkdir(parents=True, exist_ok=True)
-    jsons_dir.mkdir(parents=True, exist_ok=True)
+    store = get_artifact_store()
+    crops_dir = (*BASE_OUTPUT_SUBDIR, mode, "crops")
+    metadata_path = (*BASE_OUTPUT_SUBDIR, mode, METADATA_FILE)
 
     height, width, _ = image.shape
-    saved_ids = set()
-    output_ids = []
+    objects, crops = [], []
 
     # Filter overlapping detections
     detections = filter_detections_by_iou(detections, threshold=iou_threshold)
 
     for obj in detections:
         label = obj["label"]
-        conf = obj["confidence"]
         bbox = obj["bbox"]
 
-        # Extract crop from image
+        # Slice the crop (a view of the image, no pixel copy)
         x1 = max(0, int(bbox["x1"]))
         y1 = max(0, int(bbox["y1"]))
         x2 = min(width, int(bbox["x2"]))
@@ -91,22 +91,16 @@ def crop_and_save_objects(image, detections, mode: str, iou_threshold: float = 0
             print(f"[SKIP] Empty crop for object '{label}'")
             continue
 
-        # Generate and store ID
-        object_id = generate_unique_id(saved_ids, label)
-        saved_ids.add(object_id)
-        output_ids.append(object_id)
-
-        # Enrich metadata and save crop + JSON
+        object_id = object_id_for(len(objects), label)
         obj = enrich_with_position_and_size(obj, (height, width))
         obj["id"] = object_id
-        crop_path = crops_dir / f"{object_id}.png"
-        obj["crop_path"] = crop_path.as_posix()
-        cv2.imwrite(str(crop_path), crop)
-
-        json_path = jsons_dir / f"{object_id}.json"
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(obj, f, indent=4)
-
+        obj["crop_path"] = store.workspace.path(*crops_dir, f"{object_id}.png").as_posix()
+        objects.append(obj)
+        crops.append(((*crops_dir, f"{object_id}.png"), crop))
         print(f"[SAVED] {object_id} → {mode}")
 
-    return output_ids
+    store.put_images(crops)
+    # JSON Builder reads (and validates) the metadata file: write it now
+    store.put_json(metadata_path, objects, persist=True)
+
+    return [obj["id"] for obj in objects]
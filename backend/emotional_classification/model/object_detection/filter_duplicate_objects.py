@@ -6,10 +6,14 @@ Authors: Itay Vazana & Oriya Even Chen
 Description:
 Provides a filtering utility to remove overlapping or duplicate object detections
 based on an IoU (Intersection over Union) threshold. Keeps the higher-confidence detection.
+The pairwise IoU matrix is computed with NumPy in one shot, then detections are suppressed
+in confidence order (optionally only within a class, or only across detection passes).
 """
 
-from typing import List
-import itertools
+from typing import List, Sequence
+import numpy as np
+
+BBOX_KEYS = ("x1", "y1", "x2", "y2")
 
 # ==== Function: intersection_over_union ====
 def intersection_over_union(box1, box2) -> float:
@@ -40,8 +44,66 @@ def intersection_over_union(box1, box2) -> float:
         return 0.0
     return inter_area / union_area
 
+# ==== Function: iou_matrix ====
+def iou_matrix(boxes: np.ndarray) -> np.ndarray:
+    """
+    Calculates the IoU of every pair of boxes (same formula as intersection_over_union).
+
+    Args:
+        boxes (np.ndarray): N x 4 array of x1, y1, x2, y2.
+
+    Returns:
+        np.ndarray: N x N matrix of IoU scores (0 where the union is empty).
+    """
+    x1, y1, x2, y2 = (boxes[:, k] for k in range(4))
+    inter_w = np.clip(np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :]), 0, None)
+    inter_h = np.clip(np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :]), 0, None)
+    inter = inter_w * inter_h
+
+    areas = (x2 - x1) * (y2 - y1)
+    union = areas[:, None] + areas[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union != 0, inter / union, 0.0)
+
+# ==== Function: suppress_duplicates ====
+def suppress_duplicates(dets: List[dict], threshold: float = 0.5, class_aware: bool = False,
+                        groups: Sequence[int] = None) -> List[int]:
+    """
+    Confidence-ordered suppression: the most confident remaining detection is kept and every
+    detection overlapping it by more than the threshold is dropped (ties keep the earlier one).
+
+    Args:
+        dets (List[dict]): Detections, each with 'bbox', 'confidence' (and 'label').
+        threshold (float): IoU above which two detections are duplicates.
+        class_aware (bool): Only detections with the same label can be duplicates.
+        groups (Sequence[int] | None): Group of each detection (e.g. its detection pass);
+            if given, only detections of different groups can be duplicates.
+
+    Returns:
+        List[int]: Indices of the kept detections, in input order.
+    """
+    if not dets:
+        return []
+
+    boxes = np.array([[d["bbox"][k] for k in BBOX_KEYS] for d in dets], dtype=np.float64)
+    overlaps = iou_matrix(boxes) > threshold
+    if class_aware:
+        labels = np.array([d["label"] for d in dets])
+        overlaps &= labels[:, None] == labels[None, :]
+    if groups is not None:
+        groups = np.asarray(groups)
+        overlaps &= groups[:, None] != groups[None, :]
+
+    confidences = np.array([d["confidence"] for d in dets], dtype=np.float64)
+    suppressed = np.zeros(len(dets), dtype=bool)
+    for i in np.argsort(-confidences, kind="stable"):
+        if not suppressed[i]:
+            suppressed |= overlaps[i]
+            suppressed[i] = False
+    return np.flatnonzero(~suppressed).tolist()
+
 # ==== Function: filter_detections_by_iou ====
-def filter_detections_by_iou(dets: List[dict], threshold: float = 0.5) -> List[dict]:
+def filter_detections_by_iou(dets: List[dict], threshold: float = 0.5, class_aware: bool = False) -> List[dict]:
     """
     Removes overlapping detections by comparing IoU values between bounding boxes.
     Keeps only the detection with higher confidence when overlaps exceed the threshold.
@@ -49,26 +111,29 @@ def filter_detections_by_iou(dets: List[dict], threshold: float = 0.5) -> List[d
     Args:
         dets (List[dict]): List of object detections, each with 'bbox' and 'confidence'.
         threshold (float): IoU threshold to determine whether detections overlap.
+        class_aware (bool): Only suppress overlapping detections with the same label.
 
     Returns:
         List[dict]: Filtered list of non-overlapping detections.
     """
-    keep_flags = [True] * len(dets)
+    return [dets[i] for i in suppress_duplicates(dets, threshold, class_aware)]
 
-    for i, j in itertools.combinations(range(len(dets)), 2):
-        if not keep_flags[i] or not keep_flags[j]:
-            continue
-
-        box1 = dets[i]["bbox"]
-        box2 = dets[j]["bbox"]
-        iou = intersection_over_union(box1, box2)
+# ==== Function: merge_detection_passes ====
+def merge_detection_passes(passes: List[List[dict]], threshold: float = 0.5, class_aware: bool = False,
+                           cross_pass_only: bool = False) -> List[dict]:
+    """
+    Fuses the detections of several passes over the same image (e.g. edge image and original).
 
-        if iou > threshold:
-            conf1 = dets[i]["confidence"]
-            conf2 = dets[j]["confidence"]
-            if conf1 >= conf2:
-                keep_flags[j] = False
-            else:
-                keep_flags[i] = False
+    Args:
+        passes (List[List[dict]]): Detections of each pass.
+        threshold (float): IoU threshold to determine whether detections overlap.
+        class_aware (bool): Only merge overlapping detections with the same label.
+        cross_pass_only (bool): Keep overlaps within a pass (already resolved by the model's NMS)
+            and only merge a detection with those of the other passes.
 
-    return [d for k, d in zip(keep_flags, dets) if k]
+    Returns:
+        List[dict]: Fused detections, in pass order.
+    """
+    dets = [det for dets in passes for det in dets]
+    groups = [p for p, dets in enumerate(passes) for _ in dets] if cross_pass_only else None
+    return [dets[i] for i in suppress_duplicates(dets, threshold, class_aware, groups)]
@@ -7,6 +7,7 @@ Description:
 Handles preprocessing of input drawings prior to object detection.
 Includes grayscale conversion, Gaussian blur, Canny edge detection,
 optional erosion, polarity inversion, and final RGB format conversion.
+The original drawing and its preprocessed version come from the job's decoded-image cache.
 """
 
 import sys
@@ -25,6 +26,8 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.image_cache import get_image_variant, register_variant
+
 # ==== Preprocessing Parameters ====
 BLUR_KERNEL_SIZE = (7, 7)
 CANNY_THRESHOLD_1 = 50
@@ -53,23 +56,24 @@ def preprocess_image(image: np.ndarray) -> np.ndarray:
     inverted = cv2.bitwise_not(edges)
     return cv2.cvtColor(inverted, cv2.COLOR_GRAY2RGB)
 
+# Edge image of the drawing, computed once per job by the decoded-image cache
+EDGES_VARIANT = "obj_det_edges"
+register_variant(EDGES_VARIANT, "bgr", preprocess_image)
+
 # ==== Function: preprocess_and_save ====
-def preprocess_and_save(input_path: str, output_path: str) -> tuple[np.ndarray, np.ndarray]:
+def preprocess_and_save(input_parts, output_path: str) -> tuple[np.ndarray, np.ndarray]:
     """
-    Loads an image from path, applies preprocessing, and saves the output.
+    Gets the decoded image and its preprocessed version from the image cache, and saves the output.
 
     Args:
-        input_path (str): Path to the original image.
+        input_parts (str or tuple): Workspace-relative path of the original image.
         output_path (str): Path where the preprocessed image will be saved.
 
     Returns:
-        tuple[np.ndarray, np.ndarray]: Tuple of (original image, preprocessed image).
+        tuple[np.ndarray, np.ndarray]: Tuple of (original image BGR, preprocessed image RGB), read-only.
     """
-    if not os.path.exists(input_path):
-        raise FileNotFoundError(f"Image not found: {input_path}")
-
-    image = cv2.imread(input_path)
-    processed = preprocess_image(image)
+    image = get_image_variant(input_parts)
+    processed = get_image_variant(input_parts, EDGES_VARIANT)
 
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     cv2.imwrite(output_path, cv2.cvtColor(processed, cv2.COLOR_RGB2BGR))
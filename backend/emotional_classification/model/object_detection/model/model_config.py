@@ -5,7 +5,7 @@ Authors: Itay Vazana & Oriya Even Chen
 
 Description:
 Configuration file for the object detection model based on YOLOv8.
-Defines model paths, class names, and inference thresholds.
+Defines model paths, class names, inference backend and thresholds.
 """
 
 import sys
@@ -34,6 +34,13 @@ with open(DATA_YAML_PATH, 'r') as f:
     data = yaml.safe_load(f)
     CLASS_NAMES = data.get("names", [])
 
+# ==== Inference Backend ====
+# "torch" (eager .pt), "onnx" (exported once, served by ONNX Runtime on CPU) or "onnx-int8"
+# (the ONNX export quantized to INT8, calibrated on SOULSKETCH_CALIBRATION_DIR);
+# set with SOULSKETCH_OBJ_DET_BACKEND or SOULSKETCH_INFERENCE_BACKEND
+from backend_app.inference_backend import stage_backend
+INFERENCE_BACKEND = stage_backend("OBJ_DET")
+
 # ==== Inference Settings ====
 # Thresholds for detection filtering
 CONFIDENCE_THRESHOLD = 0.25  # Minimum confidence to keep a detection
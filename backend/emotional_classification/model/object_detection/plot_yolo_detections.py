@@ -29,6 +29,8 @@ while PROJECT_ROOT.name != "model":
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend_app.plot_lock import pyplot_section
+
 # ==== Class Color Map ====
 CLASS_COLORS = {
     "person": (255, 0, 0),       # Red
@@ -72,6 +74,7 @@ def draw_bounding_boxes(image: np.ndarray, detections: List[Dict], save_path: Pa
     cv2.imwrite(str(save_path), annotated)
 
 # ==== Function: plot_class_distribution ====
+@pyplot_section
 def plot_class_distribution(detections: List[Dict], save_path: Path):
     """
     Creates a bar chart showing the number of detections per class.
@@ -98,6 +101,7 @@ def plot_class_distribution(detections: List[Dict], save_path: Path):
     plt.close(fig)
 
 # ==== Function: plot_confidence_distribution ====
+@pyplot_section
 def plot_confidence_distribution(detections: List[Dict], save_path: Path):
     """
     Creates a histogram of confidence scores from detected objects.
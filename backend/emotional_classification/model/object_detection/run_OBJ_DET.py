@@ -5,128 +5,187 @@ Authors: Itay Vazana & Oriya Even Chen
 
 Description:
 Runs the complete object detection pipeline using YOLOv8 on a given drawing.
-Performs preprocessing, detection, cropping, metadata enrichment, and visual plot generation.
+Performs preprocessing, detection, cropping, metadata enrichment, and visual plot generation
+(plots follow the job's plot mode, see backend_app/plot_policy.py).
 Results are saved to the shared memory for downstream analysis.
+Both passes (edge image and original) go through the detector in one batched predict on
+decoded arrays from the job's image cache; their detections are fused before cropping, so
+an object found by both passes is cropped once.
 """
 
 import shutil
 from pathlib import Path
-from ultralytics import YOLO
+import numpy as np
 
 from model.model_config import (
-    PROJECT_ROOT,
     CONFIDENCE_THRESHOLD,
     IOU_THRESHOLD,
-    MODEL_PATH
+    MODEL_PATH,
+    INFERENCE_BACKEND
 )
 from input_processor import preprocess_and_save
-from boxes_cropper import crop_and_save_objects
+from boxes_cropper import crop_and_save_objects, BASE_OUTPUT_SUBDIR
 from plot_yolo_detections import (
     draw_bounding_boxes,
     plot_class_distribution,
     plot_confidence_distribution,
 )
+from backend_app.workspace import get_workspace
+from backend_app.artifact_store import get_artifact_store
+from backend_app.metrics import measure
+from backend_app.plot_policy import render_plot
+from backend_app.progress_events import report_progress
+from backend_app.inference_backend import load_yolo, yolo_warm_up
+from backend_app.model_registry import register_model, use_model, get_model_registry
 
-# ==== Paths ====
-INPUT_DIR = PROJECT_ROOT / "shared_memory" / "0_BE_input"
-PREPROCESSED_IMG_PATH = Path("temp/processed_input.png")
-SHARED_PREPROC_PATH = PROJECT_ROOT / "shared_memory" / "2_OBJ_DET_out" / "processed_input.png"
-PLOTS_DIR = Path("temp/plots")
-SHARED_PLOTS_DIR = PROJECT_ROOT / "shared_memory" / "2_OBJ_DET_out" / "plots"
+# ==== YOLO Model (loaded on first use by the model registry) ====
+def load_model():
+    model = load_yolo("OBJ_DET", MODEL_PATH, INFERENCE_BACKEND)
+    if INFERENCE_BACKEND == "torch":
+        model.fuse()  # ONNX graphs are already fused at export
+    return model
 
-# ==== Load YOLO Model ====
-model = YOLO(MODEL_PATH)
-model.fuse()
+register_model("OBJ_DET", load_model, warm_up=yolo_warm_up("OBJ_DET"))
+
+SHARED_PLOTS_KEY = "2_OBJ_DET_out/plots"
 
 # ==== Function: run_yolo ====
-def run_yolo(image_path: str) -> list[dict]:
+def run_yolo(images: list[np.ndarray]) -> list[list[dict]]:
     """
-    Runs YOLO object detection and returns detection results.
+    Runs YOLO object detection on several images in one batched predict call.
 
     Args:
-        image_path (str): Path to the image file.
+        images (list[np.ndarray]): Decoded images (BGR, or 3-channel gray).
 
     Returns:
-        list[dict]: List of detection results with label, confidence, and bbox.
+        list[list[dict]]: For each image, its detections with label, confidence, and bbox.
     """
-    results = model.predict(
-        source=image_path,
-        conf=CONFIDENCE_THRESHOLD,
-        iou=IOU_THRESHOLD,
-        save=False,
-        verbose=False,
-    )
-    dets = []
+    with use_model("OBJ_DET") as model:
+        results = model.predict(
+            source=list(images),
+            conf=CONFIDENCE_THRESHOLD,
+            iou=IOU_THRESHOLD,
+            save=False,
+            verbose=False,
+        )
+    per_image = []
     for r in results:
+        dets = []
         for box in r.boxes:
             dets.append({
-                "label": model.names[int(box.cls.item())],
+                "label": r.names[int(box.cls.item())],
                 "confidence": float(box.conf.item()),
                 "bbox": dict(zip(("x1", "y1", "x2", "y2"), box.xyxy[0].tolist())),
             })
-    return dets
+        per_image.append(dets)
+    return per_image
 
-# ==== Function: full_det_pipeline ====
-def full_det_pipeline(det_image: str, crop_img, tag: str) -> None:
+# ==== Function: plot_pass ====
+def plot_pass(dets: list[dict], crop_img, tag: str, plots_dir: Path) -> None:
     """
-    Executes full detection + visualization flow for a given image.
+    Writes (or defers, following the job's plot mode) the diagnostic plots of one detection pass.
 
     Args:
-        det_image (str): Path to image for detection.
-        crop_img: Image used for cropping.
+        dets (list[dict]): Detections of the pass.
+        crop_img: Image the boxes are drawn on.
         tag (str): Tag used to label plot outputs.
+        plots_dir (Path): Folder receiving the diagnostic plots.
 
     Returns:
         None
     """
-    print(f"[RUN] YOLO detection on: {det_image}")
-    dets = run_yolo(det_image)
-    print(f"[INFO] {len(dets)} object(s) detected.")
+    plots = {
+        f"{tag}_annotated.png": lambda path: draw_bounding_boxes(crop_img, dets, save_path=path),
+        f"{tag}_class_dist.png": lambda path: plot_class_distribution(dets, save_path=path),
+        f"{tag}_conf_hist.png": lambda path: plot_confidence_distribution(dets, save_path=path)
+    }
+    for name, render in plots.items():
+        render_plot(render, plots_dir / name, f"{SHARED_PLOTS_KEY}/{name}")
+
+# ==== Function: reset_outputs ====
+def reset_outputs(mode: str) -> None:
+    """
+    Removes the crops and metadata of an earlier run (object IDs restart at 0000, so crops
+    of a longer earlier run would otherwise stay next to the new ones), in memory and on disk.
 
-    crop_and_save_objects(crop_img, dets, mode="colored")
+    Args:
+        mode (str): Either 'colored' or 'black_white'.
 
-    PLOTS_DIR.mkdir(parents=True, exist_ok=True)
-    draw_bounding_boxes(crop_img, dets, save_path=PLOTS_DIR / f"{tag}_annotated.png")
-    plot_class_distribution(dets, save_path=PLOTS_DIR / f"{tag}_class_dist.png")
-    plot_confidence_distribution(dets, save_path=PLOTS_DIR / f"{tag}_conf_hist.png")
+    Returns:
+        None
+    """
+    store = get_artifact_store()
+    objects_parts = (*BASE_OUTPUT_SUBDIR, mode)
+    store.discard(objects_parts)
+    shutil.rmtree(store.workspace.path(*objects_parts), ignore_errors=True)
 
-# ==== Script Entry Point ====
-if __name__ == "__main__":
-    print(f"[INFO] Looking for input image in: {INPUT_DIR}")
-    print(f"[INFO] INPUT_DIR exists: {INPUT_DIR.exists()}")
-    
-    png_files = list(INPUT_DIR.glob("*.png"))
+# ==== Function: main ====
+def main() -> None:
+    """
+    Runs both detection passes on the shared input image and publishes crops and plots.
+    """
+    workspace = get_workspace()
+    reset_outputs("colored")
+    input_dir = workspace.path("0_BE_input")
+    temp_dir = workspace.temp_dir("OBJ_DET")
+    plots_dir = temp_dir / "plots"
+    shared_preproc_path = workspace.path("2_OBJ_DET_out", "processed_input.png")
+    shared_plots_dir = workspace.path(SHARED_PLOTS_KEY)
+
+    print(f"[INFO] Looking for input image in: {input_dir}")
+    print(f"[INFO] INPUT_DIR exists: {input_dir.exists()}")
+
+    png_files = list(input_dir.glob("*.png"))
     print(f"[INFO] Found {len(png_files)} PNG files: {[f.name for f in png_files]}")
-    
+
     if not png_files:
-        print(f"[ERROR] No PNG file found in {INPUT_DIR}")
+        print(f"[ERROR] No PNG file found in {input_dir}")
         print(f"[ERROR] Please upload an image first using the Streamlit interface")
-        exit(1)
-    
+        raise FileNotFoundError(f"No PNG file found in {input_dir}")
+
     original_path = png_files[0]
     print(f"[INFO] Using input image: {original_path.name}")
-    
-    orig_img, proc_img = preprocess_and_save(str(original_path), str(PREPROCESSED_IMG_PATH))
-
-    SHARED_PREPROC_PATH.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(PREPROCESSED_IMG_PATH, SHARED_PREPROC_PATH)
-    print(f"[SAVE] Processed image copied to: {SHARED_PREPROC_PATH}")
-
-    # Pass 1: run on processed image
-    full_det_pipeline(str(PREPROCESSED_IMG_PATH), crop_img=orig_img, tag="pass1")
 
-    # Pass 2: run again on original image
-    full_det_pipeline(str(original_path), crop_img=orig_img, tag="pass2")
-
-    # Copy plots to shared memory
-    if PLOTS_DIR.exists():
-        SHARED_PLOTS_DIR.mkdir(parents=True, exist_ok=True)
-        shutil.copytree(PLOTS_DIR, SHARED_PLOTS_DIR, dirs_exist_ok=True)
-        print(f"[SAVE] Plots copied to: {SHARED_PLOTS_DIR}")
+    with measure("preprocess"):
+        orig_img, proc_img = preprocess_and_save(("0_BE_input", original_path.name), str(shared_preproc_path))
+    print(f"[SAVE] Processed image saved to: {shared_preproc_path}")
+
+    # Pass 1 on the processed image (gray edges replicated on 3 channels: RGB == BGR),
+    # pass 2 on the original image: one batch
+    with measure("model_load"):
+        get_model_registry().load("OBJ_DET")
+    print(f"[RUN] YOLO detection on {orig_img.shape[1]}x{orig_img.shape[0]} (processed + original, batched)")
+    with measure("inference"):
+        pass1_dets, pass2_dets = run_yolo([proc_img, orig_img])
+    print(f"[INFO] {len(pass1_dets)} + {len(pass2_dets)} object(s) detected (pass1 + pass2).")
+    report_progress("OBJ_DET", 2, 2, "detection passes")
+
+    # Fused detections: overlapping boxes of the two passes keep the more confident one
+    with measure("disk_write"):
+        saved_ids = crop_and_save_objects(orig_img, pass1_dets + pass2_dets, mode="colored")
+    print(f"[INFO] {len(saved_ids)} object(s) kept after fusing the passes.")
+
+    with measure("plotting"):
+        plot_pass(pass1_dets, orig_img, "pass1", plots_dir)
+        plot_pass(pass2_dets, orig_img, "pass2", plots_dir)
+
+    # Copy plots to shared memory (none rendered yet with the "none" / "on_demand" plot modes)
+    if plots_dir.exists():
+        with measure("disk_write"):
+            shared_plots_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copytree(plots_dir, shared_plots_dir, dirs_exist_ok=True)
+        print(f"[SAVE] Plots copied to: {shared_plots_dir}")
 
     # Clean temp directory
-    if Path("temp").exists():
-        shutil.rmtree("temp")
+    if temp_dir.exists():
+        shutil.rmtree(temp_dir)
         print("[CLEAN] Temporary folder removed.")
 
     print("[DONE] Object detection pipeline complete.")
+
+# ==== Script Entry Point ====
+if __name__ == "__main__":
+    try:
+        main()
+    except FileNotFoundError:
+        exit(1)
@@ -43,6 +43,7 @@ from PyPDF2 import PdfMerger
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from compressor import compress_pdf_with_ghostscript
+from build_sources_folder import get_shared_dir, get_sources_dir
 
 # Imports from page builders
 from pages_builders.build_cover_page import build_cover_page
@@ -55,15 +56,8 @@ from pages_builders.build_final_thankyou_page import build_final_thankyou_page
 # === Directories ===
 BASE_DIR = Path(__file__).resolve().parent
 ROOT = BASE_DIR.parent
-SHARED = ROOT / "shared_memory"
 ASSETS = ROOT / "pdf_generator" / "assets"
-SOURCES = ROOT / "pdf_generator" / "sources"
-PAGES_DIR = SHARED / "7_PDFG_out"
-PAGES_DIR.mkdir(parents=True, exist_ok=True)
-print("PAGES_DIR:", PAGES_DIR)
-print("ASSETS:", ASSETS)
-print("bASE_DIR:", BASE_DIR)
-print("shared:", SHARED)
+PAGES_SUBDIR = "7_PDFG_out"
 # === File lookup mapping ===
 FILE_MAP = {
     "Original_Draw": ("BE", "drawing", "images", "BE_original_input"),
@@ -82,7 +76,7 @@ FILE_MAP = {
 }
 
 def get_file_from_sources(module: str, target: str, category: str, name_starts_with: str = None) -> Path | None:
-    folder = SOURCES / module / target / category
+    folder = get_sources_dir() / module / target / category
     if not folder.exists():
         return None
     for file in folder.iterdir():
@@ -106,6 +100,16 @@ def generate_fallback_pdf(output_path: Path):
 
 
 def run():
+    SHARED = get_shared_dir()
+    SOURCES = get_sources_dir()
+    PAGES_DIR = SHARED / PAGES_SUBDIR
+
+    PAGES_DIR.mkdir(parents=True, exist_ok=True)
+    print("PAGES_DIR:", PAGES_DIR)
+    print("ASSETS:", ASSETS)
+    print("bASE_DIR:", BASE_DIR)
+    print("shared:", SHARED)
+
     post_analysis = json.loads((SHARED / "5_JSON_out/post_analysis.json").read_text())
     analysis_text = json.loads((SHARED / "6_AG_out/analysis_text.json").read_text())
 
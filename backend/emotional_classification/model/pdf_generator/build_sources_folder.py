@@ -13,8 +13,12 @@ This includes:
 - Handling fallback images when necessary
 - Adding derived plots (like CEX object/expression plots)
 - Cleaning up empty folders
+
+Artifacts still held in memory by the job's artifact store (object / face crops) are
+written first; 8-bit RGB PNGs are then copied as they are instead of being decoded and re-encoded.
 """
 
+import sys
 from PIL import Image
 import shutil
 import os
@@ -25,14 +29,45 @@ DEBUG = False
 
 # === Base paths ===
 BASE_DIR = Path(__file__).resolve().parent.parent
-SHARED_DIR = BASE_DIR / "shared_memory"
-SOURCES_DIR = BASE_DIR / "pdf_generator" / "sources"
-SOURCES_DIR.mkdir(parents=True, exist_ok=True)
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from backend_app.workspace import get_workspace, JOBS_FOLDER, TEMP_FOLDER
+from backend_app.result_cache import CACHE_FOLDER
+from backend_app.artifact_store import get_artifact_store
+
+EXCLUDED_DIRS = {"0_BE_out", "7_PDFG_out", "8_History", JOBS_FOLDER, TEMP_FOLDER, CACHE_FOLDER}
+
+
+def get_shared_dir() -> Path:
+    """Shared memory root of the current job."""
+    return get_workspace().root
+
+
+def get_sources_dir() -> Path:
+    """Sources folder of the current job (scratch space of the PDF stage)."""
+    return get_workspace().temp_dir("PDFG") / "sources"
+
 
-EXCLUDED_DIRS = {"0_BE_out", "7_PDFG_out", "8_History"}
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def is_rgb8_png(path: str) -> bool:
+    """True if the file is a PNG with 8-bit RGB pixels (IHDR bit depth 8, color type 2)."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(26)
+    except OSError:
+        return False
+    return len(header) == 26 and header[:8] == PNG_SIGNATURE and header[12:16] == b"IHDR" \
+        and header[24] == 8 and header[25] == 2
 
 
 def standardize_image_size(input_path: str, output_path: str, placeholder_size=(600, 600)):
+    if is_rgb8_png(input_path):
+        # Already what the conversion below would produce
+        shutil.copy2(input_path, output_path)
+        return
     try:
         img = Image.open(input_path).convert("RGB")
         img.save(output_path)
@@ -70,7 +105,7 @@ def resolve_target_path(file_path: Path) -> tuple[str, Path]:
             return module, Path("drawing/images")
         if rel_path.match("objects/colored/crops/*.png"):
             return module, Path("objects/images")
-        if rel_path.match("objects/colored/jsons/*.json"):
+        if rel_path.match("objects/colored/objects.json"):
             return module, Path("objects/json")
         if "plots" in str(rel_path):
             return module, Path("objects/plots")
@@ -102,87 +137,105 @@ def resolve_target_path(file_path: Path) -> tuple[str, Path]:
     return None, None
 
 
-# === Step 0: Create all subdirs ===
+# === Categories created for every detected module ===
 ALL_CATEGORIES = [
     "drawing/images", "drawing/json", "drawing/plots",
     "objects/images", "objects/json", "objects/plots",
     "expressions/images", "expressions/json", "expressions/plots"
 ]
 
-found_modules = set()
-for root, _, files in os.walk(SHARED_DIR):
-    rel_path = Path(root).relative_to(SHARED_DIR)
-    if any(part in EXCLUDED_DIRS for part in rel_path.parts):
-        continue
-    for file in files:
-        source_file = Path(root) / file
-        module, _ = resolve_target_path(source_file)
-        if module:
-            found_modules.add(module)
-
-for module in found_modules:
-    for cat in ALL_CATEGORIES:
-        (SOURCES_DIR / module / cat).mkdir(parents=True, exist_ok=True)
-
-
-# === Step 1: Copy files ===
-for root, _, files in os.walk(SHARED_DIR):
-    rel_path = Path(root).relative_to(SHARED_DIR)
-    if any(part in rel_path.parts for part in EXCLUDED_DIRS):
-        continue
-
-    for file in files:
-        if not (file.endswith(".png") or file.endswith(".json")):
-            continue
 
-        source_file = Path(root) / file
-        module, target_subpath = resolve_target_path(source_file)
-        if module is None or target_subpath is None:
-            if DEBUG:
-                print(f"[SKIPPED] Unrecognized path: {source_file}")
+def create_category_dirs():
+    """
+    Step 0: Creates all category subfolders for every module found in shared memory.
+    """
+    shared_dir, sources_dir = get_shared_dir(), get_sources_dir()
+    found_modules = set()
+    for root, _, files in os.walk(shared_dir):
+        rel_path = Path(root).relative_to(shared_dir)
+        if any(part in EXCLUDED_DIRS for part in rel_path.parts):
+            continue
+        for file in files:
+            source_file = Path(root) / file
+            module, _ = resolve_target_path(source_file)
+            if module:
+                found_modules.add(module)
+
+    for module in found_modules:
+        for cat in ALL_CATEGORIES:
+            (sources_dir / module / cat).mkdir(parents=True, exist_ok=True)
+
+
+def copy_module_files():
+    """
+    Step 1: Copies and renames every recognized .png / .json file into the sources tree.
+    """
+    shared_dir, sources_dir = get_shared_dir(), get_sources_dir()
+    for root, _, files in os.walk(shared_dir):
+        rel_path = Path(root).relative_to(shared_dir)
+        if any(part in rel_path.parts for part in EXCLUDED_DIRS):
             continue
 
-        target_dir = SOURCES_DIR / module / target_subpath
-        new_name = f"{module}_{file}"
-        target_file = target_dir / new_name
-
-        if file.endswith(".json"):
-            shutil.copy2(source_file, target_file)
-        else:
-            standardize_image_size(str(source_file), str(target_file))
-
-        if DEBUG:
-            print(f"[COPY] {source_file} → {target_file}")
-
-
-# === Step 2: Add renamed CEX object plots ===
-obj_crop_dir = SOURCES_DIR / "OBJDET" / "objects" / "images"
-if obj_crop_dir.exists():
-    for crop_path in obj_crop_dir.glob("OBJDET_*.png"):
-        obj_id = crop_path.stem.replace("OBJDET_", "")
-        source_plot = SHARED_DIR / "4_CEX_out/colors/plots/object" / obj_id / "plot.png"
-        if source_plot.exists():
-            target_dir = SOURCES_DIR / "CEX" / "objects" / "plots"
-            target_dir.mkdir(parents=True, exist_ok=True)
-            target_file = target_dir / f"CEX_object_{obj_id}.png"
-            standardize_image_size(str(source_plot), str(target_file))
-            if DEBUG:
-                print(f"[CEX OBJ PLOT] {source_plot} → {target_file}")
-
-
-# === Step 3: Add renamed CEX expression plots ===
-exp_crop_dir = SOURCES_DIR / "FED" / "expressions" / "images"
-if exp_crop_dir.exists():
-    for crop_path in exp_crop_dir.glob("FED_*.png"):
-        expr_id = crop_path.stem.replace("FED_", "")
-        source_plot = SHARED_DIR / "4_CEX_out/colors/plots/expression" / expr_id / "plot.png"
-        if source_plot.exists():
-            target_dir = SOURCES_DIR / "CEX" / "expressions" / "plots"
-            target_dir.mkdir(parents=True, exist_ok=True)
-            target_file = target_dir / f"CEX_expression_{expr_id}.png"
-            standardize_image_size(str(source_plot), str(target_file))
+        for file in files:
+            if not (file.endswith(".png") or file.endswith(".json")):
+                continue
+
+            source_file = Path(root) / file
+            module, target_subpath = resolve_target_path(source_file)
+            if module is None or target_subpath is None:
+                if DEBUG:
+                    print(f"[SKIPPED] Unrecognized path: {source_file}")
+                continue
+
+            target_dir = sources_dir / module / target_subpath
+            new_name = f"{module}_{file}"
+            target_file = target_dir / new_name
+
+            if file.endswith(".json"):
+                shutil.copy2(source_file, target_file)
+            else:
+                standardize_image_size(str(source_file), str(target_file))
+
             if DEBUG:
-                print(f"[CEX EXP PLOT] {source_plot} → {target_file}")
+                print(f"[COPY] {source_file} → {target_file}")
+
+
+def add_cex_object_plots():
+    """
+    Step 2: Adds renamed CEX object plots next to the matching object crops.
+    """
+    shared_dir, sources_dir = get_shared_dir(), get_sources_dir()
+    obj_crop_dir = sources_dir / "OBJDET" / "objects" / "images"
+    if obj_crop_dir.exists():
+        for crop_path in obj_crop_dir.glob("OBJDET_*.png"):
+            obj_id = crop_path.stem.replace("OBJDET_", "")
+            source_plot = shared_dir / "4_CEX_out/colors/plots/object" / obj_id / "plot.png"
+            if source_plot.exists():
+                target_dir = sources_dir / "CEX" / "objects" / "plots"
+                target_dir.mkdir(parents=True, exist_ok=True)
+                target_file = target_dir / f"CEX_object_{obj_id}.png"
+                standardize_image_size(str(source_plot), str(target_file))
+                if DEBUG:
+                    print(f"[CEX OBJ PLOT] {source_plot} → {target_file}")
+
+
+def add_cex_expression_plots():
+    """
+    Step 3: Adds renamed CEX expression plots next to the matching expression crops.
+    """
+    shared_dir, sources_dir = get_shared_dir(), get_sources_dir()
+    exp_crop_dir = sources_dir / "FED" / "expressions" / "images"
+    if exp_crop_dir.exists():
+        for crop_path in exp_crop_dir.glob("FED_*.png"):
+            expr_id = crop_path.stem.replace("FED_", "")
+            source_plot = shared_dir / "4_CEX_out/colors/plots/expression" / expr_id / "plot.png"
+            if source_plot.exists():
+                target_dir = sources_dir / "CEX" / "expressions" / "plots"
+                target_dir.mkdir(parents=True, exist_ok=True)
+                target_file = target_dir / f"CEX_expression_{expr_id}.png"
+                standardize_image_size(str(source_plot), str(target_file))
+                if DEBUG:
+                    print(f"[CEX EXP PLOT] {source_plot} → {target_file}")
 
 
 # === Step 4: Clean empty folders ===
@@ -196,18 +249,37 @@ def remove_empty_dirs(path: Path):
                     print(f"Removed empty folder: {sub}")
 
 
-if __name__ == "__main__":
-    remove_empty_dirs(SOURCES_DIR)
+def print_tree(path: Path, prefix: str = ""):
+    entries = sorted(list(path.iterdir()), key=lambda p: (not p.is_dir(), p.name.lower()))
+    for i, entry in enumerate(entries):
+        connector = "└── " if i == len(entries) - 1 else "├── "
+        print(f"{prefix}{connector}{entry.name}")
+        if entry.is_dir():
+            extension = "    " if i == len(entries) - 1 else "│   "
+            print_tree(entry, prefix + extension)
+
+
+def build_sources_folder():
+    """
+    Builds the complete sources tree from the current job's shared memory contents.
+    """
+    written = get_artifact_store().flush()
+    if DEBUG:
+        print(f"[FLUSH] {written} in-memory artifact(s) written to shared memory")
+
+    sources_dir = get_sources_dir()
+    sources_dir.mkdir(parents=True, exist_ok=True)
+    create_category_dirs()
+    copy_module_files()
+    add_cex_object_plots()
+    add_cex_expression_plots()
+    remove_empty_dirs(sources_dir)
 
     if DEBUG:
         print("\n=== Completed building sources folder ===")
-        print("Resulting directory tree under pdf_generator/sources/:")
-        def print_tree(path: Path, prefix: str = ""):
-            entries = sorted(list(path.iterdir()), key=lambda p: (not p.is_dir(), p.name.lower()))
-            for i, entry in enumerate(entries):
-                connector = "└── " if i == len(entries) - 1 else "├── "
-                print(f"{prefix}{connector}{entry.name}")
-                if entry.is_dir():
-                    extension = "    " if i == len(entries) - 1 else "│   "
-                    print_tree(entry, prefix + extension)
-        print_tree(SOURCES_DIR)
+        print(f"Resulting directory tree under {sources_dir}:")
+        print_tree(sources_dir)
+
+
+if __name__ == "__main__":
+    build_sources_folder()
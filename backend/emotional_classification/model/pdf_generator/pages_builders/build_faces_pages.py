@@ -69,22 +69,23 @@ def build_faces_pages(output_path: str,
     safe_draw_image(c, footer_img_path, 0, 0, width=width, height=FOOTER_HEIGHT)
     c.showPage()
 
-    # === Detection Overview Page ===
-    safe_draw_image(c, header_img_path, 0, height - BANNER_HEIGHT, width=width, height=BANNER_HEIGHT)
-    content_top = height - BANNER_HEIGHT
-    content_bottom = FOOTER_HEIGHT
-    section_height = (content_top - content_bottom) / 3
-
-    for i, img_path in enumerate(detection_img_paths[:3]):
-        y = content_bottom + (2 - i) * section_height
-        if i == 0:
-            safe_draw_image(c, img_path, width / 2 - 150, y + 10,
-                            width=300, height=section_height - 20)
-        else:
-            safe_draw_image(c, img_path, 0, y, width=width, height=section_height)
-
-    safe_draw_image(c, footer_img_path, 0, 0, width=width, height=FOOTER_HEIGHT)
-    c.showPage()
+    # === Detection Overview Page (left out when the job ran without plots) ===
+    if any(path and Path(path).exists() for path in detection_img_paths[:3]):
+        safe_draw_image(c, header_img_path, 0, height - BANNER_HEIGHT, width=width, height=BANNER_HEIGHT)
+        content_top = height - BANNER_HEIGHT
+        content_bottom = FOOTER_HEIGHT
+        section_height = (content_top - content_bottom) / 3
+
+        for i, img_path in enumerate(detection_img_paths[:3]):
+            y = content_bottom + (2 - i) * section_height
+            if i == 0:
+                safe_draw_image(c, img_path, width / 2 - 150, y + 10,
+                                width=300, height=section_height - 20)
+            else:
+                safe_draw_image(c, img_path, 0, y, width=width, height=section_height)
+
+        safe_draw_image(c, footer_img_path, 0, 0, width=width, height=FOOTER_HEIGHT)
+        c.showPage()
 
     # === Per-Expression Pages ===
     print("========== EXPRESSION ID COMPARISON ==========\n")
@@ -101,9 +101,10 @@ def build_general_analysis_page_1(c, width, height,
     c.setFillColor(colors.black)
     c.drawCentredString(SAFE_MARGIN + half_width / 2, img_y - 12, "The original drawing")
 
-    c.drawImage(ImageReader(ec_plot_img_path), SAFE_MARGIN + half_width + 5, img_y,
-                width=half_width, height=visual_height, preserveAspectRatio=True, mask='auto')
-    c.drawCentredString(SAFE_MARGIN + 1.5 * half_width + 5, img_y - 12, "Emotion Distribution Plot")
+    if ec_plot_img_path:  # None when the job ran without plots
+        c.drawImage(ImageReader(ec_plot_img_path), SAFE_MARGIN + half_width + 5, img_y,
+                    width=half_width, height=visual_height, preserveAspectRatio=True, mask='auto')
+        c.drawCentredString(SAFE_MARGIN + 1.5 * half_width + 5, img_y - 12, "Emotion Distribution Plot")
 
     base_y = content_bottom + section_height + SECTION_SPACING
 
@@ -181,16 +182,17 @@ def build_general_analysis_page_2(c, width, height,
     content_height = content_top - content_bottom
     half_height = content_height / 2
 
-    c.drawImage(
-        ImageReader(cex_plot_img_path),
-        0,
-        content_bottom + half_height,
-        width=width,
-        height=half_height,
-        preserveAspectRatio=True,
-        anchor='s',
-        mask='auto'
-    )
+    if cex_plot_img_path:  # None when the job ran without plots
+        c.drawImage(
+            ImageReader(cex_plot_img_path),
+            0,
+            content_bottom + half_height,
+            width=width,
+            height=half_height,
+            preserveAspectRatio=True,
+            anchor='s',
+            mask='auto'
+        )
 
     c.drawImage(
         ImageReader(processed_img_path),
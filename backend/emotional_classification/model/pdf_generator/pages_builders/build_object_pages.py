@@ -77,41 +77,43 @@ def build_object_pages(output_path: str,
     safe_draw_image(c, footer_img_path, 0, 0, width=width, height=FOOTER_HEIGHT)
     c.showPage()
 
-    # Bounding Box Page (2 images stacked vertically)
-    safe_draw_image(c, header_img_path, 0, height - BANNER_HEIGHT, width=width, height=BANNER_HEIGHT)
-    content_height = height - BANNER_HEIGHT - FOOTER_HEIGHT
-    half_height = content_height / 2
+    # Bounding Box Page (2 images stacked vertically; left out when the job ran without plots)
+    if any(path and Path(path).exists() for path in bbox_img_paths[:2]):
+        safe_draw_image(c, header_img_path, 0, height - BANNER_HEIGHT, width=width, height=BANNER_HEIGHT)
+        content_height = height - BANNER_HEIGHT - FOOTER_HEIGHT
+        half_height = content_height / 2
 
-    for i, path in enumerate(bbox_img_paths[:2]):
-        y = FOOTER_HEIGHT + (1 - i) * half_height
-        safe_draw_image(c, path, 0, y, width=width, height=half_height)
+        for i, path in enumerate(bbox_img_paths[:2]):
+            y = FOOTER_HEIGHT + (1 - i) * half_height
+            safe_draw_image(c, path, 0, y, width=width, height=half_height)
 
-    safe_draw_image(c, footer_img_path, 0, 0, width=width, height=FOOTER_HEIGHT)
-    c.showPage()
+        safe_draw_image(c, footer_img_path, 0, 0, width=width, height=FOOTER_HEIGHT)
+        c.showPage()
 
-    # Class + Confidence Distribution Page (4 plots in 2x2 grid)
-    safe_draw_image(c, header_img_path, 0, height - BANNER_HEIGHT, width=width, height=BANNER_HEIGHT)
-    c.setFont("Helvetica-Bold", 20)
-    c.setFillColor(colors.HexColor("#111111"))
-    title_y = height - BANNER_HEIGHT - 30
-    c.drawCentredString(width / 2, title_y, "Object class distribution and confidence")
-
-    available_height = height - BANNER_HEIGHT - FOOTER_HEIGHT - 60
-    top_y = FOOTER_HEIGHT + available_height / 2
-    mid_x = width / 2
-
-    coords = [
-        (0, top_y),
-        (mid_x, top_y),
-        (0, FOOTER_HEIGHT),
-        (mid_x, FOOTER_HEIGHT)
-    ]
+    # Class + Confidence Distribution Page (4 plots in 2x2 grid; left out when the job ran without plots)
     plots = class_conf_plot_paths + class_dist_plot_paths
-    for path, (x, y) in zip(plots, coords):
-        safe_draw_image(c, path, x, y, width=width / 2, height=available_height / 2)
-
-    safe_draw_image(c, footer_img_path, 0, 0, width=width, height=FOOTER_HEIGHT)
-    c.showPage()
+    if any(path and Path(path).exists() for path in plots):
+        safe_draw_image(c, header_img_path, 0, height - BANNER_HEIGHT, width=width, height=BANNER_HEIGHT)
+        c.setFont("Helvetica-Bold", 20)
+        c.setFillColor(colors.HexColor("#111111"))
+        title_y = height - BANNER_HEIGHT - 30
+        c.drawCentredString(width / 2, title_y, "Object class distribution and confidence")
+
+        available_height = height - BANNER_HEIGHT - FOOTER_HEIGHT - 60
+        top_y = FOOTER_HEIGHT + available_height / 2
+        mid_x = width / 2
+
+        coords = [
+            (0, top_y),
+            (mid_x, top_y),
+            (0, FOOTER_HEIGHT),
+            (mid_x, FOOTER_HEIGHT)
+        ]
+        for path, (x, y) in zip(plots, coords):
+            safe_draw_image(c, path, x, y, width=width / 2, height=available_height / 2)
+
+        safe_draw_image(c, footer_img_path, 0, 0, width=width, height=FOOTER_HEIGHT)
+        c.showPage()
 
     # Object Pages
     print("\n========== OBJECT ID COMPARISON ==========\n")
@@ -5,13 +5,13 @@ Authors: Itay Vazana & Oriya Even Chen
 
 Description:
 Entry point script for the PDF generation phase in the SoulSketch pipeline.
+Plots deferred by the stages ("on_demand" plot mode) are rendered first; with the "none"
+mode the report is built without them.
 """
 
 import sys
 from pathlib import Path
-import subprocess
 import shutil
-import os
 
 # === Auto-injected project root resolver ===
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -23,59 +23,45 @@ while PROJECT_ROOT.name not in ["SoulSketch", "model"]:
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-# === CONFIGURATION ===
-DEBUG_MODE = True
+from build_sources_folder import build_sources_folder, get_sources_dir
+from build_full_report import run as build_full_report
+from backend_app.metrics import measure
+from backend_app.plot_policy import render_pending_plots
 
+# === CONFIGURATION ===
 PDFG_STEPS = [
-    "build_sources_folder.py",
-    "build_full_report.py"
+    ("render_plots", render_pending_plots),
+    ("build_sources_folder.py", build_sources_folder),
+    ("build_full_report.py", build_full_report)
 ]
 
-BASE_DIR = Path(__file__).resolve().parent
-SOURCES_DIR = BASE_DIR / "sources"
-
-# === Use current Python executable (already in the correct venv) ===
-VENV_PYTHON = sys.executable
 
-def run_script(script_name: str):
+def run_step(step_name: str, step_func):
     """
-    Runs a given Python script from this directory and captures its output.
-    Uses the Python interpreter from .venv.
+    Runs a given PDF generation step in the current interpreter.
+
+    Args:
+        step_name (str): Name of the script implementing the step.
+        step_func (Callable): Function implementing the step.
     """
-    script_path = BASE_DIR / script_name
-    print(f"\nRunning with .venv Python: {script_name}")
-
-    result = subprocess.run(
-        [str(VENV_PYTHON), str(script_path)],
-        cwd=PROJECT_ROOT,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        encoding="utf-8",
-        errors="replace"
-    )
-
-    if DEBUG_MODE:
-        try:
-            print(result.stdout)
-        except UnicodeEncodeError:
-            safe_output = result.stdout.encode(sys.stdout.encoding, errors='replace').decode(sys.stdout.encoding)
-            print(safe_output)
-
-    if result.returncode != 0:
-        print(f"[ERROR] Script failed: {script_name}")
-        raise RuntimeError(f"Script failed: {script_name}")
-    else:
-        print(f"[DONE] {script_name} completed successfully")
+    print(f"\nRunning: {step_name}")
+    try:
+        with measure(Path(step_name).stem):
+            step_func()
+    except Exception as e:
+        print(f"[ERROR] Script failed: {step_name}")
+        raise RuntimeError(f"Script failed: {step_name}") from e
+    print(f"[DONE] {step_name} completed successfully")
 
 
 def clean_sources_folder():
     """
-    Deletes the pdf_generator/sources folder to clean up after report generation.
+    Deletes the job's PDF sources folder to clean up after report generation.
     """
-    if SOURCES_DIR.exists() and SOURCES_DIR.is_dir():
-        shutil.rmtree(SOURCES_DIR)
-        print(f"[CLEANUP] Deleted sources folder at: {SOURCES_DIR}")
+    sources_dir = get_sources_dir()
+    if sources_dir.exists() and sources_dir.is_dir():
+        shutil.rmtree(sources_dir)
+        print(f"[CLEANUP] Deleted sources folder at: {sources_dir}")
 
 
 def run_pdf_generation():
@@ -84,8 +70,8 @@ def run_pdf_generation():
     print("=" * 50)
 
     try:
-        for step in PDFG_STEPS:
-            run_script(step)
+        for step_name, step_func in PDFG_STEPS:
+            run_step(step_name, step_func)
     except Exception as e:
         print(f"[ERROR] PDF Generation failed: {e}")
     
@@ -7,9 +7,15 @@ Modified by: Salma Ibn Cheikh
 Description:
 Archives and cleans all contents under shared_memory/* except for:
 - The '8_History' folder
+- The '9_Jobs' folder (workspaces of running jobs)
+- The '10_Cache' folder (result cache)
+- The '11_Models' folder (ONNX exports of the YOLO models)
 - Python scripts (*.py)
 - Markdown files (*.md)
 
+A single job workspace (shared_memory/9_Jobs/<job_id>) can be archived the same way,
+into the common '8_History' folder.
+
 It first creates a timestamped snapshot under '8_History',
 then deletes all other content (files and folders), 
 while safely handling Windows permission errors (OneDrive, etc.).
@@ -35,6 +41,10 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # === Constants ===
 EXCLUDED_FOLDER = "8_History"
+JOBS_FOLDER = "9_Jobs"
+CACHE_FOLDER = "10_Cache"
+MODELS_FOLDER = "11_Models"
+SKIPPED_FOLDERS = {EXCLUDED_FOLDER, JOBS_FOLDER, CACHE_FOLDER, MODELS_FOLDER}
 EXCLUDED_EXTENSIONS = [".py", ".md"]
 
 
@@ -46,20 +56,25 @@ def remove_readonly(func, path, _):
 
 
 # === Archive Function ===
-def archive_current_process(base_path: Path) -> None:
+def archive_current_process(base_path: Path, history_dir: Path = None, tag: str = None) -> None:
     """
     Archives the current shared_memory folder (excluding Python and markdown files)
     into a timestamped subdirectory under '8_History'.
+
+    Args:
+        base_path (Path): Folder to archive (shared_memory/ or a job workspace).
+        history_dir (Path | None): History folder, defaults to base_path / '8_History'.
+        tag (str | None): Suffix for the snapshot name (e.g. the job ID).
     """
-    history_dir = base_path / EXCLUDED_FOLDER
+    history_dir = history_dir or base_path / EXCLUDED_FOLDER
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    archive_path = history_dir / timestamp
+    archive_path = history_dir / (f"{timestamp}_{tag}" if tag else timestamp)
 
-    history_dir.mkdir(exist_ok=True)
+    history_dir.mkdir(parents=True, exist_ok=True)
     archive_path.mkdir()
 
     for item in base_path.iterdir():
-        if item.name == EXCLUDED_FOLDER:
+        if item.name in SKIPPED_FOLDERS:
             continue
         if item.suffix in EXCLUDED_EXTENSIONS:
             continue
@@ -81,13 +96,16 @@ def clean_all_except_history(base_path: Path) -> None:
     """
     Empties all folders under shared_memory/* except:
     - The '8_History' folder
+    - The '9_Jobs' folder
+    - The '10_Cache' folder
+    - The '11_Models' folder
     - Python scripts (*.py)
     - Markdown files (*.md)
 
     Handles OneDrive permission issues gracefully.
     """
     for item in base_path.iterdir():
-        if item.name == EXCLUDED_FOLDER:
+        if item.name in SKIPPED_FOLDERS:
             continue
 
         if item.suffix in EXCLUDED_EXTENSIONS: